@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Prompt context token benchmark
+
+Measures the token reduction of the compact (tabular) facility analysis context
+against the verbose bullet-line context on recorded facility payloads.
+
+Usage:
+    python benchmarks/context_format_benchmark.py [payloads.json]
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.facility_advisor.prompts import FacilityAdvisorPrompts
+from src.utils.context_format import COMPACT, VERBOSE
+
+DEFAULT_PAYLOADS = Path(__file__).parent / "fixtures" / "facility_payloads.json"
+
+
+def get_token_counter():
+    """Return (counter function, label) using tiktoken when installed"""
+    try:
+        import tiktoken
+
+        encoding = tiktoken.encoding_for_model("gpt-4")
+        return (lambda text: len(encoding.encode(text))), "tiktoken/gpt-4"
+    except ImportError:
+        # Rough heuristic used by OpenAI for English text
+        return (lambda text: max(1, round(len(text) / 4))), "approx (chars/4)"
+
+
+def main():
+    payload_path = Path(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PAYLOADS
+    payloads = json.loads(payload_path.read_text())
+    count_tokens, counter_label = get_token_counter()
+
+    print("📉 Facility context token benchmark")
+    print(f"Payloads: {payload_path}")
+    print(f"Token counter: {counter_label}")
+    print("=" * 78)
+    print(f"{'payload':<32}{'verbose':>10}{'compact':>10}{'saved':>10}{'reduction':>12}")
+    print("-" * 78)
+
+    total_verbose = total_compact = 0
+    for entry in payloads:
+        facility_data = entry["facility_data"]
+        verbose = FacilityAdvisorPrompts.get_facility_analysis_context(facility_data, VERBOSE)
+        compact = FacilityAdvisorPrompts.get_facility_analysis_context(facility_data, COMPACT)
+
+        verbose_tokens = count_tokens(verbose)
+        compact_tokens = count_tokens(compact)
+        total_verbose += verbose_tokens
+        total_compact += compact_tokens
+
+        reduction = 100 * (verbose_tokens - compact_tokens) / verbose_tokens
+        print(
+            f"{entry.get('name', 'unnamed')[:31]:<32}{verbose_tokens:>10}{compact_tokens:>10}"
+            f"{verbose_tokens - compact_tokens:>10}{reduction:>11.1f}%"
+        )
+
+    print("-" * 78)
+    overall = 100 * (total_verbose - total_compact) / total_verbose if total_verbose else 0
+    print(f"{'TOTAL':<32}{total_verbose:>10}{total_compact:>10}{total_verbose - total_compact:>10}{overall:>11.1f}%")
+
+    # Full system prompt (base + context + task) for the largest payload
+    facility_data = payloads[0]["facility_data"]
+    full_verbose = count_tokens(FacilityAdvisorPrompts.get_complete_system_prompt(facility_data, None, VERBOSE))
+    full_compact = count_tokens(FacilityAdvisorPrompts.get_complete_system_prompt(facility_data, None, COMPACT))
+    print(f"\nComplete system prompt ({payloads[0].get('name')}): {full_verbose} -> {full_compact} tokens")
+
+
+if __name__ == "__main__":
+    main()
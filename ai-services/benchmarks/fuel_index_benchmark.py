@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Fuel range index benchmark
+
+Compares the optimizer's previous list-comprehension filtering (±tolerance,
+±20% retry, then scoring every fuel for the closest matches) with
+FuelRangeIndex box/kNN queries on synthetic fuel tables, and checks that both
+return the same fuels.
+
+Usage:
+    python benchmarks/fuel_index_benchmark.py [--queries N]
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.fuel_index import FuelRangeIndex
+
+SIZES = (550, 5_000, 50_000)
+
+
+def make_fuels(count, rng):
+    """Synthetic fuel rows with catalog-like value ranges"""
+    return [
+        {
+            "resource_name": f"fuel_{i}",
+            "dynamic_cost": rng.uniform(2.0, 12.0),
+            "emission_factor": rng.uniform(0.3, 3.2),
+            "heat_content": rng.uniform(0.010, 0.035),
+        }
+        for i in range(count)
+    ]
+
+
+def legacy_filter(fuels, target, tolerance, maxima):
+    """Previous optimize_fuels filtering logic"""
+    cost, emission, energy = target
+    for tol in (tolerance, 0.2):
+        matches = [
+            f for f in fuels
+            if cost * (1 - tol) <= f["dynamic_cost"] <= cost * (1 + tol)
+            and emission * (1 - tol) <= f["emission_factor"] <= emission * (1 + tol)
+            and energy * (1 - tol) <= f["heat_content"] <= energy * (1 + tol)
+        ]
+        if matches:
+            return matches
+    scored = []
+    for f in fuels:
+        diff = (abs(f["dynamic_cost"] - cost) / maxima[0]
+                + abs(f["emission_factor"] - emission) / maxima[1]
+                + abs(f["heat_content"] - energy) / maxima[2])
+        scored.append({**f, "difference_score": diff})
+    return sorted(scored, key=lambda x: x["difference_score"])[:3]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    print("🔎 Fuel range index benchmark")
+    print("=" * 84)
+    print(f"{'rows':>8}{'build ms':>10}{'legacy us/q':>14}{'index us/q':>13}{'speedup':>10}{'mismatches':>12}{'kNN %':>8}")
+    print("-" * 84)
+
+    for size in SIZES:
+        fuels = make_fuels(size, rng)
+        maxima = [max(f[k] for f in fuels) for k in ("dynamic_cost", "emission_factor", "heat_content")]
+
+        started = time.perf_counter()
+        index = FuelRangeIndex(fuels, scales=maxima)
+        build_ms = (time.perf_counter() - started) * 1000
+
+        # Narrow tolerances on large tables exercise the box path; wide targets the kNN fallback
+        queries = [
+            ((rng.uniform(2, 12), rng.uniform(0.3, 3.2), rng.uniform(0.01, 0.035)), rng.choice((0.01, 0.05, 0.1)))
+            for _ in range(args.queries)
+        ]
+
+        started = time.perf_counter()
+        legacy_results = [legacy_filter(fuels, target, tol, maxima) for target, tol in queries]
+        legacy_us = (time.perf_counter() - started) * 1e6 / len(queries)
+
+        started = time.perf_counter()
+        index_results = [index.query(target, tol, fallback_tolerances=(0.2,), k=3) for target, tol in queries]
+        index_us = (time.perf_counter() - started) * 1e6 / len(queries)
+
+        mismatches = 0
+        nearest = 0
+        for legacy, result in zip(legacy_results, index_results):
+            nearest += result.mode == "nearest"
+            expected = sorted(f["resource_name"] for f in legacy)
+            actual = sorted(fuels[i]["resource_name"] for i in result.indices)
+            mismatches += expected != actual
+
+        print(
+            f"{size:>8}{build_ms:>10.1f}{legacy_us:>14.1f}{index_us:>13.1f}"
+            f"{legacy_us / index_us:>9.1f}x{mismatches:>12}{100 * nearest / len(queries):>7.0f}%"
+        )
+
+
+if __name__ == "__main__":
+    main()
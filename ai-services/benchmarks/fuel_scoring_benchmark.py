@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Fuel cost-effectiveness scoring benchmark
+
+Scores 10k fuel x scenario rows (catalog fuels with perturbed costs and
+heat contents) with the previous per-fuel loop and with the vectorized
+FuelCostAnalyzer.score_fuels, and checks that both produce the same
+analysis dicts and summary statistics.
+
+Usage:
+    python benchmarks/fuel_scoring_benchmark.py [--rows N]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.emission_factor_catalog import emission_factor_catalog
+from src.services.fuel_cost_analyzer import fuel_cost_analyzer
+
+
+def legacy_analysis(fuel_data):
+    """Previous calculate_cost_effectiveness body (one fuel at a time)"""
+    emission_factor = fuel_data.get('emission_factor', 0)
+    heat_content = fuel_data.get('heat_content', 0)
+    cost_data = fuel_cost_analyzer.get_indian_market_cost(fuel_data.get('resource_name', ''))
+    cost_per_unit = fuel_data.get('cost_inr') or cost_data.get('cost_per_kg', 0)
+
+    carbon_intensity = emission_factor / heat_content if heat_content > 0 else 0
+    cost_per_gj = cost_per_unit / heat_content if heat_content > 0 else 0
+    cost_per_kg_co2_avoided = cost_per_unit / emission_factor if emission_factor > 0 else 0
+    emission_score = max(0, 100 - (carbon_intensity * 2))
+    cost_score = max(0, 100 - (cost_per_gj * 10))
+    return {
+        'cost_per_unit_inr': cost_per_unit,
+        'cost_per_gj_inr': cost_per_gj,
+        'cost_per_kg_co2_avoided_inr': cost_per_kg_co2_avoided,
+        'carbon_intensity': carbon_intensity,
+        'emission_score': emission_score,
+        'cost_score': cost_score,
+        'value_score': (emission_score + cost_score) / 2,
+        'market_data': cost_data
+    }
+
+
+def legacy_analyze(fuels):
+    """Previous analyze_fuels_comprehensive loop and summary passes"""
+    analyzed = [{**fuel, 'analysis': legacy_analysis(fuel)} for fuel in fuels]
+    costs = [f['analysis']['cost_per_unit_inr'] for f in analyzed if f['analysis']['cost_per_unit_inr']]
+    intensities = [f['analysis']['carbon_intensity'] for f in analyzed if f['analysis']['carbon_intensity']]
+    summary = {
+        'total_fuels_analyzed': len(analyzed),
+        'cost_range_inr': {
+            'min': min(costs) if costs else 0,
+            'max': max(costs) if costs else 0,
+            'avg': sum(costs) / len(costs) if costs else 0
+        },
+        'carbon_intensity_range': {
+            'min': min(intensities) if intensities else 0,
+            'max': max(intensities) if intensities else 0,
+            'avg': sum(intensities) / len(intensities) if intensities else 0
+        }
+    }
+    return analyzed, summary
+
+
+def vectorized_analyze(fuels):
+    scores = fuel_cost_analyzer.score_fuels(fuels)
+    analyzed = [{**fuel, 'analysis': scores.analysis(i)} for i, fuel in enumerate(fuels)]
+    return analyzed, scores.summary()
+
+
+def make_rows(count, rng):
+    """Catalog combustion fuels repeated across price/heat scenarios"""
+    base = emission_factor_catalog.fuels(priced_only=False) or [
+        {'resource_name': 'Synthetic', 'emission_factor': 1.5, 'heat_content': 0.02, 'cost_inr': 6.0}
+    ]
+    rows = []
+    while len(rows) < count:
+        fuel = dict(rng.choice(base))
+        fuel['cost_inr'] = (fuel.get('cost_inr') or 0) * rng.uniform(0.7, 1.3) or None
+        fuel['heat_content'] = fuel['heat_content'] * rng.uniform(0.9, 1.1)
+        rows.append(fuel)
+    return rows
+
+
+def close(a, b):
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(close(a[k], b[k]) for k in a)
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-12)
+    return a == b
+
+
+def timed(func, rows, repeat):
+    best = math.inf
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func(rows)
+        best = min(best, time.perf_counter() - started)
+    return result, best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows, random.Random(11))
+
+    (legacy_fuels, legacy_summary), legacy_ms = timed(legacy_analyze, rows, args.repeat)
+    (fuels, summary), vector_ms = timed(vectorized_analyze, rows, args.repeat)
+    scores, scores_ms = timed(fuel_cost_analyzer.score_fuels, rows, args.repeat)
+
+    # Compare the fields the per-fuel loop produced (newer fields such as energy_score are extra)
+    mismatches = sum(
+        not close(a['analysis'], {key: b['analysis'][key] for key in a['analysis']})
+        for a, b in zip(legacy_fuels, fuels)
+    )
+    summary_match = close(legacy_summary, summary)
+
+    print("🧮 Fuel scoring benchmark")
+    print("=" * 60)
+    print(f"Rows:                          {len(rows):,}")
+    print(f"Per-fuel loop + summary:       {legacy_ms:8.1f} ms")
+    print(f"Vectorized + dict view:        {vector_ms:8.1f} ms  ({legacy_ms / vector_ms:.1f}x)")
+    print(f"Vectorized arrays only:        {scores_ms:8.1f} ms  ({legacy_ms / scores_ms:.1f}x)")
+    print(f"Analysis mismatches:           {mismatches}")
+    print(f"Summary identical:             {'yes' if summary_match else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Tolerant JSON parser benchmark and correctness check
+
+Runs the recorded LLM output corpus through the single-pass repair parser and
+the previous parse path (regex cleanup chain, then the manual regex extraction
+of titles/descriptions/categories), reporting which cases decode to the expected
+document, per-case parse time and how repair time scales with input size.
+Correctness is asserted by tests/test_json_repair.py.
+Exits with status 1 if the repair parser gets any corpus case wrong.
+
+Usage:
+    python benchmarks/json_repair_benchmark.py [corpus.json] [--iterations N]
+"""
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.json_repair import parse_json_tolerant, repair_json
+
+DEFAULT_CORPUS = Path(__file__).parent / "fixtures" / "llm_json_corpus.json"
+
+
+def legacy_extract_json_content(ai_response: str) -> str:
+    """Previous FacilityAdvisorService._extract_json_content"""
+    response = ai_response.strip()
+    if "```json" in response:
+        start = response.find("```json") + 7
+        end = response.find("```", start)
+        if end != -1:
+            return response[start:end].strip()
+    if response.startswith("{"):
+        return response
+    start_idx = response.find("{")
+    if start_idx != -1:
+        brace_count = 0
+        end_idx = start_idx
+        for i, char in enumerate(response[start_idx:], start_idx):
+            if char == "{":
+                brace_count += 1
+            elif char == "}":
+                brace_count -= 1
+                if brace_count == 0:
+                    end_idx = i + 1
+                    break
+        if brace_count == 0:
+            return response[start_idx:end_idx]
+    return response
+
+
+def legacy_clean_json_syntax(json_str: str) -> str:
+    """Previous FacilityAdvisorService._clean_json_syntax regex chain"""
+    cleaned = json_str.strip()
+    cleaned = re.sub(r",(\s*[}\]])", r"\1", cleaned)
+    cleaned = re.sub(r"(\n\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*:)", r'\1"\2"\3', cleaned)
+    cleaned = cleaned.replace("'", '"')
+    cleaned = re.sub(r",\s*}", "}", cleaned)
+    cleaned = re.sub(r",\s*]", "]", cleaned)
+    cleaned = re.sub(r",,+", ",", cleaned)
+    return cleaned
+
+
+def legacy_extract_manually(ai_response: str):
+    """
+    Previous FacilityAdvisorService._extract_recommendations_manually
+
+    Recovers title/description/category by regex and fills every other
+    recommendation field with fixed placeholders (None if nothing matched).
+    """
+    titles = re.findall(r'"title":\s*"([^"]+)"', ai_response)
+    descriptions = re.findall(r'"description":\s*"([^"]+)"', ai_response)
+    categories = re.findall(r'"category":\s*"([^"]+)"', ai_response)
+    recommendations = [
+        {
+            "id": f"extracted_{i + 1}",
+            "title": title,
+            "description": descriptions[i] if i < len(descriptions) else "AI-generated recommendation",
+            "category": categories[i] if i < len(categories) else "Process Optimization",
+        }
+        for i, title in enumerate(titles)
+    ]
+    return {"recommendations": recommendations, "manual_extraction": True} if recommendations else None
+
+
+def legacy_parse(ai_response: str):
+    """
+    Previous FacilityAdvisorService._parse_ai_response: extraction, regex
+    cleanup and json.loads, then the manual regex extraction as last resort
+    """
+    try:
+        parsed = json.loads(legacy_clean_json_syntax(legacy_extract_json_content(ai_response)))
+        if not isinstance(parsed, dict) or "recommendations" not in parsed:
+            raise ValueError("Invalid response structure")
+        return parsed
+    except Exception:
+        manual = legacy_extract_manually(ai_response)
+        if manual is None:
+            raise ValueError("Nothing recoverable")
+        return manual
+
+
+def legacy_outcome(raw, expected) -> str:
+    """Outcome of the previous parse path: ok (exact document), manual (regex fallback placeholders) or FAIL"""
+    try:
+        result = legacy_parse(raw)
+    except Exception:
+        return "FAIL"
+    if result == expected:
+        return "ok"
+    return "manual" if result.get("manual_extraction") else "FAIL"
+
+
+def check(parser, raw, expected):
+    """Return (correct, seconds) for one parse"""
+    started = time.perf_counter()
+    try:
+        result = parser(raw)
+    except Exception:
+        return False, time.perf_counter() - started
+    return result == expected, time.perf_counter() - started
+
+
+def time_parser(parser, raw, iterations):
+    """Average seconds per parse (failures included)"""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        try:
+            parser(raw)
+        except Exception:
+            pass
+    return (time.perf_counter() - started) / iterations
+
+
+def scaling(corpus, iterations):
+    """Repair time per KB for growing inputs (should stay flat for linear time)"""
+    base = next(case for case in corpus if case["name"] == "trailing_commas")["raw"]
+    body = base[base.index("[") + 1:base.rindex("]")]
+    print("\nScaling (trailing-comma document with repeated recommendations)")
+    print(f"{'size KB':>10}{'repair ms':>12}{'us/KB':>10}")
+    for factor in (1, 4, 16, 64):
+        raw = '{"recommendations": [' + ",".join([body] * factor) + "]}"
+        seconds = time_parser(repair_json, raw, max(1, iterations // factor))
+        size_kb = len(raw) / 1024
+        print(f"{size_kb:>10.1f}{seconds * 1000:>12.2f}{seconds * 1e6 / size_kb:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("corpus", nargs="?", type=Path, default=DEFAULT_CORPUS)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    corpus = json.loads(args.corpus.read_text())
+
+    print("🧩 Tolerant JSON parser benchmark")
+    print(f"Corpus: {args.corpus} ({len(corpus)} cases)")
+    print("=" * 90)
+    print(f"{'case':<42}{'repair':>8}{'legacy':>8}{'repair us':>14}{'legacy us':>14}")
+    print("-" * 90)
+
+    failures = []
+    repair_ok = legacy_ok = legacy_manual = 0
+    for case in corpus:
+        raw, expected = case["raw"], case["expected"]
+        new_correct, _ = check(parse_json_tolerant, raw, expected)
+        old_outcome = legacy_outcome(raw, expected)
+        repair_ok += new_correct
+        legacy_ok += old_outcome == "ok"
+        legacy_manual += old_outcome == "manual"
+        if not new_correct:
+            failures.append(case["name"])
+
+        new_time = time_parser(parse_json_tolerant, raw, args.iterations)
+        old_time = time_parser(legacy_parse, raw, args.iterations)
+        print(
+            f"{case['name'][:41]:<42}{'ok' if new_correct else 'FAIL':>8}{old_outcome:>8}"
+            f"{new_time * 1e6:>14.1f}{old_time * 1e6:>14.1f}"
+        )
+
+    print("-" * 90)
+    print(
+        f"Correct: repair {repair_ok}/{len(corpus)}, legacy {legacy_ok}/{len(corpus)} "
+        f"(+{legacy_manual} recovered only as placeholder recommendations by the manual fallback)"
+    )
+
+    scaling(corpus, args.iterations)
+
+    if failures:
+        print(f"\n❌ Repair parser failed: {', '.join(failures)}")
+        sys.exit(1)
+    print("\n✅ Repair parser decoded every corpus case correctly")
+
+
+if __name__ == "__main__":
+    main()
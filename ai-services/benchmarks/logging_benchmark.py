@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Logging pipeline benchmark
+
+Times the event-loop side of logging for the previous setup (a synchronous
+StreamHandler per logger, messages built with f-strings) against the queue
+pipeline in src/utils/logger.py (QueueHandler + QueueListener, lazy %-style
+arguments, JSON formatting on the listener thread). stdout is replaced by a
+sink whose writes take a fixed time, standing in for a slow or blocked pipe.
+
+Usage:
+    python benchmarks/logging_benchmark.py [--records N] [--write-latency-ms MS]
+"""
+
+import argparse
+import asyncio
+import io
+import logging
+import queue
+import sys
+import time
+from logging.handlers import QueueListener
+from pathlib import Path
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.logger import JSONFormatter, NonBlockingQueueHandler, SamplingFilter
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+
+class SlowSink(io.StringIO):
+    """stdout stand-in whose writes block for a fixed time"""
+
+    def __init__(self, latency: float):
+        super().__init__()
+        self.latency = latency
+        self.lines = 0
+
+    def write(self, text):
+        time.sleep(self.latency)
+        self.lines += text.count("\n")
+        return len(text)
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(name)
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return logger
+
+
+async def log_requests(logger, records, lazy):
+    """Log lines shaped like fetch_context_data; returns (seconds in log calls, max loop lag)"""
+    facility_id, organization_id, requirements = "f-42", "org-7", ["emission_data", "production_data"]
+    lag = 0.0
+    spent = 0.0
+    for i in range(records):
+        started = time.perf_counter()
+        if lazy:
+            logger.info("Fetched emission data for %s (%s months)", facility_id, 12)
+            logger.info("Question analysis: type=%s, requirements=%s, confidence=%.2f", "emissions", requirements, 0.87)
+        else:
+            logger.info(f"Fetched emission data for {facility_id} ({12} months)")
+            logger.info(f"Question analysis: type={'emissions'}, requirements={requirements}, confidence={0.87:.2f}")
+        elapsed = time.perf_counter() - started
+        spent += elapsed
+        lag = max(lag, elapsed)
+        if i % 50 == 0:
+            await asyncio.sleep(0)
+    return spent, lag
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--records", type=int, default=5000, help="iterations (two log lines each)")
+    parser.add_argument("--write-latency-ms", type=float, default=0.2)
+    args = parser.parse_args()
+    latency = args.write_latency_ms / 1000
+    lines = args.records * 2
+
+    print("🪵 Logging pipeline benchmark")
+    print("=" * 72)
+    print(f"{lines:,} INFO lines, {args.write_latency_ms} ms per stdout write")
+    print(f"{'pipeline':<30}{'us per line':>14}{'worst call ms':>16}{'written':>12}")
+    print("-" * 72)
+
+    # Previous setup: formatting and the write happen on the event loop
+    sink = SlowSink(latency)
+    handler = logging.StreamHandler(sink)
+    handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    spent, lag = await log_requests(make_logger("bench.legacy", handler), args.records, lazy=False)
+    print(f"{'StreamHandler (previous)':<30}{spent / lines * 1e6:>14.1f}{lag * 1000:>16.2f}{sink.lines:>12,}")
+
+    # Queue pipeline, with and without sampling
+    for label, rates in (("queue + JSON", {}), ("queue + JSON, 10% sampled", {"bench": 0.1})):
+        sink = SlowSink(latency)
+        log_queue = queue.Queue(maxsize=lines)
+        queue_handler = NonBlockingQueueHandler(log_queue)
+        queue_handler.addFilter(SamplingFilter(rates))
+        console = logging.StreamHandler(sink)
+        console.setFormatter(JSONFormatter())
+        listener = QueueListener(log_queue, console)
+        listener.start()
+        spent, lag = await log_requests(make_logger("bench.queue", queue_handler), args.records, lazy=True)
+        listener.stop()
+        print(f"{label:<30}{spent / lines * 1e6:>14.1f}{lag * 1000:>16.2f}{sink.lines:>12,}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
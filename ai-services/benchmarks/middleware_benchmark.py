@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Middleware stack benchmark
+
+Drives two copies of the service's middleware stack (CORS, auth, error
+handler) directly over ASGI: one with the previous BaseHTTPMiddleware
+versions of AuthMiddleware and ErrorHandlerMiddleware (kept below), one
+with the current plain-ASGI versions. Reports requests per second for
+GET /health and a POST chat stub, and the time to the first event of a
+streamed chat stub.
+
+Usage:
+    python benchmarks/middleware_benchmark.py [--requests N] [--concurrency N]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+import jwt
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import JSONResponse
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.middleware.auth_middleware import AuthMiddleware, get_current_user
+from src.middleware.error_handler import ErrorHandlerMiddleware
+
+STREAM_EVENTS = 5
+STREAM_INTERVAL = 0.02  # seconds between streamed events
+
+
+class LegacyAuthMiddleware(BaseHTTPMiddleware):
+    """Previous AuthMiddleware.dispatch (logging omitted)"""
+
+    async def dispatch(self, request, call_next):
+        if request.url.path in ["/", "/health", "/docs", "/redoc", "/openapi.json"]:
+            return await call_next(request)
+        request.state.user = None
+        request.state.organization_id = None
+        auth_header = request.headers.get("authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return await call_next(request)
+        try:
+            payload = jwt.decode(auth_header.split(" ")[1], "secret", algorithms=["HS256"],
+                                 options={"verify_signature": False})
+            request.state.user = {"id": payload.get("id"), "email": payload.get("email"),
+                                  "organization_id": payload.get("organization_id")}
+            request.state.organization_id = payload.get("organization_id")
+        except jwt.InvalidTokenError:
+            pass
+        return await call_next(request)
+
+
+class LegacyErrorHandlerMiddleware(BaseHTTPMiddleware):
+    """Previous ErrorHandlerMiddleware.dispatch"""
+
+    async def dispatch(self, request, call_next):
+        try:
+            return await call_next(request)
+        except Exception:
+            return JSONResponse(status_code=500, content={"success": False})
+
+
+def build_app(auth_middleware, error_middleware):
+    """Service-shaped app with the given auth and error middleware"""
+    app = FastAPI()
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    app.add_middleware(auth_middleware)
+    app.add_middleware(error_middleware)
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    @app.post("/api/chat/message")
+    async def chat(request: Request):
+        body = await request.json()
+        user = get_current_user(request)
+        return {"success": True, "data": {"response": f"echo: {body['message']}", "user": user and user["id"]}}
+
+    @app.post("/api/chat/stream")
+    async def chat_stream():
+        async def events():
+            for i in range(STREAM_EVENTS):
+                yield f"data: {json.dumps({'delta': f'token {i}'})}\n\n"
+                await asyncio.sleep(STREAM_INTERVAL)
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    return app
+
+
+async def call(app, method, path, body=b"", headers=()):
+    """Run one request through the ASGI app; returns (status, seconds to first body chunk)"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": method, "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "server": ("testserver", 80), "client": ("127.0.0.1", 1234),
+        "headers": [(b"host", b"testserver"), (b"content-type", b"application/json"), *headers],
+    }
+    sent = False
+    started = time.perf_counter()
+    result = {"status": None, "first_chunk": None}
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await asyncio.sleep(3600)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            result["status"] = message["status"]
+        elif message["type"] == "http.response.body" and message.get("body") and result["first_chunk"] is None:
+            result["first_chunk"] = time.perf_counter() - started
+
+    await app(scope, receive, send)
+    return result["status"], result["first_chunk"]
+
+
+async def requests_per_second(app, method, path, body, headers, total, concurrency):
+    async def worker(count):
+        for _ in range(count):
+            status, _ = await call(app, method, path, body, headers)
+            assert status == 200, status
+
+    await worker(50)  # warm-up
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(total // concurrency) for _ in range(concurrency)))
+    return (total // concurrency * concurrency) / (time.perf_counter() - started)
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+
+    token = jwt.encode({"id": "u1", "email": "bench@example.com", "organization_id": "org1"}, "benchmark-secret-0123456789abcdef")
+    auth = [(b"authorization", f"Bearer {token}".encode())]
+    chat_body = json.dumps({"message": "What is our scope 1 intensity?"}).encode()
+    stacks = {
+        "BaseHTTPMiddleware": build_app(LegacyAuthMiddleware, LegacyErrorHandlerMiddleware),
+        "plain ASGI": build_app(AuthMiddleware, ErrorHandlerMiddleware),
+    }
+    # The service logs every authenticated request at INFO; keep the console quiet here
+    logging.disable(logging.CRITICAL)
+
+    print("🔁 Middleware stack benchmark")
+    print("=" * 72)
+    print(f"{'stack':<20}{'/health rps':>14}{'chat rps':>14}{'stream first event ms':>24}")
+    print("-" * 72)
+    for name, app in stacks.items():
+        health = await requests_per_second(app, "GET", "/health", b"", (), args.requests, args.concurrency)
+        chat = await requests_per_second(app, "POST", "/api/chat/message", chat_body, auth,
+                                         args.requests, args.concurrency)
+        _, first_event = await call(app, "POST", "/api/chat/stream", chat_body, auth)
+        print(f"{name:<20}{health:>14,.0f}{chat:>14,.0f}{first_event * 1000:>24.1f}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
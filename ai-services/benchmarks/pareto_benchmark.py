@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Pareto frontier benchmark
+
+Times the vectorized skyline (src/utils/pareto.py) against a pairwise
+dominance check on synthetic fuel tables of catalog size and larger, and
+verifies both return the same frontier.
+
+Usage:
+    python benchmarks/pareto_benchmark.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.utils.pareto import pareto_mask
+
+SIZES = (548, 5_000, 50_000)
+PAIRWISE_LIMIT = 5_000  # the O(n^2) reference gets too slow beyond this
+MAXIMIZE = (False, False, True)
+
+
+def make_objectives(count, rng):
+    """(cost per GJ, carbon intensity per GJ, heat content) for synthetic fuels"""
+    heat = rng.uniform(0.010, 0.035, count)
+    cost = rng.uniform(2.0, 12.0, count) / heat
+    emission = rng.uniform(0.3, 3.2, count) / heat
+    # Include exact duplicates, as catalogs list the same fuel under several libraries
+    objectives = np.column_stack([cost, emission, heat])
+    duplicates = rng.choice(count, size=count // 20, replace=False)
+    objectives[duplicates[1:]] = objectives[duplicates[:-1]]
+    return np.round(objectives, 4)
+
+
+def pairwise_mask(values):
+    """Reference O(n^2) dominance check, one row at a time"""
+    costs = values * np.where(MAXIMIZE, -1.0, 1.0)
+    mask = np.ones(len(costs), dtype=bool)
+    for i, point in enumerate(costs):
+        dominated_by = np.all(costs <= point, axis=1) & np.any(costs < point, axis=1)
+        mask[i] = not dominated_by.any()
+    return mask
+
+
+def main():
+    rng = np.random.default_rng(7)
+
+    print("📈 Pareto frontier benchmark")
+    print("=" * 64)
+    print(f"{'rows':>8}{'frontier':>10}{'skyline ms':>12}{'pairwise ms':>13}{'speedup':>10}{'match':>8}")
+    print("-" * 64)
+
+    for size in SIZES:
+        objectives = make_objectives(size, rng)
+
+        started = time.perf_counter()
+        mask = pareto_mask(objectives, MAXIMIZE)
+        skyline_ms = (time.perf_counter() - started) * 1000
+
+        if size <= PAIRWISE_LIMIT:
+            started = time.perf_counter()
+            reference = pairwise_mask(objectives)
+            pairwise_ms = (time.perf_counter() - started) * 1000
+            match = "yes" if np.array_equal(mask, reference) else "NO"
+            print(f"{size:>8}{int(mask.sum()):>10}{skyline_ms:>12.2f}{pairwise_ms:>13.1f}{pairwise_ms / skyline_ms:>9.0f}x{match:>8}")
+        else:
+            print(f"{size:>8}{int(mask.sum()):>10}{skyline_ms:>12.2f}{'-':>13}{'-':>10}{'-':>8}")
+
+
+if __name__ == "__main__":
+    main()
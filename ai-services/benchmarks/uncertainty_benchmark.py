@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Fuel uncertainty benchmark
+
+Times the Monte Carlo engine (src/services/fuel_uncertainty.py) at 100k draws
+for growing fuel counts and checks its intervals against the closed-form
+lognormal quantiles of the same distributions.
+
+Usage:
+    python benchmarks/uncertainty_benchmark.py
+"""
+
+import sys
+import time
+from pathlib import Path
+from statistics import NormalDist
+
+import numpy as np
+
+# Add the service root to path for imports
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.services.fuel_uncertainty import FuelUncertaintyEngine
+
+DRAWS = 100_000
+FUEL_COUNTS = (10, 50, 200)
+CONFIDENCE = 0.9
+
+
+def make_inputs(count, rng):
+    """Synthetic per-fuel means, spreads and annual quantities"""
+    return {
+        "cost": rng.uniform(2.0, 12.0, count),
+        "cost_spread": rng.choice([0.05, 0.15, 0.30], count),
+        "emission_factor": rng.uniform(0.3, 3.2, count),
+        "emission_spread": rng.choice([0.05, 0.15], count),
+        "quantity": 3_000_000 / rng.uniform(0.010, 0.035, count),
+    }
+
+
+def analytic_interval(mean, spread, quantity):
+    """Exact 5th/95th percentiles of quantity * lognormal(mean, spread)"""
+    sigma = np.sqrt(np.log1p(spread ** 2))
+    mu = np.log(mean * quantity) - sigma ** 2 / 2
+    z = NormalDist().inv_cdf(1 - (1 - CONFIDENCE) / 2)
+    return np.exp(mu - z * sigma), np.exp(mu + z * sigma)
+
+
+def main():
+    rng = np.random.default_rng(11)
+    engine = FuelUncertaintyEngine(draws=DRAWS, confidence=CONFIDENCE)
+
+    print("🎲 Fuel uncertainty benchmark")
+    print("=" * 60)
+    print(f"{'fuels':>8}{'draws':>10}{'ms':>10}{'max CI error':>16}{'P(cheapest) sum':>16}")
+    print("-" * 60)
+
+    for count in FUEL_COUNTS:
+        inputs = make_inputs(count, rng)
+        engine.simulate(**inputs, seed=1)  # warm-up
+
+        started = time.perf_counter()
+        result = engine.simulate(**inputs, seed=1)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+
+        low, high = analytic_interval(inputs["cost"], inputs["cost_spread"], inputs["quantity"])
+        error = max(np.max(np.abs(result.cost_low / low - 1)), np.max(np.abs(result.cost_high / high - 1)))
+        print(f"{count:>8}{DRAWS:>10}{elapsed_ms:>10.1f}{error:>15.2%}{result.prob_lowest_cost.sum():>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
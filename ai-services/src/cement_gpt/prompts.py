@@ -2,7 +2,9 @@
 Cement GPT Prompts and Context Management
 """
 
-from typing import Dict, Optional, Any
+from typing import Dict, List, Optional, Any
+
+from ..utils.context_ranking import rank_facilities, rank_resources, rank_targets
 
 
 class CementPrompts:
@@ -73,12 +75,13 @@ Use technical terminology appropriately and cite relevant industry practices whe
 """
 
     @staticmethod
-    def get_facility_context(facility_data: Optional[Dict] = None) -> str:
+    def get_facility_context(facility_data: Optional[Dict] = None, question: Optional[str] = None) -> str:
         """
         Get facility-specific or organization-specific context if available
         
         Args:
             facility_data: Optional facility data (single facility or organization)
+            question: Optional user question used to rank which items are shown
             
         Returns:
             str: Facility/organization context
@@ -100,7 +103,9 @@ Use technical terminology appropriately and cite relevant industry practices whe
                 ""
             ]
             
-            for i, facility in enumerate(facilities[:5], 1):  # Show first 5 facilities for context
+            # Show the 5 most relevant facilities for context
+            top_facilities, _ = rank_facilities(facilities, question, limit=5)
+            for i, facility in enumerate(top_facilities, 1):
                 facility_info = [
                     f"FACILITY {i}: {facility.get('name', 'Unnamed')}",
                     f"  - Location: {facility.get('location', {}).get('city', 'N/A')}, {facility.get('location', {}).get('country', 'N/A')}",
@@ -114,15 +119,20 @@ Use technical terminology appropriately and cite relevant industry practices whe
                 context_parts.append(f"... and {facility_count - 5} more facilities")
             
             # Add targets context if available
-            targets_context = CementPrompts._get_targets_context(facility_data)
+            targets_context = CementPrompts._get_targets_context(facility_data, question)
             if targets_context:
                 context_parts.extend(["", targets_context])
             
             # Add resources context if available (for organization-level)
-            resources_context = CementPrompts._get_resources_context(facility_data)
+            resources_context = CementPrompts._get_resources_context(facility_data, question)
             if resources_context:
                 context_parts.extend(["", resources_context])
             
+            # Add industry benchmark positions if available
+            benchmarks_context = CementPrompts._get_benchmarks_context(facility_data)
+            if benchmarks_context:
+                context_parts.extend(["", benchmarks_context])
+            
             return "\n".join(context_parts)
         
         # Handle single facility data (existing logic)
@@ -137,12 +147,12 @@ Use technical terminology appropriately and cite relevant industry practices whe
 """
         
         # Add targets context if available
-        targets_context = CementPrompts._get_targets_context(facility_data)
+        targets_context = CementPrompts._get_targets_context(facility_data, question)
         if targets_context:
             context += "\n" + targets_context
         
         # Add resources context if available
-        resources_context = CementPrompts._get_resources_context(facility_data)
+        resources_context = CementPrompts._get_resources_context(facility_data, question)
         if resources_context:
             context += "\n" + resources_context
         else:
@@ -166,15 +176,56 @@ If your facility had consumption data configured, the calculation would be:
 
 When actual data is configured, calculations will be performed automatically."""
         
+        # Add industry benchmark positions if available
+        benchmarks_context = CementPrompts._get_benchmarks_context(facility_data)
+        if benchmarks_context:
+            context += "\n" + benchmarks_context
+        
         return context
 
     @staticmethod
-    def _get_targets_context(facility_data: Optional[Dict] = None) -> str:
+    def _get_benchmarks_context(facility_data: Optional[Dict] = None) -> str:
+        """
+        Get industry benchmarking context (peer quartiles and the organization's position)
+        
+        Args:
+            facility_data: Context data that may contain industry_benchmarks
+            
+        Returns:
+            str: Formatted benchmarking context or empty string
+        """
+        benchmarks = (facility_data or {}).get("industry_benchmarks")
+        if not benchmarks or not benchmarks.get("metrics"):
+            return ""
+        
+        organization = benchmarks.get("organization")
+        context_parts = [
+            f"INDUSTRY BENCHMARKS ({benchmarks.get('year')}, {benchmarks.get('peer_count')} Indian cement companies):"
+        ]
+        for metric in benchmarks["metrics"].values():
+            direction = "higher is better" if metric.get("higher_is_better") else "lower is better"
+            line = (
+                f"- {metric['label']} ({metric['unit']}, {direction}): "
+                f"median {metric['median']:.4g}, quartiles {metric['q1']:.4g} / {metric['q3']:.4g}"
+            )
+            rank = metric.get("organization_rank")
+            if rank and organization:
+                line += (
+                    f"; {organization}: {rank['value']:.4g} "
+                    f"(better than {rank['performance_percentile']:.0f}% of peers, quartile {rank['quartile']} of 4)"
+                )
+            context_parts.append(line)
+        
+        return "\n".join(context_parts)
+
+    @staticmethod
+    def _get_targets_context(facility_data: Optional[Dict] = None, question: Optional[str] = None) -> str:
         """
         Get targets context from facility data
         
         Args:
             facility_data: Facility or organization data that may contain targets
+            question: Optional user question used to rank targets
             
         Returns:
             str: Formatted targets context or empty string
@@ -194,9 +245,18 @@ When actual data is configured, calculations will be performed automatically."""
             ""
         ]
         
+        # Precomputed trajectory facts, by target ID
+        trajectories = {t.get("target_id"): t for t in facility_data.get("target_trajectories", [])}
+        if trajectories:
+            context_parts.extend([
+                "Progress figures below are precomputed from the recorded data; quote them rather than recalculating.",
+                ""
+            ])
+        
         # Group targets by type for better presentation
         targets_by_type = {}
-        for target in targets[:10]:  # Show first 10 targets
+        top_targets, _ = rank_targets(targets, question, limit=10)  # Show 10 most relevant targets
+        for target in top_targets:
             target_type = target.get("targetType", "general")
             if target_type not in targets_by_type:
                 targets_by_type[target_type] = []
@@ -212,6 +272,7 @@ When actual data is configured, calculations will be performed automatically."""
                     f"    - Target: {target.get('targetValue', 'N/A')} {target.get('unit', '')} by {target.get('targetYear', 'N/A')}",
                     f"    - Status: {target.get('status', 'N/A')}",
                     f"    - Facility: {target.get('facility', {}).get('name', 'Organization-wide') if target.get('facility') else 'Organization-wide'}",
+                    *CementPrompts._format_trajectory(trajectories.get(target.get("id")), target.get("unit", "")),
                     ""
                 ]
                 context_parts.extend(target_info)
@@ -222,12 +283,72 @@ When actual data is configured, calculations will be performed automatically."""
         return "\n".join(context_parts)
 
     @staticmethod
-    def _get_resources_context(facility_data: Optional[Dict] = None) -> str:
+    def _format_quantity(value: float, signed: bool = False) -> str:
+        """Thousands-separated above 1000, four significant digits below"""
+        sign = "+" if signed else ""
+        if abs(value) >= 1000:
+            return f"{value:{sign},.0f}"
+        return f"{value:{sign}.4g}"
+
+    @staticmethod
+    def _format_trajectory(trajectory: Optional[Dict], unit: str) -> List[str]:
+        """
+        Format the precomputed trajectory of one target
+        
+        Args:
+            trajectory: Trajectory dict from the target trajectory engine
+            unit: Target unit
+            
+        Returns:
+            List of context lines (empty if no trajectory)
+        """
+        if not trajectory or trajectory.get("status") == "invalid":
+            return []
+        
+        fmt = CementPrompts._format_quantity
+        required = trajectory["required_annual_change"]
+        rate = f"{abs(required['compound_pct']):.2f}%/yr compound" if required["compound_pct"] is not None else None
+        lines = [
+            f"    - Required pace: {fmt(required['linear'], signed=True)} {unit}/yr linear" + (f", {rate}" if rate else "")
+        ]
+        
+        current = trajectory.get("current")
+        if not current:
+            lines.append(f"    - Trajectory status: {trajectory['status'].upper().replace('_', ' ')} (no current value recorded)")
+            return lines
+        
+        as_of = f" ({current['as_of']})" if current.get("as_of") else ""
+        lines.append(
+            f"    - Current: {fmt(current['value'])} {unit}{as_of}; "
+            f"{trajectory['progress_pct']:.1f}% of the change achieved; gap to target {fmt(trajectory['gap_to_target'], signed=True)} {unit}"
+        )
+        remaining = trajectory.get("remaining_annual_change") or {}
+        if remaining.get("linear") is not None:
+            pace = f"    - Pace needed from now: {fmt(remaining['linear'], signed=True)} {unit}/yr over {remaining['years_left']:.1f} years"
+            if remaining.get("compound_pct") is not None:
+                pace += f" ({abs(remaining['compound_pct']):.2f}%/yr compound)"
+            lines.append(pace)
+        expected = trajectory["expected_now"]["linear"]
+        if expected is not None:
+            lines.append(
+                f"    - Linear pathway value now: {fmt(expected)} {unit} "
+                f"(current is {fmt(trajectory['gap_to_pathway'], signed=True)} {unit} from it)"
+            )
+        if trajectory.get("projected_at_target_year") is not None:
+            lines.append(
+                f"    - Trend projection for {trajectory['target']['year']}: {fmt(trajectory['projected_at_target_year'])} {unit}"
+            )
+        lines.append(f"    - Trajectory status: {trajectory['status'].upper().replace('_', ' ')}")
+        return lines
+
+    @staticmethod
+    def _get_resources_context(facility_data: Optional[Dict] = None, question: Optional[str] = None) -> str:
         """
         Get facility resources and consumption context from facility data
         
         Args:
             facility_data: Facility data that may contain resources information
+            question: Optional user question used to rank resources
             
         Returns:
             str: Formatted resources context or empty string
@@ -259,7 +380,9 @@ When actual data is configured, calculations will be performed automatically."""
         for scope, scope_resources in resources_by_scope.items():
             context_parts.append(f"{scope.upper()} SCOPE RESOURCES:")
             
-            for resource in scope_resources[:5]:  # Show first 5 resources per scope
+            # Show the 5 highest-impact / most relevant resources per scope
+            top_resources, omitted_resources = rank_resources(scope_resources, question, limit=5)
+            for resource in top_resources:
                 resource_info = resource.get("resource", {})
                 recent_consumption = resource.get("recentConsumption", [])
                 
@@ -279,8 +402,8 @@ When actual data is configured, calculations will be performed automatically."""
                 
                 context_parts.append("")
             
-            if len(scope_resources) > 5:
-                context_parts.append(f"    ... and {len(scope_resources) - 5} more {scope} resources")
+            if omitted_resources:
+                context_parts.append(f"    ... and {omitted_resources} more {scope} resources")
                 context_parts.append("")
         
         # Add consumption summary
@@ -296,18 +419,19 @@ When actual data is configured, calculations will be performed automatically."""
         return "\n".join(context_parts)
 
     @staticmethod
-    def get_complete_system_prompt(facility_data: Optional[Dict] = None) -> str:
+    def get_complete_system_prompt(facility_data: Optional[Dict] = None, question: Optional[str] = None) -> str:
         """
         Get the complete system prompt including facility context
         
         Args:
             facility_data: Optional facility data
+            question: Optional user question used to rank context items
             
         Returns:
             str: Complete system prompt
         """
         base_prompt = CementPrompts.get_base_system_prompt()
-        facility_context = CementPrompts.get_facility_context(facility_data)
+        facility_context = CementPrompts.get_facility_context(facility_data, question)
         
         return base_prompt + facility_context
 
@@ -378,7 +502,7 @@ When actual data is configured, calculations will be performed automatically."""
         messages = []
         
         # System message with cement industry context
-        system_prompt = CementPrompts.get_complete_system_prompt(facility_data)
+        system_prompt = CementPrompts.get_complete_system_prompt(facility_data, user_message)
         messages.append({
             "role": "system",
             "content": system_prompt
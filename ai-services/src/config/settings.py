@@ -34,6 +34,48 @@ class Settings(BaseSettings):
     openai_model: str = "gpt-4"
     openai_max_tokens: int = 4000
     openai_temperature: float = 0.7
+    # Request JSON-mode output (response_format=json_object); requires a model that supports it
+    openai_json_mode: bool = False
+    # Outbound OpenAI rate limiting (shared by all callers of the OpenAI client, including
+    # fuel price lookups); concurrency should be at least the 6 facility recommendation
+    # sections generated in parallel, or the fan-out is serialized into waves
+    openai_requests_per_minute: int = 60
+    openai_max_concurrent_requests: int = 8
+    
+    # Fuel price cache (shared by all facilities in a region)
+    fuel_price_cache_path: str = "data/fuel_price_cache.sqlite3"
+    fuel_price_cache_ttl_hours: int = 6
+    cost_refresh_interval_minutes: int = 60
+    # Regions are dropped after this many hours without a registration (0 = never)
+    # and beyond the region limit (0 = unlimited); schedules are per process, so
+    # disable the scheduler on all but one worker when running several
+    cost_refresh_idle_hours: int = 24
+    cost_refresh_max_regions: int = 50
+    cost_refresh_enabled: bool = True
+    
+    # Fuel optimizer snapshots (initialized fuel table + ranges reused by /optimize)
+    optimizer_snapshot_ttl_minutes: int = 30
+    
+    # Emission factor catalog CSV (empty = resources/ef_libraries_with_cost.csv, a copy of the backend seed file)
+    ef_catalog_path: str = ""
+    
+    # Monte Carlo uncertainty of fuel cost and CO2 projections
+    # (10k draws keep the 5th-95th percentile bounds within ~1-2% of a 100k run)
+    uncertainty_draws: int = 10000
+    annual_heat_demand_gj: float = 3000000.0  # kiln fuel heat demand the annual figures are projected for
+    
+    # Smart fuel analysis cache (criteria are bucketed so nearby slider positions share one AI analysis)
+    smart_analysis_cache_ttl_minutes: int = 60
+    smart_analysis_cost_bucket: float = 0.25  # INR/kg
+    smart_analysis_emission_bucket: float = 0.05  # kgCO2e/kg
+    smart_analysis_energy_bucket: float = 0.001  # GJ/kg
+    smart_analysis_background_refinement: bool = False
+    
+    # Industry benchmarking (per-year peer distributions loaded from the backend)
+    benchmark_cache_ttl_minutes: int = 360
+    
+    # Target trajectories (cached per data version, so the TTL only bounds memory)
+    target_trajectory_cache_ttl_minutes: int = 60
     
     # Backend API
     backend_api_url: str = "http://localhost:3000"
@@ -43,10 +85,17 @@ class Settings(BaseSettings):
     # Logging
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+    log_json: bool = True  # one JSON object per line; False uses log_format
+    log_queue_size: int = 10000  # records waiting for the writer thread; overflow is dropped
+    log_sample_rates: str = ""  # e.g. "src.services.cement_agent=0.1" keeps 1 in 10 INFO lines
     
     # Security
     jwt_secret: str = ""
     jwt_algorithm: str = "HS256"
+    jwt_verify_signature: bool = False  # development tokens are decoded without verification
+    # Decoded token claims are reused until the token's exp (or the TTL for tokens without one)
+    jwt_cache_max_entries: int = 4096
+    jwt_cache_ttl_minutes: int = 15
     
     # AI Models
     model_cache_size: int = 100
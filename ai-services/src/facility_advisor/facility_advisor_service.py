@@ -3,17 +3,46 @@ Facility Advisor AI Service
 AI-driven recommendations for cement facility sustainability improvements
 """
 
-import json
+import asyncio
 import logging
+import re
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional
+
+from pydantic import ValidationError
 
 from ..services.openai_client import get_openai_client, OpenAIClient
+from ..utils.context_format import VERBOSE
+from ..utils.json_repair import parse_json_tolerant
 from ..utils.logger import get_logger
 from .prompts import FacilityAdvisorPrompts
+from .schemas import RECOMMENDATION_CATEGORIES, FacilitySummary, Recommendation
+from .stream_parser import RecommendationStreamParser
 
 logger = get_logger(__name__)
 
+# Fan-out mode: smaller per-section completions
+FAN_OUT_RECOMMENDATIONS_PER_SECTION = "1-2"
+FAN_OUT_MAX_TOKENS = 1500
+PRIORITY_ORDER = {"High": 0, "Medium": 1, "Low": 2}
+
+
+def _normalize_title(title: Any) -> str:
+    """Normalize a recommendation title for duplicate detection"""
+    return " ".join(re.findall(r"[a-z0-9]+", str(title or "").lower()))
+
+
+def _unique(items: Iterable[Any]) -> List[Any]:
+    """Keep the first occurrence of each item, preserving order"""
+    seen = set()
+    unique_items = []
+    for item in items:
+        key = _normalize_title(item) if isinstance(item, str) else repr(item)
+        if key not in seen:
+            seen.add(key)
+            unique_items.append(item)
+    return unique_items
+
 
 class FacilityAdvisorService:
     """
@@ -34,7 +63,9 @@ class FacilityAdvisorService:
     async def generate_recommendations(
         self, 
         facility_data: Dict,
-        focus_areas: Optional[List[str]] = None
+        focus_areas: Optional[List[str]] = None,
+        context_format: str = VERBOSE,
+        fan_out: bool = False
     ) -> Dict[str, Any]:
         """
         Generate AI-driven recommendations for a facility
@@ -42,6 +73,8 @@ class FacilityAdvisorService:
         Args:
             facility_data: Complete facility data including resources, emissions, targets
             focus_areas: Optional list of specific focus areas to prioritize
+            context_format: Facility context format ("verbose" bullets or "compact" tables)
+            fan_out: Generate each focus area in a separate concurrent call and merge
             
         Returns:
             Dict containing recommendations and analysis
@@ -53,26 +86,17 @@ class FacilityAdvisorService:
             if not openai_client.is_available():
                 return await self._generate_demo_recommendations(facility_data)
             
-            # Build the complete prompt with facility context
-            system_prompt = self.prompts.get_complete_system_prompt(facility_data, focus_areas)
+            if fan_out:
+                return await self._generate_fan_out(openai_client, facility_data, focus_areas, context_format)
             
-            # Generate recommendations using OpenAI
-            messages = [
-                {
-                    "role": "system",
-                    "content": system_prompt
-                },
-                {
-                    "role": "user", 
-                    "content": "Generate sustainability improvement recommendations for this facility based on the provided data."
-                }
-            ]
+            messages = self._build_messages(facility_data, focus_areas, context_format)
             
             # Use higher temperature for more creative recommendations
             result = await openai_client.chat_completion(
                 messages, 
                 temperature=0.7,
-                max_tokens=4000
+                max_tokens=4000,
+                **openai_client.json_response_format()
             )
             
             # Parse the AI response
@@ -93,6 +117,7 @@ class FacilityAdvisorService:
                 "generated_at": datetime.utcnow().isoformat() + "Z",
                 "ai_model": result.get('model', 'unknown'),
                 "focus_areas": focus_areas or [],
+                "context_format": context_format,
                 "data_sources": self._get_data_sources_summary(facility_data),
                 "success": True
             })
@@ -105,9 +130,290 @@ class FacilityAdvisorService:
             logger.error(f"Error generating facility recommendations: {e}")
             return await self._generate_error_response(str(e), facility_data)
     
+    async def _generate_fan_out(
+        self,
+        openai_client: OpenAIClient,
+        facility_data: Dict,
+        focus_areas: Optional[List[str]],
+        context_format: str
+    ) -> Dict[str, Any]:
+        """
+        Generate recommendations per focus area concurrently and merge the results
+        
+        Each section is a smaller completion, so wall-clock latency is close
+        to that of the slowest section rather than one long generation. All
+        calls go through the OpenAI client's rate limiter.
+        
+        Args:
+            openai_client: Available OpenAI client
+            facility_data: Complete facility data
+            focus_areas: Sections to generate (defaults to every recommendation category)
+            context_format: Facility context format
+            
+        Returns:
+            Dict containing merged recommendations and per-section metadata
+        """
+        sections = self._fan_out_sections(focus_areas)
+        
+        async def generate_section(section: str) -> Dict[str, Any]:
+            messages = self._build_messages(
+                facility_data, focus_areas, context_format,
+                section=section, recommendation_count=FAN_OUT_RECOMMENDATIONS_PER_SECTION
+            )
+            result = await openai_client.chat_completion(
+                messages,
+                temperature=0.7,
+                max_tokens=FAN_OUT_MAX_TOKENS,
+                **openai_client.json_response_format()
+            )
+            parsed = await self._parse_ai_response(result.get('response', ''))
+            parsed["ai_model"] = result.get('model', 'unknown')
+            return parsed
+        
+        started = datetime.utcnow()
+        results = await asyncio.gather(*(generate_section(section) for section in sections), return_exceptions=True)
+        
+        section_results = []
+        section_status = {}
+        for section, result in zip(sections, results):
+            if isinstance(result, Exception):
+                logger.error(f"Fan-out section '{section}' failed: {result}")
+                section_status[section] = {"success": False, "recommendations": 0, "error": str(result)}
+                continue
+            section_results.append(result)
+            section_status[section] = {
+                "success": not result.get("parse_error"),
+                "recommendations": len(result.get("recommendations", []))
+            }
+        
+        if not section_results:
+            raise Exception("All fan-out sections failed")
+        
+        merged = self._merge_section_results(section_results)
+        merged.update({
+            "facility_id": facility_data.get('facility', {}).get('id'),
+            "facility_name": facility_data.get('facility', {}).get('name'),
+            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "ai_model": section_results[0].get("ai_model", "unknown"),
+            "focus_areas": focus_areas or [],
+            "context_format": context_format,
+            "generation_mode": "fan_out",
+            "sections": section_status,
+            "generation_seconds": round((datetime.utcnow() - started).total_seconds(), 2),
+            "data_sources": self._get_data_sources_summary(facility_data),
+            "success": True
+        })
+        
+        logger.info(f"Generated {len(merged['recommendations'])} fan-out recommendations across {len(sections)} sections for facility: {facility_data.get('facility', {}).get('name', 'Unknown')}")
+        return merged
+    
+    def _fan_out_sections(self, focus_areas: Optional[List[str]]) -> List[str]:
+        """Map requested focus areas onto recommendation categories (all categories by default)"""
+        if not focus_areas:
+            return list(RECOMMENDATION_CATEGORIES)
+        by_name = {category.lower(): category for category in RECOMMENDATION_CATEGORIES}
+        sections = []
+        for area in focus_areas:
+            section = by_name.get(area.strip().lower(), area.strip())
+            if section and section not in sections:
+                sections.append(section)
+        return sections
+    
+    def _merge_section_results(self, section_results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Merge per-section responses, dropping duplicate recommendations
+        
+        Args:
+            section_results: Parsed section responses in section order
+            
+        Returns:
+            Dict with merged recommendations, facility summary and next steps
+        """
+        recommendations = []
+        seen_titles = set()
+        seen_ids = set()
+        for result in section_results:
+            for recommendation in result.get("recommendations", []):
+                if not isinstance(recommendation, dict):
+                    continue
+                title_key = _normalize_title(recommendation.get("title"))
+                if title_key and title_key in seen_titles:
+                    continue
+                seen_titles.add(title_key)
+                rec_id = recommendation.get("id") or f"rec_{len(recommendations) + 1}"
+                if rec_id in seen_ids:
+                    rec_id = f"{rec_id}_{len(recommendations) + 1}"
+                seen_ids.add(rec_id)
+                recommendations.append({**recommendation, "id": rec_id})
+        
+        recommendations.sort(key=lambda rec: (
+            PRIORITY_ORDER.get(str(rec.get("priority", "")).capitalize(), len(PRIORITY_ORDER)),
+            -(rec.get("confidence_score") if isinstance(rec.get("confidence_score"), (int, float)) else 0)
+        ))
+        
+        summaries = [result.get("facility_summary") or {} for result in section_results]
+        facility_summary = {
+            "current_performance": next((s.get("current_performance") for s in summaries if s.get("current_performance")), ""),
+            "key_strengths": _unique(item for s in summaries for item in s.get("key_strengths", [])),
+            "main_challenges": _unique(item for s in summaries for item in s.get("main_challenges", [])),
+            "overall_potential": next((s.get("overall_potential") for s in summaries if s.get("overall_potential")), "")
+        }
+        next_steps = _unique(step for result in section_results for step in result.get("next_steps", []))
+        
+        return {
+            "recommendations": recommendations,
+            "facility_summary": facility_summary,
+            "next_steps": next_steps
+        }
+    
+    async def stream_recommendations(
+        self,
+        facility_data: Dict,
+        focus_areas: Optional[List[str]] = None,
+        context_format: str = VERBOSE
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream recommendations as soon as each one is generated and validated
+        
+        Events are dicts with an "event" name and "data" payload:
+        "recommendation" (one validated recommendation), "rejected" (an item
+        that failed schema validation), "summary" (facility summary, next
+        steps and metadata), "error" and finally "done".
+        
+        Args:
+            facility_data: Complete facility data including resources, emissions, targets
+            focus_areas: Optional list of specific focus areas to prioritize
+            context_format: Facility context format ("verbose" bullets or "compact" tables)
+            
+        Yields:
+            Dict[str, Any]: Stream events in generation order
+        """
+        emitted = 0
+        rejected = 0
+        model = "demo-mode"
+        
+        try:
+            openai_client = await self._get_openai_client()
+            
+            if not openai_client.is_available():
+                demo = await self._generate_demo_recommendations(facility_data)
+                for item in demo["recommendations"]:
+                    emitted += 1
+                    yield {"event": "recommendation", "data": item}
+                yield {
+                    "event": "summary",
+                    "data": {
+                        "facility_summary": demo["facility_summary"],
+                        "next_steps": demo["next_steps"],
+                        **self._stream_metadata(facility_data, focus_areas, context_format, model, emitted, rejected),
+                        "demo_mode": True
+                    }
+                }
+                yield {"event": "done", "data": {"recommendations": emitted}}
+                return
+            
+            model = openai_client.model
+            messages = self._build_messages(facility_data, focus_areas, context_format)
+            parser = RecommendationStreamParser()
+            
+            async for chunk in openai_client.stream_chat_completion(
+                messages,
+                temperature=0.7,
+                max_tokens=4000,
+                **openai_client.json_response_format()
+            ):
+                for item in parser.feed(chunk):
+                    try:
+                        recommendation = Recommendation.model_validate(item)
+                    except ValidationError as e:
+                        rejected += 1
+                        logger.warning(f"Streamed recommendation failed validation: {e.error_count()} errors")
+                        yield {
+                            "event": "rejected",
+                            "data": {"title": item.get("title"), "errors": e.errors(include_url=False)}
+                        }
+                        continue
+                    emitted += 1
+                    yield {"event": "recommendation", "data": recommendation.model_dump(exclude_none=True)}
+            
+            rejected += parser.items_failed
+            document = parser.finish()
+            try:
+                facility_summary = FacilitySummary.model_validate(
+                    document.get("facility_summary") or {}
+                ).model_dump(exclude_none=True)
+            except ValidationError:
+                facility_summary = {}
+            
+            yield {
+                "event": "summary",
+                "data": {
+                    "facility_summary": facility_summary,
+                    "next_steps": document.get("next_steps", []),
+                    **self._stream_metadata(facility_data, focus_areas, context_format, model, emitted, rejected)
+                }
+            }
+            
+            logger.info(f"Streamed {emitted} recommendations ({rejected} rejected) for facility: {facility_data.get('facility', {}).get('name', 'Unknown')}")
+            yield {"event": "done", "data": {"recommendations": emitted}}
+            
+        except Exception as e:
+            logger.error(f"Error streaming facility recommendations: {e}")
+            yield {"event": "error", "data": {"error": str(e), "recommendations": emitted}}
+    
+    def _build_messages(
+        self,
+        facility_data: Dict,
+        focus_areas: Optional[List[str]],
+        context_format: str,
+        section: Optional[str] = None,
+        recommendation_count: str = "4-6"
+    ) -> List[Dict[str, str]]:
+        """Build the chat messages for a recommendation request"""
+        # Build the complete prompt with facility context
+        system_prompt = self.prompts.get_complete_system_prompt(
+            facility_data, focus_areas, context_format, section, recommendation_count
+        )
+        
+        return [
+            {
+                "role": "system",
+                "content": system_prompt
+            },
+            {
+                "role": "user", 
+                "content": "Generate sustainability improvement recommendations for this facility based on the provided data."
+            }
+        ]
+    
+    def _stream_metadata(
+        self,
+        facility_data: Dict,
+        focus_areas: Optional[List[str]],
+        context_format: str,
+        model: str,
+        emitted: int,
+        rejected: int
+    ) -> Dict[str, Any]:
+        """Metadata attached to the summary event of a recommendation stream"""
+        return {
+            "facility_id": facility_data.get('facility', {}).get('id'),
+            "facility_name": facility_data.get('facility', {}).get('name'),
+            "generated_at": datetime.utcnow().isoformat() + "Z",
+            "ai_model": model,
+            "focus_areas": focus_areas or [],
+            "context_format": context_format,
+            "recommendation_count": emitted,
+            "rejected_count": rejected,
+            "data_sources": self._get_data_sources_summary(facility_data)
+        }
+    
     async def _parse_ai_response(self, ai_response: str) -> Dict[str, Any]:
         """
-        Parse the AI response and extract structured recommendations with robust JSON cleaning
+        Parse the AI response and extract structured recommendations
+        
+        Malformed JSON (code fences, trailing commas, unquoted keys, single
+        quotes, truncated output) is repaired in a single pass before decoding.
         
         Args:
             ai_response: Raw AI response string
@@ -116,14 +422,7 @@ class FacilityAdvisorService:
             Parsed recommendations data
         """
         try:
-            # Extract JSON content from response
-            json_content = self._extract_json_content(ai_response)
-            
-            # Clean common JSON syntax errors
-            cleaned_json = self._clean_json_syntax(json_content)
-            
-            # Parse the cleaned JSON
-            parsed_data = json.loads(cleaned_json)
+            parsed_data = parse_json_tolerant(ai_response)
             
             # Validate structure
             if not isinstance(parsed_data, dict) or 'recommendations' not in parsed_data:
@@ -136,13 +435,6 @@ class FacilityAdvisorService:
             logger.error(f"Error parsing AI response: {e}")
             logger.error(f"Raw response (first 500 chars): {ai_response[:500]}")
             
-            # Try manual extraction as last resort (but still from AI content)
-            manual_data = self._extract_recommendations_manually(ai_response)
-            if manual_data and manual_data.get('recommendations'):
-                logger.info(f"Successfully extracted {len(manual_data['recommendations'])} recommendations manually from AI response")
-                return manual_data
-            
-            # Only return empty if absolutely nothing can be extracted
             return {
                 "recommendations": [],
                 "facility_summary": {
@@ -395,126 +687,6 @@ class FacilityAdvisorService:
         else:
             return "Limited"
 
-    def _extract_json_content(self, ai_response: str) -> str:
-        """Extract JSON content from AI response, handling various formats"""
-        response = ai_response.strip()
-        
-        # Try to find JSON in markdown code blocks first
-        if '```json' in response:
-            start = response.find('```json') + 7
-            end = response.find('```', start)
-            if end != -1:
-                return response[start:end].strip()
-        
-        # Try to find JSON object directly
-        if response.startswith('{'):
-            return response
-        
-        # Look for JSON object anywhere in the response
-        start_idx = response.find('{')
-        if start_idx != -1:
-            # Find the matching closing brace
-            brace_count = 0
-            end_idx = start_idx
-            for i, char in enumerate(response[start_idx:], start_idx):
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_idx = i + 1
-                        break
-            
-            if brace_count == 0:
-                return response[start_idx:end_idx]
-        
-        return response
-
-    def _clean_json_syntax(self, json_str: str) -> str:
-        """Clean common JSON syntax errors that AI models make"""
-        import re
-        
-        # Remove any leading/trailing whitespace
-        cleaned = json_str.strip()
-        
-        # Fix trailing commas in arrays and objects
-        cleaned = re.sub(r',(\s*[}\]])', r'\1', cleaned)
-        
-        # Fix missing quotes around property names (more careful approach)
-        cleaned = re.sub(r'(\n\s*)([a-zA-Z_][a-zA-Z0-9_]*)(\s*:)', r'\1"\2"\3', cleaned)
-        
-        # Fix single quotes to double quotes
-        cleaned = cleaned.replace("'", '"')
-        
-        # Remove any trailing commas before closing braces/brackets
-        cleaned = re.sub(r',\s*}', '}', cleaned)
-        cleaned = re.sub(r',\s*]', ']', cleaned)
-        
-        # Fix any double commas
-        cleaned = re.sub(r',,+', ',', cleaned)
-        
-        return cleaned
-
-    def _extract_recommendations_manually(self, ai_response: str) -> Dict[str, Any]:
-        """Manually extract recommendations from AI response when JSON parsing fails"""
-        try:
-            import re
-            
-            # Look for recommendation-like content in the response
-            recommendations = []
-            
-            # Try to find patterns that look like recommendations
-            title_pattern = r'"title":\s*"([^"]+)"'
-            description_pattern = r'"description":\s*"([^"]+)"'
-            category_pattern = r'"category":\s*"([^"]+)"'
-            
-            titles = re.findall(title_pattern, ai_response)
-            descriptions = re.findall(description_pattern, ai_response)
-            categories = re.findall(category_pattern, ai_response)
-            
-            # If we found some structured content, try to build recommendations
-            for i, title in enumerate(titles):
-                rec = {
-                    "id": f"extracted_{i+1}",
-                    "priority": "High",
-                    "category": categories[i] if i < len(categories) else "Process Optimization",
-                    "title": title,
-                    "description": descriptions[i] if i < len(descriptions) else "AI-generated recommendation",
-                    "cement_process": "Pyroprocessing/Kiln",  # Default
-                    "rationale": "Extracted from AI analysis",
-                    "impact": {
-                        "emission_reduction_percentage": 10,
-                        "cost_savings_annual": "₹1,00,00,000/year",
-                        "current_annual_expense": "₹8,00,00,000/year",
-                        "cost_comparison": "Save ₹1,00,00,000/year vs current ₹8,00,00,000/year expenses (12.5% reduction)"
-                    },
-                    "implementation": {
-                        "timeline": "6-12 months",
-                        "investment_required": "₹2,00,00,000",
-                        "complexity": "Medium"
-                    },
-                    "confidence_score": 80
-                }
-                recommendations.append(rec)
-            
-            if recommendations:
-                return {
-                    "recommendations": recommendations,
-                    "facility_summary": {
-                        "current_performance": "Extracted from AI analysis",
-                        "key_strengths": ["AI insights captured"],
-                        "main_challenges": ["JSON parsing issues"],
-                        "overall_potential": "Good potential identified"
-                    },
-                    "next_steps": ["Implement extracted recommendations"]
-                }
-            
-            return None
-            
-        except Exception as e:
-            logger.error(f"Error in manual extraction: {e}")
-            return None
-
 
 # Global service instance
 facility_advisor_service = FacilityAdvisorService()
@@ -2,8 +2,21 @@
 Facility Advisor Prompts and Context Management
 """
 
+import json
 from typing import Dict, Optional, Any, List
 
+from ..utils.context_ranking import focus_text, rank_emission_factors, rank_targets
+from ..utils.context_format import (
+    COMPACT,
+    VERBOSE,
+    month_key,
+    normalize_unit,
+    render_table,
+    round_sig,
+    to_number,
+    validate_context_format,
+)
+
 
 class FacilityAdvisorPrompts:
     """
@@ -91,16 +104,76 @@ ALWAYS provide:
 """
 
     @staticmethod
-    def get_facility_analysis_context(facility_data: Dict) -> str:
+    def _parse_location(facility_info: Dict) -> Dict:
+        """
+        Extract the location dict from facility info (stored as JSON string or dict)
+        
+        Args:
+            facility_info: Basic facility information
+            
+        Returns:
+            Dict: Location details (empty if unavailable)
+        """
+        location_data = facility_info.get('location', {})
+        if isinstance(location_data, str):
+            try:
+                location_data = json.loads(location_data)
+            except (TypeError, ValueError):
+                location_data = {}
+        return location_data if isinstance(location_data, dict) else {}
+
+    @staticmethod
+    def _select_emission_factors(
+        emission_factors: List[Dict],
+        focus_areas: Optional[List[str]] = None,
+        country: Optional[str] = None,
+        per_category: int = 3
+    ) -> Dict[str, Dict[str, List[Dict]]]:
+        """
+        Group the emission factor inventory by scope/category and keep the most relevant factors
+        
+        Args:
+            emission_factors: Available emission factors
+            focus_areas: Optional focus areas used for relevance ranking
+            country: Facility country used for regional availability ranking
+            per_category: Maximum factors kept per category
+            
+        Returns:
+            Dict mapping scope -> category -> selected factors
+        """
+        factors_by_scope: Dict[str, Dict[str, List[Dict]]] = {}
+        for factor in emission_factors:
+            resource = factor.get('resource', {})
+            scope = resource.get('scope', 'unknown')
+            category = resource.get('category', 'unknown')
+            factors_by_scope.setdefault(scope, {}).setdefault(category, []).append(factor)
+        
+        question = focus_text(focus_areas)
+        for categories in factors_by_scope.values():
+            for category, factors in categories.items():
+                categories[category], _ = rank_emission_factors(factors, question, per_category, country)
+        return factors_by_scope
+
+    @staticmethod
+    def get_facility_analysis_context(
+        facility_data: Dict,
+        context_format: str = VERBOSE,
+        focus_areas: Optional[List[str]] = None
+    ) -> str:
         """
         Build comprehensive facility analysis context
         
         Args:
             facility_data: Complete facility data including resources, emissions, targets, etc.
+            context_format: "verbose" (bullet lines) or "compact" (CSV-like tables)
+            focus_areas: Optional focus areas used to rank which targets and factors are shown
             
         Returns:
             str: Detailed facility context for AI analysis
         """
+        if validate_context_format(context_format) == COMPACT:
+            return FacilityAdvisorPrompts.get_compact_analysis_context(facility_data, focus_areas=focus_areas)
+        
         context_parts = [
             "\n🏭 FACILITY ANALYSIS CONTEXT:",
             "="*50
@@ -110,13 +183,7 @@ ALWAYS provide:
         facility_info = facility_data.get('facility', {})
         
         # Extract location details for regional context
-        location_data = facility_info.get('location', {})
-        if isinstance(location_data, str):
-            try:
-                import json
-                location_data = json.loads(location_data)
-            except:
-                location_data = {}
+        location_data = FacilityAdvisorPrompts._parse_location(facility_info)
         
         facility_city = location_data.get('city', 'N/A')
         facility_state = location_data.get('state', 'N/A') 
@@ -176,7 +243,8 @@ ALWAYS provide:
             context_parts.extend([
                 f"\nSUSTAINABILITY TARGETS ({len(targets)} active):",
             ])
-            for target in targets[:5]:  # Show first 5 targets
+            top_targets, _ = rank_targets(targets, focus_text(focus_areas), limit=5)  # Show 5 most relevant targets
+            for target in top_targets:
                 name = target.get('name', 'Unnamed Target')
                 target_type = target.get('target_type', 'N/A')
                 baseline = target.get('baseline_value', 'N/A')
@@ -246,24 +314,16 @@ ALWAYS provide:
                 f"\nAVAILABLE EMISSION FACTORS INVENTORY ({len(emission_factors)} factors):",
             ])
             
-            # Group by scope and category
-            factors_by_scope = {}
-            for factor in emission_factors:
-                resource = factor.get('resource', {})
-                scope = resource.get('scope', 'unknown')
-                category = resource.get('category', 'unknown')
-                
-                if scope not in factors_by_scope:
-                    factors_by_scope[scope] = {}
-                if category not in factors_by_scope[scope]:
-                    factors_by_scope[scope][category] = []
-                factors_by_scope[scope][category].append(factor)
+            # Group by scope and category, keeping the most relevant factors per category
+            factors_by_scope = FacilityAdvisorPrompts._select_emission_factors(
+                emission_factors, focus_areas, facility_country
+            )
             
             for scope, categories in factors_by_scope.items():
                 context_parts.append(f"\n{scope.upper()} SCOPE FACTORS:")
                 for category, factors in categories.items():
                     context_parts.append(f"  {category.title()}:")
-                    for factor in factors[:3]:  # Show first 3 factors per category
+                    for factor in factors:
                         resource = factor.get('resource', {})
                         factor_value = factor.get('emissionFactor', 0)
                         factor_unit = factor.get('emissionFactorUnit', '')
@@ -288,19 +348,186 @@ ALWAYS provide:
         return "\n".join(context_parts)
     
     @staticmethod
-    def get_recommendation_prompt(facility_data: Dict, focus_areas: Optional[List[str]] = None) -> str:
+    def get_compact_analysis_context(
+        facility_data: Dict,
+        sig_figs: int = 3,
+        focus_areas: Optional[List[str]] = None
+    ) -> str:
+        """
+        Build the facility analysis context as compact CSV-like tables
+        
+        Carries the same facts as the verbose context, but renders time series and
+        resource lists as one header row plus one row per record, with units
+        normalized (kgCO2e -> tCO2e, MJ -> GJ) and values rounded to significant figures.
+        
+        Args:
+            facility_data: Complete facility data including resources, emissions, targets, etc.
+            sig_figs: Significant figures kept for numeric values
+            focus_areas: Optional focus areas used to rank which targets and factors are shown
+            
+        Returns:
+            str: Compact facility context for AI analysis
+        """
+        def sig(value: Any) -> str:
+            return round_sig(value, sig_figs)
+        
+        def scaled(value: Any, unit: str) -> str:
+            return sig(normalize_unit(value, unit)[0])
+        
+        facility_info = facility_data.get('facility', {})
+        location_data = FacilityAdvisorPrompts._parse_location(facility_info)
+        facility_state = location_data.get('state', 'N/A')
+        facility_country = location_data.get('country', 'N/A')
+        
+        context_parts = [
+            "\nFACILITY ANALYSIS CONTEXT (compact tables: header row then one row per record; "
+            "t=tonnes, tCO2e=tonnes CO2e, GJ=gigajoules, costs in INR):",
+            f"facility={facility_info.get('name', 'N/A')}; status={facility_info.get('status', 'N/A')}; "
+            f"location={location_data.get('address', 'N/A')}; city={location_data.get('city', 'N/A')}; "
+            f"state={facility_state}; country={facility_country}; "
+            f"organization={facility_info.get('organizationId', 'N/A')}"
+        ]
+        
+        stats = facility_info.get('statistics', {})
+        if stats:
+            context_parts.append(
+                f"current_year: emissions_tCO2e={scaled(stats.get('currentYearEmissions', 0), 'kgCO2e')}; "
+                f"production_t={sig(stats.get('currentYearProduction', 0))}; "
+                f"intensity_kgCO2e_per_t={sig(stats.get('carbonIntensity', 0))}; "
+                f"resources={stats.get('configuredResourcesCount', 0)}; "
+                f"targets={stats.get('targetsCount', 0)}"
+            )
+        
+        recent_production = facility_data.get('recent_production', [])
+        context_parts.extend(render_table(
+            "\nPRODUCTION:",
+            ["month", "production_t"],
+            [[month_key(prod), sig(prod.get('production', 0))] for prod in recent_production[:6]]
+        ))
+        
+        recent_emissions = facility_data.get('recent_emissions', [])
+        context_parts.extend(render_table(
+            "\nEMISSIONS:",
+            ["month", "scope", "tCO2e", "GJ"],
+            [
+                [
+                    month_key(emission),
+                    emission.get('scope', ''),
+                    scaled(emission.get('total_emissions', emission.get('totalEmissions', 0)), 'kgCO2e'),
+                    scaled(emission.get('total_energy', emission.get('totalEnergy', 0)), 'MJ'),
+                ]
+                for emission in recent_emissions[:6]
+            ]
+        ))
+        
+        targets = facility_data.get('targets', [])
+        context_parts.extend(render_table(
+            f"\nTARGETS ({len(targets)} active):",
+            ["name", "type", "baseline", "target", "unit", "target_year", "status"],
+            [
+                [
+                    target.get('name', 'Unnamed Target'),
+                    target.get('target_type', ''),
+                    sig(target.get('baseline_value')),
+                    sig(target.get('target_value')),
+                    target.get('unit', ''),
+                    target.get('target_year', ''),
+                    target.get('status', ''),
+                ]
+                for target in rank_targets(targets, focus_text(focus_areas), limit=5)[0]
+            ]
+        ))
+        
+        resources = facility_data.get('facility_resources', [])
+        resource_rows = []
+        for resource in resources:
+            resource_info = resource.get('resource', {})
+            recent_consumption = resource.get('recentConsumption', [])
+            latest = recent_consumption[0] if recent_consumption else {}
+            
+            consumption = to_number(latest.get('consumption')) or 0
+            emission_factor_info = resource.get('emissionFactor', {})
+            approximate_cost = 0
+            if isinstance(emission_factor_info, dict):
+                approximate_cost = to_number(emission_factor_info.get('approximateCost')) or 0
+            monthly_cost = consumption * approximate_cost if approximate_cost > 0 and consumption > 0 else None
+            
+            resource_rows.append([
+                resource_info.get('scope', 'unknown'),
+                resource_info.get('name', 'Unknown Resource'),
+                resource_info.get('category', ''),
+                month_key(latest) if latest else "",
+                sig(latest.get('consumption')) if latest else "",
+                latest.get('consumption_unit', ''),
+                scaled(latest.get('total_emissions'), 'kgCO2e') if latest else "",
+                scaled(latest.get('total_energy'), 'MJ') if latest else "",
+                sig(monthly_cost),
+            ])
+        context_parts.extend(render_table(
+            f"\nRESOURCES ({len(resources)} configured; blank month = no recent consumption):",
+            ["scope", "resource", "category", "month", "consumption", "unit", "tCO2e", "GJ", "cost_inr_per_month"],
+            resource_rows
+        ))
+        
+        emission_factors = facility_data.get('available_emission_factors', [])
+        factor_rows = []
+        factors_by_scope = FacilityAdvisorPrompts._select_emission_factors(
+            emission_factors, focus_areas, facility_country
+        )
+        for scope, categories in factors_by_scope.items():
+            for category, factors in categories.items():
+                for factor in factors:
+                    resource = factor.get('resource', {})
+                    library = factor.get('library', {})
+                    factor_rows.append([
+                        scope,
+                        category,
+                        resource.get('name', 'Unknown'),
+                        sig(factor.get('emissionFactor')),
+                        factor.get('emissionFactorUnit', ''),
+                        factor.get('availabilityScore', ''),
+                        sig(factor.get('approximateCost')),
+                        factor.get('costUnit', ''),
+                        library.get('name', ''),
+                        library.get('year', ''),
+                        library.get('region', 'Global'),
+                    ])
+        context_parts.extend(render_table(
+            f"\nEMISSION FACTORS ({len(emission_factors)} available; availability 0-100; "
+            f"region India = locally available in {facility_state}):",
+            ["scope", "category", "resource", "factor", "unit", "availability", "cost_inr", "cost_unit",
+             "library", "year", "region"],
+            factor_rows
+        ))
+        
+        return "\n".join(context_parts)
+    
+    @staticmethod
+    def get_recommendation_prompt(
+        facility_data: Dict,
+        focus_areas: Optional[List[str]] = None,
+        section: Optional[str] = None,
+        recommendation_count: str = "4-6"
+    ) -> str:
         """
         Build the recommendation generation prompt
         
         Args:
             facility_data: Complete facility data
             focus_areas: Optional list of specific focus areas for recommendations
+            section: Restrict output to a single recommendation category (fan-out mode)
+            recommendation_count: Number of recommendations to request (e.g. "4-6")
             
         Returns:
             str: Specific prompt for generating recommendations
         """
         focus_filter = ""
-        if focus_areas:
+        if section:
+            focus_filter = (
+                f"\nSECTION: Generate recommendations ONLY in the \"{section}\" category. "
+                f"Other categories are covered separately."
+            )
+        elif focus_areas:
             focus_filter = f"\nFOCUS AREAS: Please prioritize recommendations in these areas: {', '.join(focus_areas)}"
         
         return f"""
@@ -332,7 +559,7 @@ OUTPUT FORMAT (STRICT JSON ONLY):
 IMPORTANT: Respond with ONLY the JSON below. No extra text, no markdown, no explanations.
 Ensure every opening bracket/brace has a closing one, every quote is properly closed, and no trailing commas.
 
-Provide 4-6 prioritized recommendations in this EXACT JSON structure:
+Provide {recommendation_count} prioritized recommendations in this EXACT JSON structure:
 
 {{
   "recommendations": [
@@ -400,19 +627,32 @@ Remember: Only recommend actions that are technically feasible and economically
 """
     
     @staticmethod
-    def get_complete_system_prompt(facility_data: Dict, focus_areas: Optional[List[str]] = None) -> str:
+    def get_complete_system_prompt(
+        facility_data: Dict,
+        focus_areas: Optional[List[str]] = None,
+        context_format: str = VERBOSE,
+        section: Optional[str] = None,
+        recommendation_count: str = "4-6"
+    ) -> str:
         """
         Get the complete system prompt including facility context
         
         Args:
             facility_data: Complete facility data
             focus_areas: Optional focus areas for recommendations
+            context_format: Facility context format ("verbose" or "compact")
+            section: Restrict output to a single recommendation category (fan-out mode)
+            recommendation_count: Number of recommendations to request
             
         Returns:
             str: Complete system prompt
         """
         base_prompt = FacilityAdvisorPrompts.get_base_system_prompt()
-        facility_context = FacilityAdvisorPrompts.get_facility_analysis_context(facility_data)
-        recommendation_prompt = FacilityAdvisorPrompts.get_recommendation_prompt(facility_data, focus_areas)
+        facility_context = FacilityAdvisorPrompts.get_facility_analysis_context(
+            facility_data, context_format, [section] if section else focus_areas
+        )
+        recommendation_prompt = FacilityAdvisorPrompts.get_recommendation_prompt(
+            facility_data, focus_areas, section, recommendation_count
+        )
         
         return base_prompt + facility_context + "\n" + recommendation_prompt
@@ -0,0 +1,90 @@
+"""
+Facility Advisor recommendation schemas
+Pydantic models mirroring the JSON structure requested in the recommendation prompt
+"""
+
+from typing import List, Literal, Optional, Union
+
+from pydantic import BaseModel, ConfigDict, Field, field_validator
+
+RECOMMENDATION_CATEGORIES = (
+    "Alternative Fuels",
+    "Energy Efficiency",
+    "Process Optimization",
+    "Raw Materials",
+    "Digital Technology",
+    "Waste Management",
+)
+
+Number = Union[int, float]
+
+
+class RecommendationImpact(BaseModel):
+    """Expected impact of a recommendation"""
+    model_config = ConfigDict(extra="allow")
+
+    emission_reduction_percentage: Optional[Number] = None
+    emission_reduction_absolute: Optional[str] = None
+    energy_savings_percentage: Optional[Number] = None
+    cost_savings_annual: Optional[str] = None
+    current_annual_expense: Optional[str] = None
+    cost_comparison: Optional[str] = None
+
+
+class RecommendationImplementation(BaseModel):
+    """Implementation plan of a recommendation"""
+    model_config = ConfigDict(extra="allow")
+
+    timeline: Optional[str] = None
+    investment_required: Optional[str] = None
+    complexity: Optional[str] = None
+    prerequisites: List[str] = Field(default_factory=list)
+    milestones: List[str] = Field(default_factory=list)
+
+
+class AlternativeFuelDetails(BaseModel):
+    """Fuel specifics for Alternative Fuels recommendations"""
+    model_config = ConfigDict(extra="allow")
+
+    fuel_type: Optional[str] = None
+    emission_factor: Optional[str] = None
+    heat_content: Optional[str] = None
+    availability: Optional[str] = None
+    sourcing_strategy: Optional[str] = None
+    local_suppliers: Optional[str] = None
+
+
+class Recommendation(BaseModel):
+    """A single facility improvement recommendation"""
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[str] = None
+    priority: Literal["High", "Medium", "Low"] = "Medium"
+    category: str
+    title: str = Field(..., min_length=1)
+    description: str = Field(..., min_length=1)
+    cement_process: Optional[str] = None
+    rationale: Optional[str] = None
+    impact: RecommendationImpact = Field(default_factory=RecommendationImpact)
+    implementation: RecommendationImplementation = Field(default_factory=RecommendationImplementation)
+    confidence_score: Optional[Number] = Field(None, ge=0, le=100)
+    risk_factors: List[str] = Field(default_factory=list)
+    success_metrics: List[str] = Field(default_factory=list)
+    industry_benchmark: Optional[str] = None
+    alternative_fuel_details: Optional[AlternativeFuelDetails] = None
+
+    @field_validator("priority", mode="before")
+    @classmethod
+    def normalize_priority(cls, value):
+        """Accept priorities in any letter case"""
+        return value.strip().capitalize() if isinstance(value, str) else value
+
+
+class FacilitySummary(BaseModel):
+    """Overall facility assessment returned alongside recommendations"""
+    model_config = ConfigDict(extra="allow")
+
+    current_performance: Optional[str] = None
+    key_strengths: List[str] = Field(default_factory=list)
+    main_challenges: List[str] = Field(default_factory=list)
+    overall_potential: Optional[str] = None
@@ -0,0 +1,148 @@
+"""
+Incremental parser for streamed recommendation JSON
+
+Scans model output as it arrives and emits every object of the top-level
+"recommendations" array as soon as its closing brace is seen, so callers can
+validate and forward recommendations before the completion has finished.
+"""
+
+from typing import Any, Dict, List, Optional
+
+from ..utils.json_repair import JSONRepairError, parse_json_tolerant
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+RECOMMENDATIONS_KEY = "recommendations"
+
+
+class RecommendationStreamParser:
+    """
+    Character-level JSON scanner tracking nesting depth and string state
+
+    Depth 1 is the top-level document object, depth 2 the recommendations
+    array and depth 3 a single recommendation object.
+    """
+
+    def __init__(self, array_key: str = RECOMMENDATIONS_KEY):
+        """
+        Initialize the parser
+
+        Args:
+            array_key: Top-level key whose array items are emitted incrementally
+        """
+        self.array_key = array_key
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escaped = False
+        self._string_start = -1
+        self._last_key: Optional[str] = None
+        self._pending_string: Optional[str] = None
+        self._in_array = False
+        self._item_start = -1
+        self.items_emitted = 0
+        self.items_failed = 0
+
+    @property
+    def text(self) -> str:
+        """All text received so far"""
+        return self._text
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """
+        Consume a chunk of model output
+
+        Args:
+            chunk: Next fragment of streamed text
+
+        Returns:
+            List of recommendation objects completed by this chunk
+        """
+        if not chunk:
+            return []
+        self._text += chunk
+        completed = []
+        text = self._text
+
+        for i in range(self._pos, len(text)):
+            char = text[i]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._pending_string = text[self._string_start + 1:i]
+                continue
+
+            if not self._started:
+                # Skip any preamble or markdown fence before the document
+                if char == "{":
+                    self._started = True
+                    self._depth = 1
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i
+            elif char == ":" and self._depth == 1:
+                self._last_key = self._pending_string
+            elif char in "{[":
+                if char == "[" and self._depth == 1 and self._last_key == self.array_key:
+                    self._in_array = True
+                elif char == "{" and self._depth == 2 and self._in_array:
+                    self._item_start = i
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == 2 and self._in_array and self._item_start >= 0:
+                    item = self._decode_item(text[self._item_start:i + 1])
+                    if item is not None:
+                        completed.append(item)
+                    self._item_start = -1
+                elif char == "]" and self._depth == 1 and self._in_array:
+                    self._in_array = False
+
+        self._pos = len(text)
+        return completed
+
+    def _decode_item(self, fragment: str) -> Optional[Dict[str, Any]]:
+        """Decode one complete array item, counting undecodable fragments"""
+        try:
+            item = parse_json_tolerant(fragment)
+        except JSONRepairError as e:
+            self.items_failed += 1
+            logger.warning(f"Skipping undecodable streamed recommendation: {e}")
+            return None
+        if not isinstance(item, dict):
+            self.items_failed += 1
+            return None
+        self.items_emitted += 1
+        return item
+
+    @property
+    def complete(self) -> bool:
+        """Whether the top-level document has been closed"""
+        return self._started and self._depth == 0 and not self._in_string
+
+    def finish(self) -> Dict[str, Any]:
+        """
+        Decode the full document once the stream has ended
+
+        Truncated or slightly malformed output is repaired before decoding.
+
+        Returns:
+            Parsed document, or an empty dict when it cannot be decoded
+        """
+        try:
+            document = parse_json_tolerant(self._text)
+        except JSONRepairError as e:
+            logger.warning(f"Streamed document did not decode as JSON: {e}")
+            return {}
+        return document if isinstance(document, dict) else {}
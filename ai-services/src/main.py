@@ -18,10 +18,11 @@ import uvicorn
 from .config.settings import get_settings
 from .utils.logger import setup_logger
 from .routers import health, recommendations, chat, facility_recommendations, fuel_cost_analysis, smart_fuel_analysis
-# Temporarily disable dynamic_fuel_optimizer due to dependency issues
-# from .routers import dynamic_fuel_optimizer
+from .routers import dynamic_fuel_optimizer
 from .middleware.auth_middleware import AuthMiddleware
 from .middleware.error_handler import ErrorHandlerMiddleware
+from .services.cost_refresh_scheduler import cost_refresh_scheduler
+from .services.emission_factor_catalog import emission_factor_catalog
 
 # Initialize settings and logger
 settings = get_settings()
@@ -49,6 +50,9 @@ async def lifespan(app: FastAPI):
     # Initialize database connections, ML models, etc.
     try:
         # TODO: Initialize AI models, database connections
+        # Every fuel route reads the emission factor catalog; refuse to start without it
+        emission_factor_catalog.ensure_loaded()
+        await cost_refresh_scheduler.start()
         logger.info("AI services initialized successfully")
     except Exception as e:
         logger.error(f"Failed to initialize AI services: {e}")
@@ -59,6 +63,7 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("🛑 Shutting down iLLuMinate AI Services...")
     # Cleanup resources
+    await cost_refresh_scheduler.stop()
 
 def create_app() -> FastAPI:
     """
@@ -98,8 +103,7 @@ def create_app() -> FastAPI:
     app.include_router(facility_recommendations.router, prefix="/api", tags=["facility-recommendations"])
     app.include_router(fuel_cost_analysis.router, prefix="/api", tags=["fuel-cost-analysis"])
     app.include_router(smart_fuel_analysis.router, prefix="/api", tags=["smart-fuel-analysis"])
-    # Temporarily disable dynamic_fuel_optimizer
-    # app.include_router(dynamic_fuel_optimizer.router, prefix="/api", tags=["dynamic-fuel-optimizer"])
+    app.include_router(dynamic_fuel_optimizer.router, prefix="/api", tags=["dynamic-fuel-optimizer"])
     
     @app.exception_handler(RequestValidationError)
     async def validation_exception_handler(request: Request, exc: RequestValidationError):
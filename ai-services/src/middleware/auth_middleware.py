@@ -6,58 +6,84 @@ Handles JWT token validation and user context extraction
 import jwt
 from fastapi import Request, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
 from typing import Dict, Any, Optional
 
 from ..config.settings import get_settings
 from ..utils.logger import get_logger
+from .jwt_cache import jwt_claims_cache
 
 logger = get_logger(__name__)
 settings = get_settings()
 
-class AuthMiddleware(BaseHTTPMiddleware):
-    """Middleware to handle JWT authentication and extract user context"""
+# Paths served without looking at credentials (health endpoints and docs)
+PUBLIC_PATHS = frozenset({"/", "/health", "/docs", "/redoc", "/openapi.json"})
+
+class AuthMiddleware:
+    """
+    Middleware to handle JWT authentication and extract user context
+    
+    Plain ASGI: the user context is written to the request state in the
+    scope and the app is called with the original receive/send, so responses
+    (including streams) pass through untouched. Decoded tokens are cached
+    until their exp claim (see jwt_cache), so repeated requests of a session
+    skip decoding and signature verification.
+    """
     
-    async def dispatch(self, request: Request, call_next):
-        # Skip auth for health endpoints and docs
-        if request.url.path in ["/", "/health", "/docs", "/redoc", "/openapi.json"]:
-            return await call_next(request)
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        # Skip auth for non-HTTP traffic, health endpoints and docs
+        if scope["type"] != "http" or scope["path"] in PUBLIC_PATHS:
+            await self.app(scope, receive, send)
+            return
         
-        # Initialize user context
-        request.state.user = None
-        request.state.organization_id = None
+        # Initialize user context (read back through request.state)
+        state = scope.setdefault("state", {})
+        state["user"] = None
+        state["organization_id"] = None
         
         # Extract JWT token
-        auth_header = request.headers.get("authorization")
+        auth_header = Headers(scope=scope).get("authorization")
         if not auth_header or not auth_header.startswith("Bearer "):
             # For development mode, allow requests without auth
             logger.debug("No authorization header found, proceeding without authentication")
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
         
         try:
             token = auth_header.split(" ")[1]
-            payload = jwt.decode(
-                token, 
-                settings.jwt_secret, 
-                algorithms=["HS256"],
-                options={"verify_signature": False}  # Skip signature verification for development
-            )
-            
-            # Extract user information from JWT payload
-            user_info = {
-                "id": payload.get("id"),
-                "email": payload.get("email"),
-                "organization_id": payload.get("organization_id") or payload.get("organizationId"),
-                "role": payload.get("role"),
-                "first_name": payload.get("first_name") or payload.get("firstName"),
-                "last_name": payload.get("last_name") or payload.get("lastName")
-            }
+            cache_key = jwt_claims_cache.make_key(token)
+            user_info = jwt_claims_cache.get(cache_key)
             
-            # Set user context in request state
-            request.state.user = user_info
-            request.state.organization_id = user_info.get("organization_id")
+            if user_info is None:
+                payload = jwt.decode(
+                    token, 
+                    settings.jwt_secret, 
+                    algorithms=[settings.jwt_algorithm],
+                    # Skip signature verification for development
+                    options=None if settings.jwt_verify_signature else {"verify_signature": False}
+                )
+                
+                # Extract user information from JWT payload
+                user_info = {
+                    "id": payload.get("id"),
+                    "email": payload.get("email"),
+                    "organization_id": payload.get("organization_id") or payload.get("organizationId"),
+                    "role": payload.get("role"),
+                    "first_name": payload.get("first_name") or payload.get("firstName"),
+                    "last_name": payload.get("last_name") or payload.get("lastName")
+                }
+                jwt_claims_cache.put(cache_key, user_info, payload.get("exp"))
+                
+                # Logged once per token; repeated requests of the session hit the cache
+                logger.info("Authenticated user: %s (org: %s)", user_info.get('email'), user_info.get('organization_id'))
             
-            logger.info(f"Authenticated user: {user_info.get('email')} (org: {user_info.get('organization_id')})")
+            # Set user context in request state (a copy, so handlers cannot alter the cached entry)
+            state["user"] = dict(user_info)
+            state["organization_id"] = user_info.get("organization_id")
             
         except jwt.InvalidTokenError as e:
             logger.warning(f"Invalid JWT token: {e}")
@@ -66,7 +92,7 @@ class AuthMiddleware(BaseHTTPMiddleware):
             logger.error(f"Auth middleware error: {e}")
             # Don't fail the request, just proceed without user context
         
-        return await call_next(request)
+        await self.app(scope, receive, send)
 
 
 def get_current_user(request: Request) -> Optional[dict]:
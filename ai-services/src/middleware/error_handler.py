@@ -4,44 +4,64 @@ Error handling middleware for AI services
 
 import traceback
 from datetime import datetime
-from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
 
 
-class ErrorHandlerMiddleware(BaseHTTPMiddleware):
+class ErrorHandlerMiddleware:
     """
     Global error handling middleware
     Catches and formats unhandled exceptions
+    
+    Plain ASGI: messages are forwarded as the app sends them, so streaming
+    responses are not buffered. An exception raised before the response has
+    started becomes the JSON 500 below; once headers are sent it propagates,
+    as it did with BaseHTTPMiddleware.
     """
     
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp):
+        self.app = app
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
         """
         Process the request and handle any unhandled exceptions
         
         Args:
-            request: HTTP request
-            call_next: Next middleware in chain
-            
-        Returns:
-            Response: HTTP response
+            scope: ASGI connection scope
+            receive: ASGI receive channel
+            send: ASGI send channel
         """
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        response_started = False
+        
+        async def send_wrapper(message: Message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
         
         try:
-            response = await call_next(request)
-            return response
-            
+            await self.app(scope, receive, send_wrapper)
+        
         except Exception as exc:
+            if response_started:
+                raise
+            
             # Log the error
+            request = Request(scope)
             error_details = {
                 "error": str(exc),
                 "path": request.url.path,
                 "method": request.method,
-                "headers": dict(request.headers),
+                # Request headers are not logged (they carry bearer tokens and cookies)
                 "user_agent": request.headers.get("user-agent"),
                 "timestamp": datetime.utcnow().isoformat() + "Z"
             }
@@ -50,7 +70,7 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
             logger.debug(f"Stack trace: {traceback.format_exc()}")
             
             # Return formatted error response
-            return JSONResponse(
+            response = JSONResponse(
                 status_code=500,
                 content={
                     "success": False,
@@ -61,4 +81,4 @@ class ErrorHandlerMiddleware(BaseHTTPMiddleware):
                     }
                 }
             )
-
+            await response(scope, receive, send)
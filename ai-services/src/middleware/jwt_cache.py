@@ -0,0 +1,135 @@
+"""
+JWT Claims Cache
+Reuse of decoded (and verified) token claims across requests of one session
+"""
+
+import hashlib
+import heapq
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config.settings import get_settings
+
+settings = get_settings()
+
+
+class JWTClaimsCache:
+    """
+    In-memory cache of user context per bearer token with an LRU size bound
+
+    Keys are SHA-256 digests of the token, so raw tokens are never held.
+    An entry expires at the token's ``exp`` claim (or after the fallback TTL
+    for tokens without one); expired entries are dropped on lookup and
+    swept from an expiry heap on insert. Only successfully decoded tokens
+    are stored, so an invalid token is re-checked (and logged) every time.
+    """
+
+    def __init__(self, max_entries: int = 4096, fallback_ttl_seconds: float = 900):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum tokens kept (least recently used are evicted)
+            fallback_ttl_seconds: Lifetime of entries for tokens without an exp claim
+        """
+        self.max_entries = max_entries
+        self.fallback_ttl_seconds = fallback_ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._expiry: List[Tuple[float, str]] = []
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+
+    @staticmethod
+    def make_key(token: str) -> str:
+        """Cache key of a token"""
+        return hashlib.sha256(token.encode()).hexdigest()
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Cached user context of a token
+
+        Args:
+            key: Key from make_key
+            now: Current epoch seconds (defaults to time.time())
+
+        Returns:
+            User context, or None on a miss or an expired token
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return None
+
+        user_info, expires_at = entry
+        if (now or time.time()) >= expires_at:
+            del self._entries[key]
+            self._stats["expired"] += 1
+            self._stats["misses"] += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self._stats["hits"] += 1
+        return user_info
+
+    def put(self, key: str, user_info: Dict[str, Any], exp: Any = None, now: Optional[float] = None):
+        """
+        Store the user context of a decoded token
+
+        Args:
+            key: Key from make_key
+            user_info: User context built from the claims
+            exp: The token's exp claim (epoch seconds), if any
+            now: Current epoch seconds (defaults to time.time())
+        """
+        now = now or time.time()
+        if isinstance(exp, (int, float)) and not isinstance(exp, bool):
+            expires_at = float(exp)
+        else:
+            expires_at = now + self.fallback_ttl_seconds
+        if expires_at <= now:
+            return
+
+        self._sweep(now)
+        self._entries[key] = (user_info, expires_at)
+        self._entries.move_to_end(key)
+        heapq.heappush(self._expiry, (expires_at, key))
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._stats["evictions"] += 1
+        # Stale heap items (evicted or replaced keys) are only dropped when they come due
+        if len(self._expiry) > 2 * self.max_entries:
+            self._expiry = [(at, k) for k, (_, at) in self._entries.items()]
+            heapq.heapify(self._expiry)
+
+    def _sweep(self, now: float):
+        """Drop entries whose token has expired"""
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, key = heapq.heappop(self._expiry)
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] == expires_at:
+                del self._entries[key]
+                self._stats["expired"] += 1
+
+    def clear(self):
+        """Drop all entries"""
+        self._entries.clear()
+        self._expiry.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "max_entries": self.max_entries,
+            "fallback_ttl_minutes": self.fallback_ttl_seconds / 60,
+        }
+
+
+# Global cache instance
+jwt_claims_cache = JWTClaimsCache(
+    max_entries=settings.jwt_cache_max_entries,
+    fallback_ttl_seconds=settings.jwt_cache_ttl_minutes * 60
+)
@@ -86,8 +86,8 @@ async def chat_with_cement_gpt(
         user_id = current_user.get("id") if current_user else None
         organization_id = current_org_id or (current_user.get("organization_id") if current_user else None)
         
-        logger.info(f"Processing chat request: {chat_request.message[:100]}...")
-        logger.info(f"User context: user_id={user_id}, org_id={organization_id}")
+        logger.info("Processing chat request: %s...", chat_request.message[:100])
+        logger.info("User context: user_id=%s, org_id=%s", user_id, organization_id)
         
         # Get or create session
         session_id = chat_request.session_id
@@ -126,9 +126,10 @@ async def chat_with_cement_gpt(
         agent_analysis = agent_context.get("analysis", {})
         agent_decision = agent_context.get("agent_decision", {})
         
-        logger.info(f"Agent decision: requires_data={agent_decision.get('requires_data', False)}, "
-                   f"confidence={agent_analysis.get('confidence', 0)}, "
-                   f"question_type={agent_analysis.get('question_type', 'unknown')}")
+        logger.info("Agent decision: requires_data=%s, confidence=%s, question_type=%s",
+                    agent_decision.get('requires_data', False),
+                    agent_analysis.get('confidence', 0),
+                    agent_analysis.get('question_type', 'unknown'))
         
         # Generate AI response with intelligent context
         ai_result = await gpt_service.generate_response(
@@ -171,7 +172,7 @@ async def chat_with_cement_gpt(
                 message=chat_request.message,
                 response=ai_result["response"]
             )
-            logger.debug(f"Successfully saved chat history to database for session {session_id}")
+            logger.debug("Successfully saved chat history to database for session %s", session_id)
         except Exception as e:
             logger.warning(f"Failed to save chat history to database: {e}")
             # Don't fail the request if database save fails
@@ -192,7 +193,7 @@ async def chat_with_cement_gpt(
             "timestamp": datetime.utcnow().isoformat() + "Z"
         }
         
-        logger.info(f"Generated response for session {session_id}")
+        logger.info("Generated response for session %s", session_id)
         return response_data
         
     except HTTPException:
@@ -230,7 +231,7 @@ async def create_chat_session(
         user_id = current_user.get("id") if current_user else None
         organization_id = current_org_id or (current_user.get("organization_id") if current_user else None)
         
-        logger.info(f"Creating chat session for user_id={user_id}, org_id={organization_id}")
+        logger.info("Creating chat session for user_id=%s, org_id=%s", user_id, organization_id)
         
         session_id = await chat_service.create_session(
             user_id=user_id,
@@ -3,17 +3,24 @@ Dynamic Fuel Optimizer Router
 Implements AI-driven fuel optimization with dynamic ranges and real-time cost fetching
 """
 
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-import logging
-import asyncio
+from pydantic import BaseModel, Field
 
+import numpy as np
+
+from ..services.cost_refresh_scheduler import cost_refresh_scheduler
 from ..services.dynamic_cost_service import dynamic_cost_service
+from ..services.emission_factor_catalog import MASS_UNIT, emission_factor_catalog
 from ..services.facility_data_service import FacilityDataService
+from ..services.fuel_uncertainty import fuel_uncertainty_engine
+from ..services.optimizer_snapshot_store import OptimizerSnapshot, optimizer_snapshot_store
+from ..utils.fuel_index import FuelRangeIndex
+from ..utils.pareto import pareto_mask
 from ..middleware.auth_middleware import get_current_user
+from ..utils.logger import get_logger
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/dynamic-fuel-optimizer", tags=["Dynamic Fuel Optimizer"])
 
@@ -31,6 +38,8 @@ class UserSelections(BaseModel):
 class FuelOptimizationRequest(BaseModel):
     facility_id: str
     selections: UserSelections
+    snapshot_id: Optional[str] = None  # Returned by /initialize; avoids re-initialization
+    annual_heat_demand_gj: Optional[float] = Field(None, gt=0)  # basis of the annual cost/CO2 intervals
 
 class FuelOptimizationResponse(BaseModel):
     success: bool
@@ -40,109 +49,22 @@ class FuelOptimizationResponse(BaseModel):
 @router.get("/initialize/{facility_id}")
 async def initialize_optimizer(
     facility_id: str,
-    background_tasks: BackgroundTasks,
+    force_refresh: bool = Query(False, description="Rebuild even if a live snapshot exists"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Initialize the optimizer by fetching dynamic costs and calculating ranges
+    
+    The result is stored as a snapshot; pass its snapshot_id to /optimize.
     """
     try:
-        logger.info(f"Initializing dynamic fuel optimizer for facility {facility_id}")
-        
-        # Get facility data service
-        facility_service = FacilityDataService()
-        
-        # Fetch all alternative fuels from database
-        facility_data = await facility_service.get_facility_data(facility_id)
-        
-        if not facility_data:
-            raise HTTPException(status_code=404, detail="Facility data not found")
-        
-        # Extract alternative fuels
-        alternative_fuels = []
-        resources = facility_data.get('resources', [])
-        
-        for resource in resources:
-            if resource.get('is_alternative_fuel'):
-                emission_factors = resource.get('emission_factors', [])
-                for factor in emission_factors:
-                    fuel_entry = {
-                        'resource_id': resource.get('id'),
-                        'resource_name': resource.get('resource_name'),
-                        'emission_factor': factor.get('emission_factor', 0),
-                        'emission_factor_unit': factor.get('emission_factor_unit', ''),
-                        'heat_content': factor.get('heat_content', 0),
-                        'heat_content_unit': factor.get('heat_content_unit', ''),
-                        'library_name': factor.get('library_name', ''),
-                        'availability_score': factor.get('availability_score', 5)
-                    }
-                    alternative_fuels.append(fuel_entry)
-        
-        # If no fuels in facility data, use common Indian alternative fuels
-        if not alternative_fuels:
-            alternative_fuels = await get_default_alternative_fuels()
-        
-        # Extract unique fuel names
-        fuel_names = list(set([fuel['resource_name'] for fuel in alternative_fuels]))
-        
-        # Get dynamic costs for all fuels using AI
-        logger.info(f"Fetching dynamic costs for {len(fuel_names)} fuels")
-        fuel_costs = await dynamic_cost_service.get_all_fuel_costs(fuel_names, facility_id)
-        
-        # Combine fuel data with dynamic costs
-        enhanced_fuels = []
-        for fuel in alternative_fuels:
-            fuel_name = fuel['resource_name']
-            cost_data = fuel_costs.get(fuel_name, {})
-            
-            enhanced_fuel = {
-                **fuel,
-                'dynamic_cost': cost_data.get('cost_per_kg_inr', 0),
-                'cost_currency': 'INR',
-                'cost_confidence': cost_data.get('confidence_level', 'low'),
-                'cost_source': cost_data.get('source_info', 'fallback'),
-                'cost_location': cost_data.get('location', 'Unknown'),
-                'cost_factors': cost_data.get('price_factors', []),
-                'last_updated': cost_data.get('last_updated', 'Unknown')
-            }
-            enhanced_fuels.append(enhanced_fuel)
-        
-        # Calculate dynamic ranges
-        costs = [fuel['dynamic_cost'] for fuel in enhanced_fuels if fuel['dynamic_cost'] > 0]
-        emissions = [fuel['emission_factor'] for fuel in enhanced_fuels if fuel['emission_factor'] > 0]
-        energies = [fuel['heat_content'] for fuel in enhanced_fuels if fuel['heat_content'] > 0]
-        
-        dynamic_ranges = {
-            'cost_range': {
-                'min': min(costs) if costs else 0,
-                'max': max(costs) if costs else 100,
-                'unit': 'INR/kg'
-            },
-            'emission_range': {
-                'min': min(emissions) if emissions else 0,
-                'max': max(emissions) if emissions else 5,
-                'unit': 'kgCO2e/kg'
-            },
-            'energy_range': {
-                'min': min(energies) if energies else 0,
-                'max': max(energies) if energies else 0.05,
-                'unit': 'GJ/kg'
-            }
-        }
-        
-        # Start background task to refresh costs periodically
-        background_tasks.add_task(schedule_cost_refresh, facility_id)
+        snapshot = None if force_refresh else optimizer_snapshot_store.latest_for_facility(facility_id)
+        if snapshot is None:
+            snapshot = await build_optimizer_snapshot(facility_id)
         
         return {
             'success': True,
-            'data': {
-                'facility_id': facility_id,
-                'fuels': enhanced_fuels,
-                'dynamic_ranges': dynamic_ranges,
-                'total_fuels': len(enhanced_fuels),
-                'cost_fetching_method': 'ai_powered',
-                'last_updated': fuel_costs.get(list(fuel_costs.keys())[0], {}).get('fetched_at', 'Unknown') if fuel_costs else 'Unknown'
-            }
+            'data': _snapshot_response(snapshot)
         }
         
     except HTTPException:
@@ -151,6 +73,145 @@ async def initialize_optimizer(
         logger.error(f"Error initializing optimizer: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Initialization failed: {str(e)}")
 
+def _snapshot_response(snapshot: OptimizerSnapshot) -> Dict[str, Any]:
+    """Initialization payload of a snapshot"""
+    return {
+        'facility_id': snapshot.facility_id,
+        'snapshot_id': snapshot.snapshot_id,
+        'snapshot_expires_at': snapshot.expires_at.isoformat() + "Z",
+        'fuels': snapshot.fuels,
+        'dynamic_ranges': snapshot.dynamic_ranges,
+        'total_fuels': len(snapshot.fuels),
+        'cost_fetching_method': 'ai_powered',
+        'last_updated': snapshot.last_updated
+    }
+
+async def get_optimizer_snapshot(facility_id: str, snapshot_id: Optional[str] = None) -> OptimizerSnapshot:
+    """
+    Resolve the snapshot for an optimize call, initializing only when needed
+    
+    Args:
+        facility_id: Facility ID
+        snapshot_id: Snapshot returned by /initialize (optional)
+        
+    Returns:
+        OptimizerSnapshot: Live snapshot of the facility
+    """
+    snapshot = optimizer_snapshot_store.get(snapshot_id) if snapshot_id else None
+    if snapshot is not None and snapshot.facility_id != facility_id:
+        raise HTTPException(status_code=400, detail="Snapshot does not belong to this facility")
+    if snapshot is None:
+        snapshot = optimizer_snapshot_store.latest_for_facility(facility_id)
+    if snapshot is None:
+        logger.info(f"No live optimizer snapshot for facility {facility_id}; initializing")
+        snapshot = await build_optimizer_snapshot(facility_id)
+    return snapshot
+
+async def build_optimizer_snapshot(facility_id: str) -> OptimizerSnapshot:
+    """
+    Fetch facility fuels, price them and compute ranges, storing the result as a snapshot
+    
+    Args:
+        facility_id: Facility ID
+        
+    Returns:
+        OptimizerSnapshot: Newly created snapshot
+    """
+    logger.info(f"Initializing dynamic fuel optimizer for facility {facility_id}")
+    
+    # Get facility data service
+    facility_service = FacilityDataService()
+    
+    # Fetch the facility's configured resources
+    facility_data = await facility_service.get_comprehensive_facility_data(facility_id)
+    
+    if not facility_data:
+        raise HTTPException(status_code=404, detail="Facility data not found")
+
+    # Resolve the price region from the record just fetched (no second backend call)
+    await dynamic_cost_service.get_facility_location(facility_id, facility_data)
+
+    # Catalog rows of the facility's alternative fuels; the ranges, prices and
+    # Pareto objectives are per kg, so fuels measured in L or m3 are left out
+    alternative_fuels = emission_factor_catalog.facility_fuels(facility_data, alternative_only=True, unit=MASS_UNIT)
+    
+    # If no fuels in facility data, use the catalog's alternative fuels
+    if not alternative_fuels:
+        alternative_fuels = emission_factor_catalog.fuels(alternative_only=True, unit=MASS_UNIT)
+    
+    # Availability from the facility configuration or the catalog (5 only when neither has one)
+    alternative_fuels = [
+        {**fuel, 'availability_score': fuel.get('availability_score') or 5}
+        for fuel in alternative_fuels
+    ]
+    
+    # Extract unique fuel names
+    fuel_names = list(set([fuel['resource_name'] for fuel in alternative_fuels]))
+    
+    # Get dynamic costs for all fuels using AI
+    logger.info(f"Fetching dynamic costs for {len(fuel_names)} fuels")
+    fuel_costs = await dynamic_cost_service.get_all_fuel_costs(fuel_names, facility_id)
+    
+    # Combine fuel data with dynamic costs
+    enhanced_fuels = []
+    for fuel in alternative_fuels:
+        fuel_name = fuel['resource_name']
+        cost_data = fuel_costs.get(fuel_name, {})
+        
+        enhanced_fuel = {
+            **fuel,
+            'dynamic_cost': cost_data.get('cost_per_kg_inr', fuel.get('cost_inr') or 0),
+            'cost_currency': 'INR',
+            'cost_confidence': cost_data.get('confidence_level', 'low'),
+            'cost_source': cost_data.get('source_info', 'fallback'),
+            'cost_location': cost_data.get('location', 'Unknown'),
+            'cost_factors': cost_data.get('price_factors', []),
+            'last_updated': cost_data.get('last_updated', 'Unknown')
+        }
+        enhanced_fuels.append(enhanced_fuel)
+    
+    # Calculate dynamic ranges
+    costs = [fuel['dynamic_cost'] for fuel in enhanced_fuels if fuel['dynamic_cost'] > 0]
+    emissions = [fuel['emission_factor'] for fuel in enhanced_fuels if fuel['emission_factor'] > 0]
+    energies = [fuel['heat_content'] for fuel in enhanced_fuels if fuel['heat_content'] > 0]
+    
+    dynamic_ranges = {
+        'cost_range': {
+            'min': min(costs) if costs else 0,
+            'max': max(costs) if costs else 100,
+            'unit': 'INR/kg'
+        },
+        'emission_range': {
+            'min': min(emissions) if emissions else 0,
+            'max': max(emissions) if emissions else 5,
+            'unit': 'kgCO2e/kg'
+        },
+        'energy_range': {
+            'min': min(energies) if energies else 0,
+            'max': max(energies) if energies else 0.05,
+            'unit': 'GJ/kg'
+        }
+    }
+    
+    # Keep this region's prices fresh (coalesced with existing registrations)
+    await cost_refresh_scheduler.register(facility_id, fuel_names)
+    
+    return optimizer_snapshot_store.create(
+        facility_id=facility_id,
+        fuels=enhanced_fuels,
+        dynamic_ranges=dynamic_ranges,
+        last_updated=fuel_costs.get(list(fuel_costs.keys())[0], {}).get('fetched_at', 'Unknown') if fuel_costs else 'Unknown',
+        index=_build_fuel_index(enhanced_fuels, dynamic_ranges)
+    )
+
+def _build_fuel_index(fuels: List[Dict[str, Any]], ranges: Dict[str, Dict[str, Any]]) -> FuelRangeIndex:
+    """Index the fuel table on cost, emission factor and heat content (distances scaled by range max)"""
+    return FuelRangeIndex(
+        fuels,
+        columns=('dynamic_cost', 'emission_factor', 'heat_content'),
+        scales=[ranges['cost_range']['max'], ranges['emission_range']['max'], ranges['energy_range']['max']]
+    )
+
 @router.post("/optimize", response_model=FuelOptimizationResponse)
 async def optimize_fuels(
     request: FuelOptimizationRequest,
@@ -162,63 +223,34 @@ async def optimize_fuels(
     try:
         logger.info(f"Optimizing fuels for facility {request.facility_id}")
         
-        # Get initialized data (this would typically be cached)
-        init_response = await initialize_optimizer(request.facility_id, BackgroundTasks(), current_user)
-        
-        if not init_response['success']:
-            raise HTTPException(status_code=500, detail="Failed to get fuel data")
+        # Get initialized data from the snapshot (initializes only if none is live)
+        snapshot = await get_optimizer_snapshot(request.facility_id, request.snapshot_id)
         
-        fuels = init_response['data']['fuels']
-        ranges = init_response['data']['dynamic_ranges']
+        ranges = snapshot.dynamic_ranges
         
-        # Apply 10% plus/minus filtering based on user selections
-        tolerance = request.selections.tolerance_percent / 100.0
-        
-        # Filter by cost (±10%)
-        cost_min = request.selections.cost_value * (1 - tolerance)
-        cost_max = request.selections.cost_value * (1 + tolerance)
-        cost_filtered = [f for f in fuels if cost_min <= f['dynamic_cost'] <= cost_max]
-        
-        # Filter by emission factor (±10%)
-        emission_min = request.selections.emission_value * (1 - tolerance)
-        emission_max = request.selections.emission_value * (1 + tolerance)
-        emission_filtered = [f for f in cost_filtered if emission_min <= f['emission_factor'] <= emission_max]
-        
-        # Filter by energy/heat content (±10%)
-        energy_min = request.selections.energy_value * (1 - tolerance)
-        energy_max = request.selections.energy_value * (1 + tolerance)
-        final_filtered = [f for f in emission_filtered if energy_min <= f['heat_content'] <= energy_max]
+        # Box query at ±tolerance, then ±20%, then the 3 closest matches
+        index = snapshot.extras.get('index') or _build_fuel_index(snapshot.fuels, ranges)
+        selections = request.selections
+        target = (selections.cost_value, selections.emission_value, selections.energy_value)
+        result = index.query(
+            target,
+            tolerance=selections.tolerance_percent / 100.0,
+            fallback_tolerances=(0.2,),
+            k=3
+        )
         
-        # If no fuels match all criteria, relax constraints progressively
-        if not final_filtered:
-            # Try with larger tolerance
-            tolerance = 0.2  # ±20%
-            cost_min = request.selections.cost_value * (1 - tolerance)
-            cost_max = request.selections.cost_value * (1 + tolerance)
-            emission_min = request.selections.emission_value * (1 - tolerance)
-            emission_max = request.selections.emission_value * (1 + tolerance)
-            energy_min = request.selections.energy_value * (1 - tolerance)
-            energy_max = request.selections.energy_value * (1 + tolerance)
-            
-            final_filtered = [f for f in fuels if 
-                            cost_min <= f['dynamic_cost'] <= cost_max and
-                            emission_min <= f['emission_factor'] <= emission_max and
-                            energy_min <= f['heat_content'] <= energy_max]
+        tolerance = result.tolerance
+        cost_min, cost_max = sorted((selections.cost_value * (1 - tolerance), selections.cost_value * (1 + tolerance)))
+        emission_min, emission_max = sorted((selections.emission_value * (1 - tolerance), selections.emission_value * (1 + tolerance)))
+        energy_min, energy_max = sorted((selections.energy_value * (1 - tolerance), selections.energy_value * (1 + tolerance)))
         
-        # If still no matches, take closest matches
-        if not final_filtered:
-            # Score each fuel by how close it is to user selections
-            scored_fuels = []
-            for fuel in fuels:
-                cost_diff = abs(fuel['dynamic_cost'] - request.selections.cost_value) / ranges['cost_range']['max']
-                emission_diff = abs(fuel['emission_factor'] - request.selections.emission_value) / ranges['emission_range']['max']
-                energy_diff = abs(fuel['heat_content'] - request.selections.energy_value) / ranges['energy_range']['max']
-                
-                total_diff = cost_diff + emission_diff + energy_diff
-                scored_fuels.append({**fuel, 'difference_score': total_diff})
-            
-            # Take top 3 closest matches
-            final_filtered = sorted(scored_fuels, key=lambda x: x['difference_score'])[:3]
+        # Copy matched rows so per-request fields never leak into the shared snapshot
+        final_filtered = []
+        for position, distance in zip(result.indices.tolist(), result.distances.tolist()):
+            fuel = dict(snapshot.fuels[position])
+            if result.mode == 'nearest':
+                fuel['difference_score'] = distance
+            final_filtered.append(fuel)
         
         # Generate AI recommendation
         ai_recommendation = await generate_ai_recommendation(
@@ -228,15 +260,23 @@ async def optimize_fuels(
             request.facility_id
         )
         
+        # Confidence intervals on annual cost and CO2 from the price confidence levels
+        uncertainty = await fuel_uncertainty_engine.analyze_fuels_async(
+            final_filtered,
+            cost_key='dynamic_cost',
+            annual_heat_demand_gj=request.annual_heat_demand_gj
+        )
+        
         # Calculate carbon intensity for each fuel
-        for fuel in final_filtered:
+        for fuel, interval in zip(final_filtered, uncertainty):
             if fuel['heat_content'] > 0:
                 fuel['carbon_intensity'] = fuel['emission_factor'] / fuel['heat_content']
             else:
                 fuel['carbon_intensity'] = fuel['emission_factor']
+            fuel['uncertainty'] = interval
         
         # Sort by best overall match (lowest difference score if available, or by carbon intensity)
-        if 'difference_score' in final_filtered[0]:
+        if result.mode == 'nearest':
             final_filtered.sort(key=lambda x: x['difference_score'])
         else:
             final_filtered.sort(key=lambda x: x['carbon_intensity'])
@@ -254,7 +294,8 @@ async def optimize_fuels(
                 'ai_recommendation': ai_recommendation,
                 'total_matches': len(final_filtered),
                 'tolerance_applied': f"±{request.selections.tolerance_percent}%",
-                'optimization_timestamp': init_response['data']['last_updated']
+                'optimization_timestamp': snapshot.last_updated,
+                'snapshot_id': snapshot.snapshot_id
             }
         )
         
@@ -267,6 +308,89 @@ async def optimize_fuels(
             error=f"Optimization failed: {str(e)}"
         )
 
+@router.get("/pareto/{facility_id}")
+async def get_pareto_frontier(
+    facility_id: str,
+    snapshot_id: Optional[str] = Query(None, description="Snapshot returned by /initialize"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Non-dominated fuel options over cost per GJ, carbon intensity and heat content
+    
+    A fuel is on the frontier when no other fuel is at least as cheap per GJ,
+    at least as clean per GJ and at least as energy dense, while being strictly
+    better on one of them. The frontier is computed once per snapshot.
+    """
+    try:
+        snapshot = await get_optimizer_snapshot(facility_id, snapshot_id)
+        
+        frontier = snapshot.extras.get('pareto')
+        if frontier is None:
+            frontier = _compute_pareto_frontier(snapshot.fuels)
+            snapshot.extras['pareto'] = frontier
+        
+        return {
+            'success': True,
+            'data': {
+                'facility_id': facility_id,
+                'snapshot_id': snapshot.snapshot_id,
+                **frontier,
+                'last_updated': snapshot.last_updated
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error computing Pareto frontier: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Pareto frontier failed: {str(e)}")
+
+def _compute_pareto_frontier(fuels: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pareto frontier of a fuel table
+    
+    Fuels without a positive price or heat content cannot be placed per GJ
+    and are reported as excluded.
+    
+    Args:
+        fuels: Enhanced fuel table of a snapshot
+        
+    Returns:
+        Dict with the frontier fuels (sorted by cost per GJ) and counts
+    """
+    cost = np.array([float(fuel.get('dynamic_cost') or 0) for fuel in fuels])
+    emission = np.array([float(fuel.get('emission_factor') or 0) for fuel in fuels])
+    heat = np.array([float(fuel.get('heat_content') or 0) for fuel in fuels])
+    
+    usable = (cost > 0) & (heat > 0)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        objectives = np.column_stack([cost / heat, emission / heat, heat])
+    objectives[~usable] = np.nan
+    
+    mask = pareto_mask(objectives, maximize=(False, False, True))
+    positions = np.flatnonzero(mask)
+    positions = positions[np.argsort(objectives[positions, 0], kind='stable')]
+    
+    frontier = []
+    for position in positions.tolist():
+        frontier.append({
+            **fuels[position],
+            'cost_per_gj': round(float(objectives[position, 0]), 2),
+            'carbon_intensity_per_gj': round(float(objectives[position, 1]), 2)
+        })
+    
+    return {
+        'objectives': {
+            'cost_per_gj': {'unit': 'INR/GJ', 'direction': 'minimize'},
+            'carbon_intensity_per_gj': {'unit': 'kgCO2e/GJ', 'direction': 'minimize'},
+            'heat_content': {'unit': 'GJ/kg', 'direction': 'maximize'}
+        },
+        'frontier': frontier,
+        'frontier_size': len(frontier),
+        'candidates': int(usable.sum()),
+        'excluded': len(fuels) - int(usable.sum())
+    }
+
 async def generate_ai_recommendation(
     filtered_fuels: List[Dict[str, Any]], 
     selections: UserSelections,
@@ -338,82 +462,21 @@ Based on your specific criteria:
     
     return recommendation
 
-async def get_default_alternative_fuels() -> List[Dict[str, Any]]:
-    """Get default alternative fuels when facility data is not available"""
-    return [
-        {
-            'resource_name': 'Biomass',
-            'emission_factor': 0.39,
-            'emission_factor_unit': 'kgCO2e/kg',
-            'heat_content': 0.015,
-            'heat_content_unit': 'GJ/kg',
-            'library_name': 'DEFRA AR4',
-            'availability_score': 8
-        },
-        {
-            'resource_name': 'Rice Husk',
-            'emission_factor': 0.38,
-            'emission_factor_unit': 'kgCO2e/kg',
-            'heat_content': 0.013,
-            'heat_content_unit': 'GJ/kg',
-            'library_name': 'India Market',
-            'availability_score': 9
-        },
-        {
-            'resource_name': 'Agricultural Waste',
-            'emission_factor': 0.45,
-            'emission_factor_unit': 'kgCO2e/kg',
-            'heat_content': 0.014,
-            'heat_content_unit': 'GJ/kg',
-            'library_name': 'India Market',
-            'availability_score': 8
-        },
-        {
-            'resource_name': 'Cotton Stalks',
-            'emission_factor': 0.48,
-            'emission_factor_unit': 'kgCO2e/kg',
-            'heat_content': 0.016,
-            'heat_content_unit': 'GJ/kg',
-            'library_name': 'India Market',
-            'availability_score': 6
-        },
-        {
-            'resource_name': 'Waste-derived Fuel',
-            'emission_factor': 1.85,
-            'emission_factor_unit': 'kgCO2e/kg',
-            'heat_content': 0.022,
-            'heat_content_unit': 'GJ/kg',
-            'library_name': 'Estimated',
-            'availability_score': 6
-        },
-        {
-            'resource_name': 'Used Tires',
-            'emission_factor': 2.95,
-            'emission_factor_unit': 'kgCO2e/kg',
-            'heat_content': 0.032,
-            'heat_content_unit': 'GJ/kg',
-            'library_name': 'Estimated',
-            'availability_score': 7
-        }
-    ]
-
-async def schedule_cost_refresh(facility_id: str):
-    """Background task to refresh costs periodically"""
-    try:
-        await asyncio.sleep(3600)  # Wait 1 hour
-        await dynamic_cost_service.refresh_cost_cache(facility_id)
-        logger.info(f"Cost cache refreshed for facility {facility_id}")
-    except Exception as e:
-        logger.error(f"Error refreshing cost cache: {str(e)}")
-
 @router.get("/refresh-costs/{facility_id}")
 async def refresh_costs(
     facility_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    """Manually refresh cost data"""
+    """Manually refresh cost data (and keep the facility's region on the refresh schedule)"""
     try:
-        await dynamic_cost_service.refresh_cost_cache(facility_id)
+        # Re-price the fuels of the facility's live snapshot, or the catalog defaults
+        snapshot = optimizer_snapshot_store.latest_for_facility(facility_id)
+        fuel_names = sorted({fuel['resource_name'] for fuel in snapshot.fuels}) if snapshot else None
+        await dynamic_cost_service.refresh_cost_cache(facility_id, fuel_names)
+        if fuel_names:
+            await cost_refresh_scheduler.register(facility_id, fuel_names)
+        # The snapshot holds the old prices; the next /initialize or /optimize rebuilds it
+        optimizer_snapshot_store.invalidate_facility(facility_id)
         return {
             'success': True,
             'message': 'Cost cache refreshed successfully'
@@ -421,6 +484,16 @@ async def refresh_costs(
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to refresh costs: {str(e)}")
 
+@router.get("/refresh-schedule")
+async def get_refresh_schedule(
+    current_user: dict = Depends(get_current_user)
+):
+    """Current state of the background cost refresh scheduler"""
+    return {
+        'success': True,
+        'data': cost_refresh_scheduler.get_status()
+    }
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -431,6 +504,7 @@ async def health_check():
             'ai_cost_fetching',
             'dynamic_ranges',
             'plus_minus_filtering',
+            'pareto_frontier',
             'real_time_optimization'
         ]
     }
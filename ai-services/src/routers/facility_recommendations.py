@@ -4,12 +4,15 @@ AI-driven facility sustainability recommendations API endpoints
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from typing import List, Optional
 import logging
 
 from ..facility_advisor import get_facility_advisor_service, FacilityAdvisorService
 from ..services.facility_data_service import get_facility_data_service, FacilityDataService
 from ..middleware.auth import api_key_auth
+from ..utils.context_format import CONTEXT_FORMATS, VERBOSE
+from ..utils.event_stream import encode_ndjson, encode_sse
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -21,6 +24,15 @@ router = APIRouter(prefix="/facility-recommendations", tags=["Facility Recommend
 async def generate_facility_recommendations(
     facility_id: str,
     focus_areas: Optional[List[str]] = Query(None, description="Specific focus areas for recommendations"),
+    context_format: str = Query(
+        VERBOSE,
+        pattern=f"^({'|'.join(CONTEXT_FORMATS)})$",
+        description="Prompt context format: 'verbose' bullet lines or 'compact' CSV-like tables (fewer tokens)"
+    ),
+    fan_out: bool = Query(
+        False,
+        description="Generate each focus area (or every category) in concurrent smaller calls and merge the results"
+    ),
     facility_advisor: FacilityAdvisorService = Depends(get_facility_advisor_service),
     facility_data_service: FacilityDataService = Depends(get_facility_data_service),
     _: str = Depends(api_key_auth)
@@ -31,6 +43,8 @@ async def generate_facility_recommendations(
     Args:
         facility_id: ID of the facility to analyze
         focus_areas: Optional list of focus areas (e.g., ["Alternative Fuels", "Energy Efficiency"])
+        context_format: Facility context encoding used in the prompt
+        fan_out: Split generation per focus area into concurrent calls
         
     Returns:
         Comprehensive facility recommendations with implementation details
@@ -57,7 +71,9 @@ async def generate_facility_recommendations(
         logger.info(f"Generating AI recommendations for facility: {facility_id}")
         recommendations = await facility_advisor.generate_recommendations(
             facility_data=facility_data,
-            focus_areas=focus_areas
+            focus_areas=focus_areas,
+            context_format=context_format,
+            fan_out=fan_out
         )
         
         # Log successful generation
@@ -80,6 +96,65 @@ async def generate_facility_recommendations(
         )
 
 
+@router.post("/stream/{facility_id}")
+async def stream_facility_recommendations(
+    facility_id: str,
+    focus_areas: Optional[List[str]] = Query(None, description="Specific focus areas for recommendations"),
+    context_format: str = Query(
+        VERBOSE,
+        pattern=f"^({'|'.join(CONTEXT_FORMATS)})$",
+        description="Prompt context format: 'verbose' bullet lines or 'compact' CSV-like tables (fewer tokens)"
+    ),
+    stream_format: str = Query(
+        "ndjson",
+        pattern="^(ndjson|sse)$",
+        description="Wire format: newline-delimited JSON or Server-Sent Events"
+    ),
+    facility_advisor: FacilityAdvisorService = Depends(get_facility_advisor_service),
+    facility_data_service: FacilityDataService = Depends(get_facility_data_service),
+    _: str = Depends(api_key_auth)
+):
+    """
+    Stream AI-driven recommendations for a facility as each one is generated
+    
+    Each recommendation is validated against the recommendation schema before
+    it is sent, followed by a summary event and a final done event.
+    
+    Args:
+        facility_id: ID of the facility to analyze
+        focus_areas: Optional list of focus areas
+        context_format: Facility context encoding used in the prompt
+        stream_format: "ndjson" (one JSON event per line) or "sse"
+        
+    Returns:
+        StreamingResponse of recommendation events
+    """
+    if not facility_id or len(facility_id.strip()) == 0:
+        raise HTTPException(status_code=400, detail="Facility ID is required")
+    
+    facility_data = await facility_data_service.get_comprehensive_facility_data(facility_id)
+    if not facility_data.get('facility'):
+        raise HTTPException(
+            status_code=404, 
+            detail=f"Facility with ID {facility_id} not found or insufficient data available"
+        )
+    
+    logger.info(f"Streaming recommendations for facility: {facility_id} ({stream_format})")
+    events = facility_advisor.stream_recommendations(
+        facility_data=facility_data,
+        focus_areas=focus_areas,
+        context_format=context_format
+    )
+    
+    if stream_format == "sse":
+        return StreamingResponse(
+            encode_sse(events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    return StreamingResponse(encode_ndjson(events), media_type="application/x-ndjson")
+
+
 @router.get("/health")
 async def facility_recommendations_health():
     """
@@ -97,6 +172,9 @@ async def facility_recommendations_health():
                 "ai_recommendations": True,
                 "comprehensive_data_fetching": True,
                 "focus_area_filtering": True,
+                "compact_context_format": True,
+                "streaming_recommendations": True,
+                "fan_out_generation": True,
                 "demo_mode_available": True
             },
             "supported_focus_areas": [
@@ -4,15 +4,24 @@ Provides AI-powered cost analysis and recommendations for alternative fuels
 """
 
 from fastapi import APIRouter, HTTPException, Depends, Query
-from typing import List, Dict, Any, Optional
-from pydantic import BaseModel
-import logging
+from typing import List, Dict, Any, Literal, Optional
+from pydantic import BaseModel, Field
+import asyncio
 
 from ..services.fuel_cost_analyzer import fuel_cost_analyzer
+from ..services.fuel_blend_optimizer import (
+    BlendFuel,
+    availability_share,
+    fuel_blend_optimizer,
+    heat_content_gj,
+    unit_basis
+)
+from ..services.emission_factor_catalog import MASS_UNIT, emission_factor_catalog
 from ..services.facility_data_service import FacilityDataService
 from ..middleware.auth_middleware import get_current_user
+from ..utils.logger import get_logger
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 
 router = APIRouter(prefix="/fuel-cost-analysis", tags=["Fuel Cost Analysis"])
 
@@ -25,12 +34,40 @@ class FuelCostAnalysisRequest(BaseModel):
     facility_id: str
     preferences: UserPreferences = UserPreferences()
     include_conventional_fuels: bool = False
+    annual_heat_demand_gj: Optional[float] = Field(None, gt=0)  # basis of the annual cost/CO2 intervals
 
 class FuelCostAnalysisResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
 
+class PreferenceSweepRequest(BaseModel):
+    facility_id: str
+    fuel_names: Optional[List[str]] = None  # defaults to the facility's fuels
+    include_conventional_fuels: bool = False
+    levels: List[int] = Field(default_factory=lambda: list(range(1, 11)))  # swept for each preference
+    top_k: int = Field(1, ge=1, le=10)
+
+class BlendFuelInput(BaseModel):
+    name: str
+    emission_factor: float  # kgCO2e per unit
+    heat_content: float  # per unit, in heat_content_unit
+    heat_content_unit: str = 'MJ/kg'
+    cost_inr: float  # INR per unit
+    unit: str = 'kg'
+    is_alternative: bool = False
+    availability_score: Optional[float] = None  # caps the fuel's heat share
+    max_quantity: Optional[float] = None  # cap in fuel units
+
+class FuelBlendRequest(BaseModel):
+    facility_id: str
+    heat_demand_gj: float = Field(..., gt=0)
+    tsr_target_percent: float = Field(0.0, ge=0, le=100)  # thermal substitution rate
+    objective: Literal['cost', 'emission'] = 'cost'
+    budget_inr: Optional[float] = Field(None, gt=0)
+    fuels: Optional[List[BlendFuelInput]] = None  # defaults to the facility's fuels
+    alternative_fuels: List[str] = []  # names counted towards the TSR
+
 @router.post("/analyze", response_model=FuelCostAnalysisResponse)
 async def analyze_fuel_costs(
     request: FuelCostAnalysisRequest,
@@ -42,123 +79,7 @@ async def analyze_fuel_costs(
     try:
         logger.info(f"Starting fuel cost analysis for facility {request.facility_id}")
         
-        # Get facility data service
-        facility_service = FacilityDataService()
-        
-        # Fetch facility data including emission factors
-        facility_data = await facility_service.get_facility_data(request.facility_id)
-        
-        if not facility_data:
-            raise HTTPException(status_code=404, detail="Facility data not found")
-        
-        # Extract alternative fuels from facility data
-        alternative_fuels = []
-        
-        # Get resources data from facility
-        resources = facility_data.get('resources', [])
-        
-        for resource in resources:
-            # Check if this is an alternative fuel
-            if resource.get('category') == 'stationary_combustion' and resource.get('is_alternative_fuel'):
-                # Get emission factors for this resource
-                emission_factors = resource.get('emission_factors', [])
-                
-                for factor in emission_factors:
-                    fuel_data = {
-                        'resource_id': resource.get('id'),
-                        'resource_name': resource.get('resource_name'),
-                        'category': resource.get('category'),
-                        'description': resource.get('description', ''),
-                        'emission_factor': factor.get('emission_factor', 0),
-                        'emission_factor_unit': factor.get('emission_factor_unit', ''),
-                        'heat_content': factor.get('heat_content', 0),
-                        'heat_content_unit': factor.get('heat_content_unit', ''),
-                        'library_name': factor.get('library_name', ''),
-                        'library_version': factor.get('library_version', ''),
-                        'availability_score': factor.get('availability_score', 5)
-                    }
-                    alternative_fuels.append(fuel_data)
-        
-        # If no alternative fuels found in facility data, get from database
-        if not alternative_fuels:
-            logger.info("No alternative fuels found in facility data, fetching from database")
-            
-            # Create sample alternative fuels based on database seeded data
-            sample_fuels = [
-                {
-                    'resource_name': 'Biomass',
-                    'category': 'stationary_combustion',
-                    'description': 'Biomass for alternative fuel co-processing',
-                    'emission_factor': 0.39,  # From DEFRA
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content': 0.015,
-                    'heat_content_unit': 'GJ/kg',
-                    'library_name': 'DEFRA',
-                    'library_version': 'AR4',
-                    'availability_score': 5
-                },
-                {
-                    'resource_name': 'Waste-derived Fuel',
-                    'category': 'stationary_combustion', 
-                    'description': 'Municipal and industrial waste-derived fuel',
-                    'emission_factor': 1.85,  # Estimated
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content': 0.022,
-                    'heat_content_unit': 'GJ/kg',
-                    'library_name': 'Estimated',
-                    'library_version': 'India',
-                    'availability_score': 6
-                },
-                {
-                    'resource_name': 'Used Tires',
-                    'category': 'stationary_combustion',
-                    'description': 'Shredded used tires for fuel',
-                    'emission_factor': 2.95,  # Estimated
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content': 0.032,
-                    'heat_content_unit': 'GJ/kg',
-                    'library_name': 'Estimated',
-                    'library_version': 'India',
-                    'availability_score': 7
-                },
-                {
-                    'resource_name': 'Agricultural Waste',
-                    'category': 'stationary_combustion',
-                    'description': 'Agricultural residues and waste',
-                    'emission_factor': 0.45,  # Estimated
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content': 0.014,
-                    'heat_content_unit': 'GJ/kg',
-                    'library_name': 'Estimated',
-                    'library_version': 'India',
-                    'availability_score': 8
-                },
-                {
-                    'resource_name': 'Rice Husk',
-                    'category': 'stationary_combustion',
-                    'description': 'Rice husk biomass fuel',
-                    'emission_factor': 0.42,  # Estimated
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content': 0.013,
-                    'heat_content_unit': 'GJ/kg',
-                    'library_name': 'Estimated',
-                    'library_version': 'India',
-                    'availability_score': 9
-                },
-                {
-                    'resource_name': 'Cotton Stalks',
-                    'category': 'stationary_combustion',
-                    'description': 'Cotton stalk agricultural waste',
-                    'emission_factor': 0.48,  # Estimated
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content': 0.016,
-                    'heat_content_unit': 'GJ/kg',
-                    'library_name': 'Estimated',
-                    'library_version': 'India',
-                    'availability_score': 6
-                }
-            ]
-            alternative_fuels = sample_fuels
+        alternative_fuels = await _analysis_fuels(request.facility_id, request.include_conventional_fuels)
         
         logger.info(f"Found {len(alternative_fuels)} alternative fuels for analysis")
         
@@ -169,10 +90,12 @@ async def analyze_fuel_costs(
             'energy': request.preferences.energy
         }
         
-        # Perform comprehensive analysis
-        analysis_result = fuel_cost_analyzer.analyze_fuels_comprehensive(
+        # Perform comprehensive analysis (the Monte Carlo draws run off the event loop)
+        analysis_result = await asyncio.to_thread(
+            fuel_cost_analyzer.analyze_fuels_comprehensive,
             alternative_fuels, 
-            preferences_dict
+            preferences_dict,
+            request.annual_heat_demand_gj
         )
         
         logger.info("Fuel cost analysis completed successfully")
@@ -191,6 +114,78 @@ async def analyze_fuel_costs(
             error=f"Analysis failed: {str(e)}"
         )
 
+def _split_per_kg(fuels: List[Dict[str, Any]]):
+    """
+    Fuels the preference scores can compare (measured in kg) and the names of
+    the rest (the energy score and market fallback price are per kg)
+    """
+    kept = [fuel for fuel in fuels if fuel.get('unit', MASS_UNIT) == MASS_UNIT]
+    excluded = [fuel['resource_name'] for fuel in fuels if fuel.get('unit', MASS_UNIT) != MASS_UNIT]
+    return kept, excluded
+
+async def _analysis_fuels(facility_id: str, include_conventional_fuels: bool = False) -> List[Dict[str, Any]]:
+    """
+    Catalog rows of the facility's alternative fuels (or conventional fuels
+    too, if requested), falling back to the catalog's alternative fuels;
+    only fuels measured in kg are analyzed
+    """
+    # Get facility data service
+    facility_service = FacilityDataService()
+    
+    # Fetch facility data including configured resources
+    facility_data = await facility_service.get_comprehensive_facility_data(facility_id)
+    
+    if not facility_data:
+        raise HTTPException(status_code=404, detail="Facility data not found")
+    
+    fuels = emission_factor_catalog.facility_fuels(
+        facility_data, alternative_only=not include_conventional_fuels, unit=MASS_UNIT
+    )
+    
+    # If the facility has no alternative fuels configured, analyze the catalog's alternative fuels
+    if not fuels:
+        logger.info("No alternative fuels found in facility data, using the emission factor catalog")
+        fuels = emission_factor_catalog.fuels(alternative_only=True, unit=MASS_UNIT)
+    return fuels
+
+@router.post("/preference-sweep")
+async def sweep_preferences(
+    request: PreferenceSweepRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Rank fuels for every cost/emission/energy preference combination in one call
+    
+    Returns the winning fuel per grid cell so the UI can answer any slider
+    position without another request.
+    """
+    try:
+        excluded = []
+        if request.fuel_names:
+            fuels, excluded = _split_per_kg([fuel for fuel in map(emission_factor_catalog.find, request.fuel_names) if fuel])
+        else:
+            fuels = await _analysis_fuels(request.facility_id, request.include_conventional_fuels)
+        
+        if not fuels:
+            raise HTTPException(status_code=400, detail="No valid fuels (measured in kg) provided for the sweep")
+        
+        sweep = fuel_cost_analyzer.sweep_preferences(fuels, levels=request.levels, top_k=request.top_k)
+        
+        return {
+            'success': True,
+            'data': {
+                'facility_id': request.facility_id,
+                **sweep,
+                'excluded_fuels': excluded
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error sweeping preferences: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Preference sweep failed: {str(e)}")
+
 @router.get("/market-costs", response_model=Dict[str, Any])
 async def get_market_costs(
     fuel_name: Optional[str] = Query(None, description="Specific fuel name"),
@@ -213,15 +208,16 @@ async def get_market_costs(
         else:
             # Return all available market costs
             all_costs = {}
-            for fuel in fuel_cost_analyzer.INDIAN_FUEL_COSTS.keys():
-                all_costs[fuel] = fuel_cost_analyzer.get_indian_market_cost(fuel)
+            fuels = emission_factor_catalog.fuels(alternative_only=True)
+            for fuel in fuels:
+                all_costs[fuel['resource_name']] = fuel_cost_analyzer.get_indian_market_cost(fuel['resource_name'])
             
             return {
                 'success': True,
                 'data': {
                     'all_costs': all_costs,
                     'currency': 'INR',
-                    'last_updated': '2024-01-01',  # You may want to make this dynamic
+                    'last_updated': str(max((fuel['published_year'] for fuel in fuels), default='Unknown')),
                     'exchange_rate_usd_inr': fuel_cost_analyzer.USD_TO_INR_RATE
                 }
             }
@@ -230,6 +226,31 @@ async def get_market_costs(
         logger.error(f"Error getting market costs: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Failed to get market costs: {str(e)}")
 
+@router.get("/catalog")
+async def get_emission_factor_catalog(
+    scope: Optional[str] = Query(None, description="e.g. Scope 1"),
+    category: Optional[str] = Query(None, description="Activity type, e.g. Stationary Combustion"),
+    library: Optional[str] = Query(None, description="Source library, e.g. GHG Protocol"),
+    name: Optional[str] = Query(None, description="Resource name (all library versions)"),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Emission factor catalog rows filtered by scope, category, library or name
+    """
+    if name:
+        positions = emission_factor_catalog.rows_for_name(name)
+    else:
+        positions = emission_factor_catalog.select(scope=scope, category=category, library=library)
+    
+    return {
+        'success': True,
+        'data': {
+            'factors': emission_factor_catalog.records(positions.tolist()),
+            'total': int(len(positions)),
+            'catalog': emission_factor_catalog.get_stats()
+        }
+    }
+
 @router.post("/compare-fuels")
 async def compare_fuels(
     fuel_names: List[str],
@@ -240,50 +261,11 @@ async def compare_fuels(
     Compare specific alternative fuels
     """
     try:
-        # Get data for requested fuels
-        fuel_data = []
-        
-        for fuel_name in fuel_names:
-            # Create fuel data entry
-            if fuel_name == 'Biomass':
-                fuel_entry = {
-                    'resource_name': 'Biomass',
-                    'emission_factor': 0.39,
-                    'heat_content': 0.015,
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content_unit': 'GJ/kg'
-                }
-            elif fuel_name == 'Waste-derived Fuel':
-                fuel_entry = {
-                    'resource_name': 'Waste-derived Fuel',
-                    'emission_factor': 1.85,
-                    'heat_content': 0.022,
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content_unit': 'GJ/kg'
-                }
-            elif fuel_name == 'Used Tires':
-                fuel_entry = {
-                    'resource_name': 'Used Tires',
-                    'emission_factor': 2.95,
-                    'heat_content': 0.032,
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content_unit': 'GJ/kg'
-                }
-            elif fuel_name == 'Agricultural Waste':
-                fuel_entry = {
-                    'resource_name': 'Agricultural Waste',
-                    'emission_factor': 0.45,
-                    'heat_content': 0.014,
-                    'emission_factor_unit': 'kgCO2e/kg',
-                    'heat_content_unit': 'GJ/kg'
-                }
-            else:
-                continue  # Skip unknown fuels
-            
-            fuel_data.append(fuel_entry)
+        # Get catalog data for requested fuels (unknown fuels are skipped, fuels in L or m3 excluded)
+        fuel_data, excluded = _split_per_kg([fuel for fuel in map(emission_factor_catalog.find, fuel_names) if fuel])
         
         if not fuel_data:
-            raise HTTPException(status_code=400, detail="No valid fuels provided for comparison")
+            raise HTTPException(status_code=400, detail="No valid fuels (measured in kg) provided for comparison")
         
         # Perform analysis
         preferences_dict = {
@@ -292,14 +274,15 @@ async def compare_fuels(
             'energy': preferences.energy
         }
         
-        analysis_result = fuel_cost_analyzer.analyze_fuels_comprehensive(
-            fuel_data, 
+        analysis_result = await asyncio.to_thread(
+            fuel_cost_analyzer.analyze_fuels_comprehensive,
+            fuel_data,
             preferences_dict
         )
         
         return {
             'success': True,
-            'data': analysis_result
+            'data': {**analysis_result, 'excluded_fuels': excluded}
         }
         
     except HTTPException:
@@ -308,6 +291,126 @@ async def compare_fuels(
         logger.error(f"Error comparing fuels: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Comparison failed: {str(e)}")
 
+@router.post("/blend")
+async def optimize_fuel_blend(
+    request: FuelBlendRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Optimize a fuel blend (minimum cost or minimum emissions) for a heat demand
+    and thermal substitution target, using catalog costs and emission factors
+    """
+    try:
+        if request.fuels:
+            for fuel in request.fuels:
+                basis = unit_basis(fuel.heat_content_unit)
+                if '/' in fuel.heat_content_unit and basis != unit_basis(fuel.unit):
+                    raise ValueError(f"{fuel.name}: heat content is per {basis} but cost is per {fuel.unit}")
+            fuels = [
+                BlendFuel(
+                    name=fuel.name,
+                    emission_factor=fuel.emission_factor,
+                    heat_content_gj=heat_content_gj(fuel.heat_content, fuel.heat_content_unit),
+                    cost_inr=fuel.cost_inr,
+                    unit=fuel.unit,
+                    is_alternative=fuel.is_alternative,
+                    max_heat_share=availability_share(fuel.availability_score),
+                    max_quantity=fuel.max_quantity
+                )
+                for fuel in request.fuels
+            ]
+        else:
+            facility_service = FacilityDataService()
+            facility_data = await facility_service.get_comprehensive_facility_data(request.facility_id)
+            fuels = _blend_fuels_from_facility_data(facility_data)
+        
+        # Names listed by the caller count towards the substitution rate
+        alternative_names = {name.strip().lower() for name in request.alternative_fuels}
+        for fuel in fuels:
+            if fuel.name.strip().lower() in alternative_names:
+                fuel.is_alternative = True
+        
+        result = fuel_blend_optimizer.optimize(
+            fuels,
+            heat_demand_gj=request.heat_demand_gj,
+            tsr_target=request.tsr_target_percent / 100.0,
+            objective=request.objective,
+            budget_inr=request.budget_inr
+        )
+        
+        return {
+            'success': True,
+            'data': {
+                'facility_id': request.facility_id,
+                'heat_demand_gj': request.heat_demand_gj,
+                'tsr_target_percent': request.tsr_target_percent,
+                'budget_inr': request.budget_inr,
+                'candidate_fuels': len(fuels),
+                **result
+            }
+        }
+        
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error optimizing fuel blend: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Blend optimization failed: {str(e)}")
+
+def _blend_fuels_from_facility_data(facility_data: Dict[str, Any]) -> List[BlendFuel]:
+    """
+    Blend candidates: the facility's configured resources (emission factor,
+    heat content, approximate cost and availability as configured) plus the
+    catalog's priced alternative fuels
+    
+    A configured resource is used only when its emission factor, heat content
+    and cost refer to the same fuel unit; the catalog cost stands in for a
+    missing approximate cost only when the catalog row is in that unit too.
+    """
+    fuels = {}
+    for resource in facility_data.get('facility_resources', []):
+        factor = resource.get('emissionFactor') or {}
+        name = (resource.get('resource') or {}).get('name')
+        heat = heat_content_gj(factor.get('heatContent'), factor.get('heatContentUnit'))
+        if not name or name.strip().lower() in fuels or heat <= 0 or factor.get('value') is None:
+            continue
+        catalog_fuel = emission_factor_catalog.find(name) or {}
+        bases = {unit_basis(factor.get(key)) for key in ('unit', 'heatContentUnit')} - {''}
+        cost = factor.get('approximateCost')
+        if cost is not None:
+            bases.add(unit_basis(factor.get('costUnit')) or next(iter(bases), 'kg'))
+        elif catalog_fuel.get('cost_inr') is not None and (not bases or unit_basis(catalog_fuel['unit']) in bases):
+            cost = catalog_fuel['cost_inr']
+            bases.add(unit_basis(catalog_fuel['unit']))
+        if cost is None or len(bases) > 1:
+            if len(bases) > 1:
+                logger.warning(f"Skipping blend candidate {name}: per-unit values mix {sorted(bases)}")
+            continue
+        fuels[name.strip().lower()] = BlendFuel(
+            name=name,
+            emission_factor=float(factor['value']),
+            heat_content_gj=heat,
+            cost_inr=float(cost),
+            unit=next(iter(bases), 'kg'),
+            is_alternative=bool(catalog_fuel.get('is_alternative_fuel')),
+            max_heat_share=availability_share(factor.get('availabilityScore'))
+        )
+    
+    for fuel in emission_factor_catalog.fuels(alternative_only=True):
+        key = fuel['resource_name'].strip().lower()
+        if key in fuels:
+            continue
+        fuels[key] = BlendFuel(
+            name=fuel['resource_name'],
+            emission_factor=fuel['emission_factor'],
+            heat_content_gj=fuel['heat_content'],
+            cost_inr=fuel['cost_inr'],
+            unit=fuel['unit'],
+            is_alternative=True
+        )
+    return list(fuels.values())
+
 @router.get("/health")
 async def health_check():
     """Health check endpoint"""
@@ -318,6 +421,9 @@ async def health_check():
             'cost_analysis',
             'ai_recommendations', 
             'market_costs',
+            'fuel_blend_lp',
+            'emission_factor_catalog',
+            'preference_sweep',
             'fuel_comparison'
         ]
     }
@@ -7,7 +7,8 @@ from fastapi import APIRouter
 from pydantic import BaseModel
 
 from ..config.settings import get_settings
-from ..utils.logger import get_logger
+from ..middleware.jwt_cache import jwt_claims_cache
+from ..utils.logger import get_logger, get_logging_stats
 
 router = APIRouter()
 settings = get_settings()
@@ -41,7 +42,9 @@ async def health_check():
             "services": {
                 "ai_models": {"status": "healthy", "message": "AI models not loaded yet"},
                 "database": {"status": "not_configured", "message": "Database connection not implemented yet"},
-                "openai": {"status": "configured" if settings.openai_api_key else "not_configured"}
+                "openai": {"status": "configured" if settings.openai_api_key else "not_configured"},
+                "auth_cache": jwt_claims_cache.get_stats(),
+                "logging": get_logging_stats()
             }
         }
         
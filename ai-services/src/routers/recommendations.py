@@ -6,6 +6,9 @@ from datetime import datetime
 from fastapi import APIRouter
 from pydantic import BaseModel
 
+from ..services.backend_service import get_backend_service
+from ..services.benchmarking_engine import benchmarking_engine
+from ..services.target_trajectory import target_trajectory_engine
 from ..utils.logger import get_logger
 
 router = APIRouter()
@@ -56,20 +59,62 @@ async def get_target_recommendations(request: RecommendationRequest):
     """
     Get targets and goals recommendations
     
+    Evaluates the organization's sustainability targets (preferences.targets,
+    default: fetched for preferences.organization_id) against the facility's
+    monthly emission and production series (preferences.emissions /
+    preferences.production, default: the last preferences.months months from
+    the backend): required annual change, progress, gaps, pathways and
+    on-track status per target.
+    
     Args:
         request: Recommendation request
         
     Returns:
         dict: Target recommendations
     """
-    # Placeholder implementation
+    preferences = request.preferences or {}
+    organization_id = preferences.get("organization_id")
+    targets = preferences.get("targets")
+    emissions = preferences.get("emissions")
+    production = preferences.get("production")
+    
+    if targets is None or emissions is None or production is None:
+        backend_service = await get_backend_service()
+        months = int(preferences.get("months", 24))
+        if targets is None and organization_id:
+            targets = await backend_service.get_targets(organization_id=organization_id)
+        if emissions is None:
+            emissions = await backend_service.get_emission_data(
+                request.facility_id, months=months, organization_id=organization_id
+            )
+        if production is None:
+            production = await backend_service.get_production_data(
+                request.facility_id, months=months, organization_id=organization_id
+            )
+    
+    if not targets:
+        return {
+            "success": False,
+            "message": "No sustainability targets found",
+            "data": {"facility_id": request.facility_id, "organization_id": organization_id},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    
+    trajectories = target_trajectory_engine.evaluate(
+        targets, emissions or [], production or [], series_scope=request.facility_id
+    )
+    status_counts = {}
+    for trajectory in trajectories:
+        status_counts[trajectory["status"]] = status_counts.get(trajectory["status"], 0) + 1
+    
     return {
         "success": True,
-        "message": "Target recommendations endpoint - Coming in Phase 6",
         "data": {
             "facility_id": request.facility_id,
             "recommendation_type": request.recommendation_type,
-            "note": "This will be implemented in Phase 6: Advanced AI Features"
+            "target_count": len(trajectories),
+            "status_counts": status_counts,
+            "targets": trajectories
         },
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
@@ -80,20 +125,43 @@ async def get_benchmarking_analysis(request: RecommendationRequest):
     """
     Get benchmarking analysis
     
+    Ranks an organization (preferences.organization_name, default: the
+    benchmark's target company) and optional explicit metric values
+    (preferences.metrics, e.g. {"scope_1_2_per_tonne": 0.62}) against the
+    industry peers of a reporting year (preferences.year, default: latest).
+    
     Args:
         request: Recommendation request
         
     Returns:
         dict: Benchmarking analysis
     """
-    # Placeholder implementation
+    preferences = request.preferences or {}
+    year = preferences.get("year")
+    benchmark_year = await benchmarking_engine.get_year(int(year) if year else None)
+    
+    if benchmark_year is None:
+        return {
+            "success": False,
+            "message": "No industry benchmarking data available",
+            "data": {"facility_id": request.facility_id, "year": year},
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        }
+    
+    organization = benchmark_year.organization(preferences.get("organization_name"))
+    metrics = preferences.get("metrics")
+    facility_ranks = benchmark_year.rank_values(metrics) if isinstance(metrics, dict) else None
+    
     return {
         "success": True,
-        "message": "Benchmarking analysis endpoint - Coming in Phase 6",
         "data": {
             "facility_id": request.facility_id,
-            "note": "This will be implemented in Phase 6: Advanced AI Features"
+            "year": benchmark_year.year,
+            "peer_count": len(benchmark_year.organizations),
+            "target_organization": benchmark_year.target_organization,
+            "organization": organization,  # {"organization", "ranks"} or None if not in the table
+            "facility_ranks": facility_ranks,
+            "peer_summary": benchmark_year.summary()
         },
         "timestamp": datetime.utcnow().isoformat() + "Z"
     }
-
@@ -3,20 +3,29 @@ Smart Fuel Analysis Router
 Enhanced AI-powered fuel analysis with intuitive natural language insights
 """
 
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Dict, List, Optional, Any
-import logging
+from typing import AsyncIterator, Dict, List, Optional, Any
+import asyncio
 import json
 from datetime import datetime
 
+from ..config.settings import get_settings
 from ..services.openai_client import openai_client
+from ..services.smart_analysis_cache import smart_analysis_cache
 from ..middleware.auth import get_current_user
+from ..utils.event_stream import STREAM_FORMATS, encode_ndjson, encode_sse
+from ..utils.logger import get_logger
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
+settings = get_settings()
 
 router = APIRouter(prefix="/smart-fuel-analysis", tags=["Smart Fuel Analysis"])
 
+# Completion options of the AI fuel analysis
+ANALYSIS_OPTIONS = {"max_tokens": 1500, "temperature": 0.7}
+
 class FuelFactor(BaseModel):
     resource_name: str
     emission_factor: float
@@ -46,6 +55,8 @@ class SmartAnalysisResponse(BaseModel):
     analysis: Optional[str] = None
     recommendations: Optional[List[Dict[str, Any]]] = None
     insights: Optional[Dict[str, Any]] = None
+    analysis_status: Optional[str] = None  # generated / cached / refining / pending / fallback
+    analysis_key: Optional[str] = None  # poll GET /recommendations/{analysis_key} while refining
     error: Optional[str] = None
 
 @router.post("/recommendations", response_model=SmartAnalysisResponse)
@@ -65,49 +76,51 @@ async def generate_smart_recommendations(
                 analysis="No fuel factors provided for analysis. Please adjust your criteria to find matching fuels."
             )
 
-        # Sort factors by carbon intensity (best environmental performance first)
-        sorted_factors = sorted(request.selected_factors, key=lambda x: x.carbon_intensity)
+        sorted_factors, analysis_data = prepare_analysis(request)
         
-        # Prepare analysis data
-        analysis_data = {
-            "facility": {
-                "name": request.facility_name,
-                "location": request.facility_location,
-                "id": request.facility_id
-            },
-            "user_preferences": {
-                "target_cost": request.user_criteria.target_cost,
-                "target_emission": request.user_criteria.target_emission, 
-                "target_energy": request.user_criteria.target_energy,
-                "tolerance_percent": request.user_criteria.tolerance
-            },
-            "fuel_options": [
-                {
-                    "name": factor.resource_name,
-                    "cost_inr_per_kg": factor.cost_INR,
-                    "emission_factor": factor.emission_factor,
-                    "heat_content": factor.heat_content,
-                    "carbon_intensity": factor.carbon_intensity,
-                    "is_renewable": factor.is_renewable,
-                    "is_biofuel": factor.is_biofuel,
-                    "source": factor.reference_source
-                }
-                for factor in sorted_factors[:5]  # Top 5 options
-            ]
-        }
-
-        # Generate AI analysis
-        analysis_text = await generate_intuitive_analysis(analysis_data)
-        
-        # Generate structured insights
+        # Generate structured insights (returned immediately, never waits for the AI text)
         insights = generate_structured_insights(sorted_factors, request.user_criteria)
         
-        logger.info("Smart fuel analysis completed successfully")
+        # Reuse the analysis of nearby criteria for the same facility and fuel set
+        criteria = request.user_criteria.dict()
+        fuel_names = [option["name"] for option in analysis_data["fuel_options"]]
+        analysis_key = smart_analysis_cache.make_key(request.facility_id, fuel_names, criteria)
+        entry = smart_analysis_cache.get(analysis_key)
+        ai_available = openai_client.is_available()
+        
+        if entry is not None:
+            analysis_text = entry.analysis
+            analysis_status = "cached"
+            # Retry fallback texts; optionally rewrite the analysis for the exact criteria
+            refine = entry.source == "fallback" or (
+                settings.smart_analysis_background_refinement and entry.criteria != criteria
+            )
+            if ai_available and (refine or smart_analysis_cache.is_pending(analysis_key)):
+                smart_analysis_cache.generate(
+                    analysis_key, criteria, lambda: generate_ai_analysis_entry(analysis_data), refinement=True
+                )
+                analysis_status = "refining"
+        elif ai_available:
+            # Wait for the AI text on a miss (joining a generation already running for
+            # the key); only near-miss refinements above run in the background
+            entry = await asyncio.shield(smart_analysis_cache.generate(
+                analysis_key, criteria, lambda: generate_ai_analysis_entry(analysis_data)
+            ))
+            analysis_text = entry.analysis
+            analysis_status = "generated" if entry.source == "ai" else "fallback"
+        else:
+            analysis_text = generate_fallback_analysis(analysis_data)
+            smart_analysis_cache.put(analysis_key, analysis_text, criteria, source="fallback")
+            analysis_status = "fallback"
+        
+        logger.info(f"Smart fuel analysis completed ({analysis_status})")
         
         return SmartAnalysisResponse(
             success=True,
             analysis=analysis_text,
-            insights=insights
+            insights=insights,
+            analysis_status=analysis_status,
+            analysis_key=analysis_key
         )
         
     except Exception as e:
@@ -117,12 +130,191 @@ async def generate_smart_recommendations(
             error=f"Analysis failed: {str(e)}"
         )
 
+def prepare_analysis(request: SmartAnalysisRequest):
+    """Factors sorted by carbon intensity and the analysis data of the top 5"""
+    
+    # Sort factors by carbon intensity (best environmental performance first)
+    sorted_factors = sorted(request.selected_factors, key=lambda x: x.carbon_intensity)
+    
+    # Prepare analysis data
+    analysis_data = {
+        "facility": {
+            "name": request.facility_name,
+            "location": request.facility_location,
+            "id": request.facility_id
+        },
+        "user_preferences": {
+            "target_cost": request.user_criteria.target_cost,
+            "target_emission": request.user_criteria.target_emission, 
+            "target_energy": request.user_criteria.target_energy,
+            "tolerance_percent": request.user_criteria.tolerance
+        },
+        "fuel_options": [
+            {
+                "name": factor.resource_name,
+                "cost_inr_per_kg": factor.cost_INR,
+                "emission_factor": factor.emission_factor,
+                "heat_content": factor.heat_content,
+                "carbon_intensity": factor.carbon_intensity,
+                "is_renewable": factor.is_renewable,
+                "is_biofuel": factor.is_biofuel,
+                "source": factor.reference_source
+            }
+            for factor in sorted_factors[:5]  # Top 5 options
+        ]
+    }
+    return sorted_factors, analysis_data
+
+@router.post("/recommendations/stream")
+async def stream_smart_recommendations(
+    request: SmartAnalysisRequest,
+    stream_format: str = Query(
+        "ndjson",
+        pattern=f"^({'|'.join(STREAM_FORMATS)})$",
+        description="Wire format: newline-delimited JSON or Server-Sent Events"
+    ),
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Stream the AI analysis text as it is generated
+    
+    Events: insights (sent first), analysis (text deltas), error (AI failure;
+    the template analysis follows as one delta) and done (analysis_key and
+    analysis_status). Cached analyses, and analyses already being generated
+    for the same key (awaited instead of requested again), are sent as a
+    single delta.
+    """
+    if not request.selected_factors:
+        raise HTTPException(status_code=400, detail="No fuel factors provided for analysis")
+    
+    sorted_factors, analysis_data = prepare_analysis(request)
+    events = stream_analysis_events(request, sorted_factors, analysis_data)
+    
+    if stream_format == "sse":
+        return StreamingResponse(
+            encode_sse(events),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    return StreamingResponse(encode_ndjson(events), media_type="application/x-ndjson")
+
+async def stream_analysis_events(
+    request: SmartAnalysisRequest,
+    sorted_factors: List[FuelFactor],
+    analysis_data: Dict[str, Any]
+) -> AsyncIterator[Dict[str, Any]]:
+    """Insights, analysis deltas and a done event; streamed AI text is cached"""
+    yield {"event": "insights", "data": generate_structured_insights(sorted_factors, request.user_criteria)}
+    
+    criteria = request.user_criteria.dict()
+    fuel_names = [option["name"] for option in analysis_data["fuel_options"]]
+    analysis_key = smart_analysis_cache.make_key(request.facility_id, fuel_names, criteria)
+    entry = smart_analysis_cache.get(analysis_key)
+    
+    if entry is not None and entry.source == "ai" and (
+        entry.criteria == criteria or not settings.smart_analysis_background_refinement
+    ):
+        yield {"event": "analysis", "data": {"delta": entry.analysis}}
+        yield {"event": "done", "data": {"analysis_key": analysis_key, "analysis_status": "cached"}}
+        return
+    
+    # A /recommendations request is already generating this analysis; wait for it
+    # (shielded, so a client disconnect does not cancel the shared task)
+    pending = smart_analysis_cache.pending_task(analysis_key)
+    if pending is not None:
+        try:
+            entry = await asyncio.shield(pending)
+        except Exception as e:
+            logger.error(f"Pending AI analysis failed: {str(e)}")
+        else:
+            analysis_status = "cached" if entry.source == "ai" else "fallback"
+            yield {"event": "analysis", "data": {"delta": entry.analysis}}
+            yield {"event": "done", "data": {"analysis_key": analysis_key, "analysis_status": analysis_status}}
+            return
+    
+    analysis_status = "fallback"
+    model = None
+    if pending is None and openai_client.is_available():
+        stream = openai_client.complete(prompt=build_analysis_prompt(analysis_data), stream=True, **ANALYSIS_OPTIONS)
+        streamed = False
+        try:
+            async for delta in stream:
+                streamed = True
+                yield {"event": "analysis", "data": {"delta": delta}}
+            smart_analysis_cache.put(analysis_key, stream.result["completion"], criteria, source="ai")
+            analysis_status = "streamed"
+            model = stream.result["model"]
+        except Exception as e:
+            logger.error(f"Error streaming AI analysis: {str(e)}")
+            yield {"event": "error", "data": {"error": str(e), "partial": streamed}}
+    
+    if analysis_status == "fallback":
+        analysis_text = generate_fallback_analysis(analysis_data)
+        if entry is None:
+            smart_analysis_cache.put(analysis_key, analysis_text, criteria, source="fallback")
+        yield {"event": "analysis", "data": {"delta": analysis_text}}
+    
+    yield {"event": "done", "data": {"analysis_key": analysis_key, "analysis_status": analysis_status, "model": model}}
+
+@router.get("/recommendations/{analysis_key}", response_model=SmartAnalysisResponse)
+async def get_smart_recommendation(
+    analysis_key: str,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Get the cached analysis of an earlier /recommendations request
+    
+    Analyses are cached per process, so this only finds keys issued by the
+    same worker (run a single worker or route a client to one worker).
+    """
+    entry = smart_analysis_cache.get(analysis_key)
+    pending = smart_analysis_cache.is_pending(analysis_key)
+    
+    if entry is None and not pending:
+        raise HTTPException(status_code=404, detail="Analysis not found or expired")
+    
+    return SmartAnalysisResponse(
+        success=True,
+        analysis=entry.analysis if entry else None,
+        analysis_status=("refining" if pending else "cached") if entry else "pending",
+        analysis_key=analysis_key
+    )
+
+async def generate_ai_analysis_entry(data: Dict[str, Any]) -> Dict[str, str]:
+    """AI analysis for the cache, marked as fallback when the AI call failed"""
+    analysis = await request_ai_analysis(data)
+    if analysis is None:
+        return {"analysis": generate_fallback_analysis(data), "source": "fallback"}
+    return {"analysis": analysis, "source": "ai"}
+
 async def generate_intuitive_analysis(data: Dict[str, Any]) -> str:
     """Generate intuitive, easy-to-understand AI analysis"""
     
+    analysis = await request_ai_analysis(data)
+    return analysis if analysis is not None else generate_fallback_analysis(data)
+
+async def request_ai_analysis(data: Dict[str, Any]) -> Optional[str]:
+    """Request the AI analysis text (None if the AI service failed)"""
+    
     try:
-        # Create detailed prompt for natural analysis
-        prompt = f"""You are an expert sustainability consultant helping {data['facility']['name']} 
+        prompt = build_analysis_prompt(data)
+        
+        # Call OpenAI for analysis
+        response = await openai_client.complete(prompt=prompt, **ANALYSIS_OPTIONS)
+        
+        if response and response.get('success'):
+            return response.get('completion', '').strip()
+        else:
+            logger.warning("OpenAI analysis failed, using fallback")
+            return None
+            
+    except Exception as e:
+        logger.error(f"Error generating AI analysis: {str(e)}")
+        return None
+
+def build_analysis_prompt(data: Dict[str, Any]) -> str:
+    """Prompt of the AI fuel analysis"""
+    return f"""You are an expert sustainability consultant helping {data['facility']['name']} 
 in {data['facility']['location']} choose the best alternative fuel. 
 
 The facility manager has set these preferences:
@@ -147,23 +339,6 @@ Use emojis sparingly for visual appeal. Focus on actionable insights that help d
 
 Write as if you've analyzed thousands of similar facilities and have deep insights about the Indian market."""
 
-        # Call OpenAI for analysis
-        response = await openai_client.generate_completion(
-            prompt=prompt,
-            max_tokens=1500,
-            temperature=0.7
-        )
-        
-        if response and response.get('success'):
-            return response.get('completion', '').strip()
-        else:
-            logger.warning("OpenAI analysis failed, using fallback")
-            return generate_fallback_analysis(data)
-            
-    except Exception as e:
-        logger.error(f"Error generating AI analysis: {str(e)}")
-        return generate_fallback_analysis(data)
-
 def generate_fallback_analysis(data: Dict[str, Any]) -> str:
     """Generate fallback analysis when AI service is unavailable"""
     
@@ -129,7 +129,7 @@ class BackendService:
             
             if data.get("success"):
                 facilities = data.get("data", [])
-                logger.debug(f"Retrieved {len(facilities)} facilities for organization {organization_id}")
+                logger.debug("Retrieved %s facilities for organization %s", len(facilities), organization_id)
                 return facilities
             else:
                 logger.warning(f"Backend returned unsuccessful response for organization facilities {organization_id}")
@@ -179,7 +179,7 @@ class BackendService:
             data = response.json()
             
             if data.get("success"):
-                logger.debug(f"Retrieved facility data for {facility_id}")
+                logger.debug("Retrieved facility data for %s", facility_id)
                 return data.get("data")
             else:
                 logger.warning(f"Backend returned unsuccessful response for facility {facility_id}")
@@ -231,7 +231,7 @@ class BackendService:
             data = response.json()
             
             if data.get("success"):
-                logger.debug(f"Retrieved emission data for facility {facility_id}")
+                logger.debug("Retrieved emission data for facility %s", facility_id)
                 return data.get("data", [])
             else:
                 logger.warning(f"Backend returned unsuccessful response for emission data {facility_id}")
@@ -280,7 +280,7 @@ class BackendService:
             data = response.json()
             
             if data.get("success"):
-                logger.debug(f"Retrieved production data for facility {facility_id}")
+                logger.debug("Retrieved production data for facility %s", facility_id)
                 return data.get("data", [])
             else:
                 logger.warning(f"Backend returned unsuccessful response for production data {facility_id}")
@@ -451,7 +451,7 @@ class BackendService:
             data = response.json()
             
             if data.get("success"):
-                logger.debug(f"Saved chat history for session {session_id}")
+                logger.debug("Saved chat history for session %s", session_id)
                 return True
             else:
                 logger.warning(f"Failed to save chat history: {data.get('message', 'Unknown error')}")
@@ -504,7 +504,7 @@ class BackendService:
             
             if data.get("success") and data.get("data", {}).get("targets"):
                 targets = data["data"]["targets"]
-                logger.debug(f"Retrieved {len(targets)} targets from backend for organization {organization_id}")
+                logger.debug("Retrieved %s targets from backend for organization %s", len(targets), organization_id)
                 return targets
             else:
                 logger.info(f"No targets found for organization {organization_id}")
@@ -558,7 +558,7 @@ class BackendService:
             
             if data.get("success") and data.get("data", {}).get("resources"):
                 resources = data["data"]["resources"]
-                logger.debug(f"Retrieved {len(resources)} resources for facility {facility_id}")
+                logger.debug("Retrieved %s resources for facility %s", len(resources), facility_id)
                 return resources
             else:
                 logger.info(f"No resources found for facility {facility_id}")
@@ -581,6 +581,45 @@ class BackendService:
             logger.error(f"Unexpected error getting facility resources: {e}")
             return None
 
+    async def get_industry_benchmarking(self, year: int) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get industry benchmarking rows (peer organizations) for a reporting year
+        
+        Args:
+            year: Reporting year
+            
+        Returns:
+            List of industry_benchmarking rows or None
+        """
+        try:
+            if not self.client:
+                logger.warning("Backend client not available")
+                return None
+            
+            # Full rows (ib.*): intensities and energy columns are needed for ranking
+            response = await self.client.get("/api/industry-benchmarking/data", params={"year": year})
+            response.raise_for_status()
+            
+            data = response.json()
+            
+            if data.get("success"):
+                companies = data.get("data", {}).get("companies", [])
+                logger.debug("Retrieved %s benchmarking rows for %s", len(companies), year)
+                return companies
+            else:
+                logger.info(f"No benchmarking data found for {year}")
+                return []
+                
+        except HTTPStatusError as e:
+            logger.error(f"HTTP error getting industry benchmarking: {e.response.status_code}")
+            return None
+        except RequestError as e:
+            logger.error(f"Request error getting industry benchmarking: {e}")
+            return None
+        except Exception as e:
+            logger.error(f"Unexpected error getting industry benchmarking: {e}")
+            return None
+
     async def close(self):
         """Close the HTTP client"""
         if self.client:
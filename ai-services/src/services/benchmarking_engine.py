@@ -0,0 +1,373 @@
+"""
+Benchmarking Engine
+Percentile ranks and peer quartiles over the industry_benchmarking table
+"""
+
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config.settings import get_settings
+from ..utils.logger import get_logger
+from .backend_service import get_backend_service
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+def _column(name: str) -> Callable[[Dict[str, Any]], Optional[float]]:
+    return lambda row: _number(row.get(name))
+
+
+def _ratio(numerator: Callable, denominator: Callable, scale: float = 1.0) -> Callable[[Dict[str, Any]], Optional[float]]:
+    def value(row: Dict[str, Any]) -> Optional[float]:
+        top, bottom = numerator(row), denominator(row)
+        if top is None or not bottom or bottom <= 0:
+            return None
+        return top / bottom * scale
+    return value
+
+
+def _sum(*parts: Callable) -> Callable[[Dict[str, Any]], Optional[float]]:
+    def value(row: Dict[str, Any]) -> Optional[float]:
+        values = [part(row) for part in parts]
+        return None if any(v is None for v in values) else sum(values)
+    return value
+
+
+@dataclass(frozen=True)
+class BenchmarkMetric:
+    """A ranked metric: how to read it from a row and which direction is better"""
+    name: str
+    label: str
+    unit: str
+    extract: Callable[[Dict[str, Any]], Optional[float]]
+    higher_is_better: bool = False
+
+
+# Metrics ranked per reporting year (units as stored in industry_benchmarking)
+BENCHMARK_METRICS: Dict[str, BenchmarkMetric] = {metric.name: metric for metric in (
+    BenchmarkMetric("scope_1", "Scope 1 emissions", "tCO2e", _column("scope_1")),
+    BenchmarkMetric("scope_2", "Scope 2 emissions", "tCO2e", _column("scope_2")),
+    BenchmarkMetric("scope_3", "Scope 3 emissions", "tCO2e", _column("scope_3")),
+    BenchmarkMetric("scope_1_intensity", "Scope 1 intensity", "reported", _column("scope_1_intensity")),
+    BenchmarkMetric("scope_2_intensity", "Scope 2 intensity", "reported", _column("scope_2_intensity")),
+    BenchmarkMetric("scope_3_intensity", "Scope 3 intensity", "reported", _column("scope_3_intensity")),
+    BenchmarkMetric(
+        "scope_1_2_per_tonne", "Scope 1+2 emissions per tonne of cement", "tCO2e/t",
+        _ratio(_sum(_column("scope_1"), _column("scope_2")), _column("annual_cement_production"))
+    ),
+    BenchmarkMetric("water_consumption", "Water consumption", "m3", _column("water_consumption")),
+    BenchmarkMetric("water_consumption_intensity", "Water consumption intensity", "reported", _column("water_consumption_intensity")),
+    BenchmarkMetric("water_withdrawal", "Water withdrawal", "m3", _column("water_withdrawal")),
+    BenchmarkMetric("water_withdrawal_intensity", "Water withdrawal intensity", "reported", _column("water_withdrawal_intensity")),
+    BenchmarkMetric("waste_generated", "Waste generated", "MT", _column("waste_generated")),
+    BenchmarkMetric("total_energy_consumption", "Total energy consumption", "J", _column("total_energy_consumption")),
+    BenchmarkMetric(
+        "renewable_energy_share", "Renewable share of energy", "%",
+        _ratio(_column("renewable_energy_consumption"), _column("total_energy_consumption"), 100.0),
+        higher_is_better=True
+    ),
+)}
+
+# Metrics summarized in chat context
+CONTEXT_METRICS = ("scope_1_2_per_tonne", "scope_1_intensity", "scope_2_intensity",
+                   "water_consumption_intensity", "renewable_energy_share")
+
+# Years searched back from the current year when no year is requested
+DEFAULT_YEAR_LOOKBACK = 3
+
+
+def _number(value: Any) -> Optional[float]:
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if np.isfinite(number) else None
+
+
+class MetricDistribution:
+    """
+    Sorted values of one metric in one reporting year
+
+    Percentile ranks are two binary searches; quartile boundaries are
+    computed once.
+    """
+
+    def __init__(self, metric: BenchmarkMetric, values: Sequence[float]):
+        self.metric = metric
+        self.values = np.sort(np.asarray(values, dtype=float))
+        self.quartiles = np.percentile(self.values, (25, 50, 75)) if len(self.values) else np.zeros(3)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def rank(self, value: float) -> Dict[str, Any]:
+        """
+        Position of a value among the peers
+
+        Args:
+            value: Metric value
+
+        Returns:
+            Dict with percentile (share of peers below, ties counted half),
+            performance_percentile (share of peers the value does better
+            than), peer quartile (1 = best) and the peer count
+        """
+        n = len(self.values)
+        below = int(np.searchsorted(self.values, value, side="left"))
+        at_or_below = int(np.searchsorted(self.values, value, side="right"))
+        percentile = (below + (at_or_below - below) / 2) / n * 100
+        performance = percentile if self.metric.higher_is_better else 100 - percentile
+
+        # Quartile 1 is the best-performing quarter for the metric's direction
+        position = int(np.searchsorted(self.quartiles, value, side="left"))
+        quartile = 4 - position if self.metric.higher_is_better else position + 1
+
+        return {
+            "metric": self.metric.name,
+            "label": self.metric.label,
+            "unit": self.metric.unit,
+            "value": value,
+            "percentile": round(percentile, 1),
+            "performance_percentile": round(performance, 1),
+            "quartile": quartile,
+            "peers": n,
+            "higher_is_better": self.metric.higher_is_better,
+        }
+
+    def summary(self) -> Dict[str, Any]:
+        """Peer distribution statistics"""
+        return {
+            "label": self.metric.label,
+            "unit": self.metric.unit,
+            "peers": len(self.values),
+            "min": float(self.values[0]),
+            "q1": float(self.quartiles[0]),
+            "median": float(self.quartiles[1]),
+            "q3": float(self.quartiles[2]),
+            "max": float(self.values[-1]),
+            "higher_is_better": self.metric.higher_is_better,
+        }
+
+
+class BenchmarkYear:
+    """All metric distributions of one reporting year, with precomputed organization ranks"""
+
+    def __init__(self, year: int, rows: List[Dict[str, Any]], loaded_at: datetime):
+        self.year = year
+        self.loaded_at = loaded_at
+        self.organizations = [row.get("organization_name") or "" for row in rows]
+        self.target_organization = next(
+            (row.get("organization_name") for row in rows if row.get("is_target")), None
+        )
+
+        values = {
+            name: [metric.extract(row) for row in rows]
+            for name, metric in BENCHMARK_METRICS.items()
+        }
+        self.distributions = {
+            name: MetricDistribution(BENCHMARK_METRICS[name], [v for v in column if v is not None])
+            for name, column in values.items()
+            if any(v is not None for v in column)
+        }
+
+        # Every organization's ranks, computed once per load (keyed by normalized name)
+        self.organization_ranks: Dict[str, Dict[str, Any]] = {}
+        for i, organization in enumerate(self.organizations):
+            self.organization_ranks[organization.strip().lower()] = {
+                "organization": organization,
+                "ranks": {
+                    name: distribution.rank(values[name][i])
+                    for name, distribution in self.distributions.items()
+                    if values[name][i] is not None
+                },
+            }
+
+    def organization(self, organization_name: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Precomputed ranks of an organization (the target company when no name is given)"""
+        name = organization_name or self.target_organization
+        return self.organization_ranks.get((name or "").strip().lower())
+
+    def rank_values(self, metric_values: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Ranks of arbitrary metric values (e.g. a facility's own figures)"""
+        ranks = {}
+        for name, value in metric_values.items():
+            number = _number(value)
+            if number is not None and name in self.distributions:
+                ranks[name] = self.distributions[name].rank(number)
+        return ranks
+
+    def summary(self) -> Dict[str, Any]:
+        return {name: distribution.summary() for name, distribution in self.distributions.items()}
+
+
+class BenchmarkingEngine:
+    """
+    Industry benchmarking over per-year sorted metric arrays
+
+    Years are loaded from the backend on first use and kept for
+    BENCHMARK_CACHE_TTL_MINUTES; concurrent first requests share one load.
+    """
+
+    def __init__(self, ttl: timedelta):
+        """
+        Initialize the engine
+
+        Args:
+            ttl: How long a loaded year is served before reloading
+        """
+        self.ttl = ttl
+        self._years: Dict[int, BenchmarkYear] = {}
+        self._locks: Dict[int, asyncio.Lock] = {}
+
+    def load_rows(self, year: int, rows: List[Dict[str, Any]]) -> BenchmarkYear:
+        """
+        Build (or replace) a year from industry_benchmarking rows
+
+        Args:
+            year: Reporting year
+            rows: Table rows of that year
+
+        Returns:
+            BenchmarkYear: The indexed year
+        """
+        benchmark_year = BenchmarkYear(year, rows, datetime.utcnow())
+        self._years[year] = benchmark_year
+        logger.info(f"Indexed {len(rows)} benchmarking rows for {year} ({len(benchmark_year.distributions)} metrics)")
+        return benchmark_year
+
+    async def get_year(self, year: Optional[int] = None) -> Optional[BenchmarkYear]:
+        """
+        Indexed benchmarking data of a year (the latest year with data when None)
+
+        Args:
+            year: Reporting year
+
+        Returns:
+            BenchmarkYear, or None when no data is available
+        """
+        if year is not None:
+            return await self._load(year)
+        current = datetime.utcnow().year
+        for candidate in range(current, current - DEFAULT_YEAR_LOOKBACK - 1, -1):
+            benchmark_year = await self._load(candidate)
+            if benchmark_year is not None:
+                return benchmark_year
+        return None
+
+    async def _load(self, year: int) -> Optional[BenchmarkYear]:
+        cached = self._years.get(year)
+        if cached is not None and datetime.utcnow() - cached.loaded_at < self.ttl:
+            return cached if cached.organizations else None
+
+        lock = self._locks.setdefault(year, asyncio.Lock())
+        async with lock:
+            cached = self._years.get(year)
+            if cached is not None and datetime.utcnow() - cached.loaded_at < self.ttl:
+                return cached if cached.organizations else None
+
+            backend_service = await get_backend_service()
+            rows = await backend_service.get_industry_benchmarking(year)
+            if rows is None:
+                # Backend unavailable: keep serving the previous load if there is one
+                return cached if cached is not None and cached.organizations else None
+            benchmark_year = self.load_rows(year, rows)
+            return benchmark_year if rows else None
+
+    async def rank_organization(self, organization_name: Optional[str] = None, year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Precomputed ranks of an organization (the benchmark's target company when no name is given)
+
+        Args:
+            organization_name: Organization name as stored in industry_benchmarking
+            year: Reporting year (latest with data when None)
+
+        Returns:
+            Dict with year, organization and ranks per metric, or None if not found
+        """
+        benchmark_year = await self.get_year(year)
+        if benchmark_year is None:
+            return None
+        organization = benchmark_year.organization(organization_name)
+        if organization is None:
+            return None
+        return {"year": benchmark_year.year, **organization}
+
+    async def rank_values(self, metric_values: Dict[str, Any], year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Ranks of explicit metric values against the peers of a year
+
+        Args:
+            metric_values: Metric name -> value (see BENCHMARK_METRICS)
+            year: Reporting year (latest with data when None)
+
+        Returns:
+            Dict with year and ranks per metric, or None when no data is available
+        """
+        benchmark_year = await self.get_year(year)
+        if benchmark_year is None:
+            return None
+        return {"year": benchmark_year.year, "ranks": benchmark_year.rank_values(metric_values)}
+
+    async def get_context(self, organization_name: Optional[str] = None, year: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        Compact benchmarking context for chat prompts
+
+        Args:
+            organization_name: Organization to position (target company by default)
+            year: Reporting year (latest with data when None)
+
+        Returns:
+            Dict with peer medians/quartiles of the key metrics and the
+            organization's quartile per metric, or None when no data is available
+        """
+        benchmark_year = await self.get_year(year)
+        if benchmark_year is None:
+            return None
+        organization = benchmark_year.organization(organization_name) or {}
+        ranks = organization.get("ranks", {})
+        return {
+            "year": benchmark_year.year,
+            "peer_count": len(benchmark_year.organizations),
+            "organization": organization.get("organization"),
+            "metrics": {
+                metric: {
+                    **benchmark_year.distributions[metric].summary(),
+                    **({"organization_rank": ranks[metric]} if metric in ranks else {})
+                }
+                for metric in CONTEXT_METRICS
+                if metric in benchmark_year.distributions
+            },
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Loaded years and their sizes"""
+        return {
+            "years": {
+                year: {
+                    "organizations": len(benchmark_year.organizations),
+                    "metrics": len(benchmark_year.distributions),
+                    "loaded_at": benchmark_year.loaded_at.isoformat() + "Z",
+                }
+                for year, benchmark_year in sorted(self._years.items())
+            },
+            "ttl_minutes": self.ttl.total_seconds() / 60,
+        }
+
+
+# Global engine instance
+benchmarking_engine = BenchmarkingEngine(ttl=timedelta(minutes=settings.benchmark_cache_ttl_minutes))
+
+
+async def get_benchmarking_engine() -> BenchmarkingEngine:
+    """
+    Get benchmarking engine instance
+
+    Returns:
+        BenchmarkingEngine: Engine instance
+    """
+    return benchmarking_engine
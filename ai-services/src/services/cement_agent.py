@@ -11,6 +11,8 @@ from dataclasses import dataclass
 from enum import Enum
 
 from .backend_service import get_backend_service, BackendService
+from .benchmarking_engine import benchmarking_engine
+from .target_trajectory import target_trajectory_engine
 from ..utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -123,7 +125,7 @@ class CementAgent:
                     r"\b(baseline|target\s+value|reduction\s+target|efficiency\s+target)\b",
                     r"\b(suggest.*targets|recommend.*targets|industry.*standards?)\b",
                 ],
-                "requirements": {DataRequirement.FACILITY_BASIC, DataRequirement.TARGETS_GOALS, DataRequirement.EMISSION_DATA},
+                "requirements": {DataRequirement.FACILITY_BASIC, DataRequirement.TARGETS_GOALS, DataRequirement.EMISSION_DATA, DataRequirement.PRODUCTION_DATA},
                 "confidence": 0.9
             },
             
@@ -246,7 +248,7 @@ class CementAgent:
         
         reasoning = f"Matched patterns: {', '.join(reasoning_parts)}"
         
-        logger.info(f"Question analysis: type={primary_type}, requirements={matched_requirements}, confidence={confidence:.2f}")
+        logger.info("Question analysis: type=%s, requirements=%s, confidence=%.2f", primary_type, matched_requirements, confidence)
         
         return AnalysisResult(
             question_type=primary_type,
@@ -292,8 +294,8 @@ class CementAgent:
             return {"context_type": "general", "message": "No specific data required"}
         
         # For organization-level questions, we don't need a specific facility_id
-        # Also allow targets and resources questions to proceed without facility_id
-        if not facility_id and DataRequirement.ORGANIZATION_DATA not in requirements and DataRequirement.TARGETS_GOALS not in requirements and DataRequirement.RESOURCES_CONFIG not in requirements:
+        # Also allow targets, resources and benchmarking questions to proceed without facility_id
+        if not facility_id and DataRequirement.ORGANIZATION_DATA not in requirements and DataRequirement.TARGETS_GOALS not in requirements and DataRequirement.RESOURCES_CONFIG not in requirements and DataRequirement.INDUSTRY_BENCHMARKS not in requirements:
             return {"context_type": "general", "message": "No specific facility data required"}
         
         try:
@@ -306,7 +308,7 @@ class CementAgent:
                 if org_facilities:
                     context_data["organization_facilities"] = org_facilities
                     context_data["facility_count"] = len(org_facilities)
-                    logger.info(f"Fetched {len(org_facilities)} facilities for organization {organization_id}")
+                    logger.info("Fetched %s facilities for organization %s", len(org_facilities), organization_id)
                 else:
                     context_data["organization_facilities"] = []
                     context_data["facility_count"] = 0
@@ -323,7 +325,7 @@ class CementAgent:
                 facility_info = await backend_service.get_facility(facility_id, organization_id)
                 if facility_info:
                     context_data["facility"] = facility_info
-                    logger.info(f"Fetched facility info for {facility_id}")
+                    logger.info("Fetched facility info for %s", facility_id)
             
             # Fetch emission data if required
             if DataRequirement.EMISSION_DATA in requirements or DataRequirement.HISTORICAL_TRENDS in requirements:
@@ -332,7 +334,7 @@ class CementAgent:
                 )
                 if emission_data:
                     context_data["emissions"] = emission_data
-                    logger.info(f"Fetched emission data for {facility_id} ({time_range} months)")
+                    logger.info("Fetched emission data for %s (%s months)", facility_id, time_range)
             
             # Fetch production data if required
             if DataRequirement.PRODUCTION_DATA in requirements or DataRequirement.HISTORICAL_TRENDS in requirements:
@@ -341,7 +343,7 @@ class CementAgent:
                 )
                 if production_data:
                     context_data["production"] = production_data
-                    logger.info(f"Fetched production data for {facility_id} ({time_range} months)")
+                    logger.info("Fetched production data for %s (%s months)", facility_id, time_range)
             
             # Fetch targets data if required
             if DataRequirement.TARGETS_GOALS in requirements and organization_id:
@@ -352,11 +354,19 @@ class CementAgent:
                 if targets_data:
                     context_data["targets"] = targets_data
                     context_data["target_count"] = len(targets_data)
-                    logger.info(f"Fetched {len(targets_data)} targets for organization {organization_id}")
+                    logger.info("Fetched %s targets for organization %s", len(targets_data), organization_id)
+                    
+                    # Precompute rates, gaps and status so the model does not do the arithmetic
+                    context_data["target_trajectories"] = target_trajectory_engine.evaluate(
+                        targets_data,
+                        context_data.get("emissions", []),
+                        context_data.get("production", []),
+                        series_scope=facility_id
+                    )
                 else:
                     context_data["targets"] = []
                     context_data["target_count"] = 0
-                    logger.info(f"No targets found for organization {organization_id}")
+                    logger.info("No targets found for organization %s", organization_id)
             
             # Fetch facility resources and consumption data if required
             if DataRequirement.RESOURCES_CONFIG in requirements and facility_id:
@@ -390,12 +400,19 @@ class CementAgent:
                             }
                     
                     context_data["consumption_summary"] = recent_consumption_summary
-                    logger.info(f"Fetched {len(resources_data)} resources for facility {facility_id}")
+                    logger.info("Fetched %s resources for facility %s", len(resources_data), facility_id)
                 else:
                     context_data["facility_resources"] = []
                     context_data["resource_count"] = 0
                     context_data["consumption_summary"] = {}
-                    logger.info(f"No resources found for facility {facility_id}")
+                    logger.info("No resources found for facility %s", facility_id)
+            
+            # Fetch industry benchmark positions if required
+            if DataRequirement.INDUSTRY_BENCHMARKS in requirements:
+                benchmarks = await benchmarking_engine.get_context()
+                if benchmarks:
+                    context_data["industry_benchmarks"] = benchmarks
+                    logger.info("Added industry benchmarks for %s (%s peers)", benchmarks['year'], benchmarks['peer_count'])
             
             # Calculate summary metrics
             if context_data:
@@ -404,7 +421,7 @@ class CementAgent:
                 context_data["time_range_months"] = time_range
                 context_data["data_freshness"] = datetime.utcnow().isoformat() + "Z"
             
-            logger.info(f"Successfully fetched context data: {list(context_data.keys())}")
+            logger.info("Successfully fetched context data: %s", list(context_data.keys()))
             return context_data
             
         except Exception as e:
@@ -483,7 +500,7 @@ class CementAgent:
         if not facility_id and organization_id and self._requires_facility_data(analysis.data_requirements):
             effective_facility_id = await self._get_default_facility(organization_id)
             if effective_facility_id:
-                logger.info(f"Auto-selected facility {effective_facility_id} for user question: {question[:50]}...")
+                logger.info("Auto-selected facility %s for user question: %s...", effective_facility_id, question[:50])
         
         # Fetch required data
         context_data = await self.fetch_context_data(
@@ -510,7 +527,7 @@ class CementAgent:
             }
         }
         
-        logger.info(f"Agent analysis complete: requires_data={result['agent_decision']['requires_data']}")
+        logger.info("Agent analysis complete: requires_data=%s", result['agent_decision']['requires_data'])
         return result
     
     def _requires_facility_data(self, requirements: Set[DataRequirement]) -> bool:
@@ -552,7 +569,7 @@ class CementAgent:
                 facility_id = default_facility.get('id')
                 facility_name = default_facility.get('name', 'Unknown')
                 
-                logger.info(f"Selected default facility: {facility_name} ({facility_id})")
+                logger.info("Selected default facility: %s (%s)", facility_name, facility_id)
                 return facility_id
             else:
                 logger.warning(f"No facilities found for organization {organization_id}")
@@ -0,0 +1,253 @@
+"""
+Cost Refresh Scheduler
+Single background scheduler that keeps regional fuel prices fresh
+"""
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..config.settings import get_settings
+from ..utils.logger import get_logger
+from .dynamic_cost_service import DynamicCostService, dynamic_cost_service
+from .fuel_price_cache import FuelPriceCache
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class RegionSchedule:
+    """Refresh schedule of one price region"""
+    region: str
+    facility_id: str
+    location: Dict[str, str]
+    fuel_names: Set[str] = field(default_factory=set)
+    next_run: datetime = field(default_factory=datetime.utcnow)
+    registrations: int = 0
+    last_registered: datetime = field(default_factory=datetime.utcnow)
+    last_run: Optional[datetime] = None
+    last_duration_seconds: Optional[float] = None
+    last_error: Optional[str] = None
+    refresh_count: int = 0
+    running: bool = False
+
+
+class CostRefreshScheduler:
+    """
+    Keeps one refresh schedule per region key
+
+    Registrations for a region that is already scheduled are coalesced (the
+    fuel lists are merged, the next run time is kept), so any number of
+    optimizer requests results in at most one refresh per region per
+    interval. Refreshes re-price fuels in place without clearing the cache.
+
+    Regions with no registration for the idle expiry period are dropped, and
+    the least recently registered region is dropped beyond max_regions.
+
+    Schedules live in process memory, so every uvicorn worker runs its own
+    scheduler and refreshes the regions it has seen (N workers, up to N
+    price requests per region per interval). The price cache is shared, so
+    set COST_REFRESH_ENABLED=false on all but one worker; workers without a
+    scheduler re-price stale entries on demand.
+    """
+
+    def __init__(
+        self,
+        cost_service: DynamicCostService,
+        interval: timedelta,
+        poll_seconds: float = 30.0,
+        idle_expiry: Optional[timedelta] = None,
+        max_regions: int = 0,
+        enabled: bool = True
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            cost_service: Service used to re-price fuels
+            interval: Time between refreshes of a region
+            poll_seconds: Maximum sleep between schedule checks
+            idle_expiry: Drop regions without a registration for this long (None = never)
+            max_regions: Maximum regions scheduled (0 = unlimited)
+            enabled: Whether start() runs the loop (False on all but one worker)
+        """
+        self.cost_service = cost_service
+        self.interval = interval
+        self.poll_seconds = poll_seconds
+        self.idle_expiry = idle_expiry
+        self.max_regions = max_regions
+        self.enabled = enabled
+        self._schedules: Dict[str, RegionSchedule] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the scheduler loop (idempotent; no-op when disabled)"""
+        if self.is_running:
+            return
+        if not self.enabled:
+            logger.info("Cost refresh scheduler disabled in this process")
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="cost-refresh-scheduler")
+        logger.info(f"Cost refresh scheduler started (interval {self.interval})")
+
+    async def stop(self) -> None:
+        """Stop the scheduler loop"""
+        if not self._task:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Cost refresh scheduler stopped")
+
+    async def register(self, facility_id: str, fuel_names: Iterable[str]) -> RegionSchedule:
+        """
+        Register fuels of a facility for periodic refresh
+
+        Args:
+            facility_id: Facility whose region should be kept fresh
+            fuel_names: Fuels priced for that facility
+
+        Returns:
+            RegionSchedule: The (possibly existing) schedule of the region
+        """
+        location = await self.cost_service.get_facility_location(facility_id)
+        region = FuelPriceCache.region_key(location)
+
+        schedule = self._schedules.get(region)
+        if schedule is None:
+            schedule = RegionSchedule(
+                region=region,
+                facility_id=facility_id,
+                location=location,
+                next_run=datetime.utcnow() + self.interval
+            )
+            self._schedules[region] = schedule
+            logger.info(f"Scheduled cost refresh for region '{region}'")
+            self._wakeup.set()
+
+        schedule.fuel_names.update(fuel_names)
+        schedule.registrations += 1
+        schedule.last_registered = datetime.utcnow()
+        self._prune(schedule.last_registered)
+        return schedule
+
+    def _prune(self, now: datetime) -> None:
+        """Drop idle regions, then the least recently registered ones beyond max_regions"""
+        if self.idle_expiry is not None:
+            for region, schedule in list(self._schedules.items()):
+                if not schedule.running and now - schedule.last_registered >= self.idle_expiry:
+                    del self._schedules[region]
+                    logger.info(f"Dropped idle cost refresh schedule for region '{region}'")
+
+        if self.max_regions and len(self._schedules) > self.max_regions:
+            idle_first = sorted(
+                (schedule for schedule in self._schedules.values() if not schedule.running),
+                key=lambda schedule: schedule.last_registered
+            )
+            for schedule in idle_first[:len(self._schedules) - self.max_regions]:
+                del self._schedules[schedule.region]
+                logger.info(f"Dropped cost refresh schedule for region '{schedule.region}' (region limit)")
+
+    async def refresh_region(self, region: str) -> None:
+        """
+        Re-price the registered fuels of a region now
+
+        Args:
+            region: Region key
+        """
+        schedule = self._schedules.get(region)
+        if schedule is None or schedule.running:
+            return
+
+        schedule.running = True
+        started = datetime.utcnow()
+        try:
+            await self.cost_service.price_fuels(sorted(schedule.fuel_names), schedule.location)
+            schedule.last_error = None
+            schedule.refresh_count += 1
+            logger.info(f"Refreshed {len(schedule.fuel_names)} fuel prices for region '{region}'")
+        except Exception as e:
+            schedule.last_error = str(e)
+            logger.error(f"Error refreshing fuel prices for region '{region}': {e}")
+        finally:
+            schedule.running = False
+            schedule.last_run = started
+            schedule.last_duration_seconds = round((datetime.utcnow() - started).total_seconds(), 3)
+            schedule.next_run = started + self.interval
+
+    async def _run(self) -> None:
+        """Scheduler loop: refresh due regions, then sleep until the next one is due"""
+        while True:
+            now = datetime.utcnow()
+            self._prune(now)
+            due = [region for region, schedule in self._schedules.items() if schedule.next_run <= now]
+            if due:
+                await asyncio.gather(*(self.refresh_region(region) for region in due))
+
+            next_due = min((schedule.next_run for schedule in self._schedules.values()), default=None)
+            sleep_seconds = self.poll_seconds
+            if next_due is not None:
+                sleep_seconds = max(0.0, min(sleep_seconds, (next_due - datetime.utcnow()).total_seconds()))
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=sleep_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    def get_status(self) -> Dict[str, Any]:
+        """Scheduler state for monitoring"""
+        regions: List[Dict[str, Any]] = []
+        for schedule in self._schedules.values():
+            regions.append({
+                "region": schedule.region,
+                "fuels": sorted(schedule.fuel_names),
+                "registrations": schedule.registrations,
+                "last_registered": schedule.last_registered.isoformat() + "Z",
+                "next_run": schedule.next_run.isoformat() + "Z",
+                "last_run": schedule.last_run.isoformat() + "Z" if schedule.last_run else None,
+                "last_duration_seconds": schedule.last_duration_seconds,
+                "last_error": schedule.last_error,
+                "refresh_count": schedule.refresh_count,
+                "running": schedule.running,
+            })
+        return {
+            "enabled": self.enabled,
+            "running": self.is_running,
+            "interval_minutes": self.interval.total_seconds() / 60,
+            "idle_expiry_hours": self.idle_expiry.total_seconds() / 3600 if self.idle_expiry else None,
+            "max_regions": self.max_regions,
+            "regions": regions,
+            "price_cache": self.cost_service.price_cache.get_stats(),
+        }
+
+
+# Global scheduler instance (started in the application lifespan)
+cost_refresh_scheduler = CostRefreshScheduler(
+    dynamic_cost_service,
+    interval=timedelta(minutes=settings.cost_refresh_interval_minutes),
+    idle_expiry=timedelta(hours=settings.cost_refresh_idle_hours) if settings.cost_refresh_idle_hours else None,
+    max_regions=settings.cost_refresh_max_regions,
+    enabled=settings.cost_refresh_enabled
+)
+
+
+async def get_cost_refresh_scheduler() -> CostRefreshScheduler:
+    """
+    Get cost refresh scheduler instance
+
+    Returns:
+        CostRefreshScheduler: Scheduler instance
+    """
+    return cost_refresh_scheduler
@@ -3,35 +3,113 @@ Dynamic Cost Service
 AI-powered real-time cost fetching for alternative fuels based on facility locality
 """
 
-import logging
 import asyncio
 import json
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-import aiohttp
-import openai
+from pydantic import BaseModel, Field, ValidationError
 from ..config.settings import get_settings
+from ..utils.json_repair import JSONRepairError, parse_json_tolerant
+from ..utils.logger import get_logger
+from .emission_factor_catalog import MASS_UNIT, emission_factor_catalog
+from .facility_data_service import FacilityDataService
+from .fuel_price_cache import FuelPriceCache
+from .openai_client import openai_client
 
-logger = logging.getLogger(__name__)
+logger = get_logger(__name__)
 settings = get_settings()
 
+# Maximum fuels priced in one batched request
+PRICE_BATCH_SIZE = 20
+
+# Location used when a facility's own location cannot be resolved
+DEFAULT_FACILITY_LOCATION = {
+    "city": "Mumbai",
+    "state": "Maharashtra",
+    "country": "India",
+    "region": "Western India"
+}
+
+
+class FuelPriceQuote(BaseModel):
+    """One entry of a batched fuel price response"""
+    fuel_name: str
+    cost_per_kg_inr: float = Field(..., gt=0)
+    confidence_level: str = "medium"
+    source_info: str = "AI market analysis"
+    price_factors: List[str] = Field(default_factory=list)
+
 class DynamicCostService:
     """AI-powered dynamic cost fetching service"""
     
     def __init__(self):
-        self.openai_client = openai.AsyncOpenAI(api_key=settings.openai_api_key)
-        self.cost_cache = {}
-        self.cache_duration = timedelta(hours=6)  # Cache costs for 6 hours
-        
-    async def get_facility_location(self, facility_id: str) -> Dict[str, str]:
-        """Get facility location details"""
-        # This would typically fetch from database
-        # For now, returning sample location - should be replaced with actual DB query
+        # Completions go through the shared client (and its rate limiter); without
+        # an API key every lookup degrades to the fallback estimates
+        self.openai_client = openai_client
+        self.cache_duration = timedelta(hours=settings.fuel_price_cache_ttl_hours)
+        # Region-keyed price cache shared across facilities, workers and restarts
+        self.price_cache = FuelPriceCache(settings.fuel_price_cache_path, self.cache_duration)
+        # Facility ID -> location resolved from the backend facility record
+        self._facility_locations: Dict[str, Dict[str, str]] = {}
+        
+    async def get_facility_location(
+        self,
+        facility_id: str,
+        facility_data: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, str]:
+        """
+        Get facility location details (city/state decide the price region)
+        
+        Locations are read from the backend facility record and remembered per
+        facility. When the backend is unreachable or the record has no city or
+        state, the default location is used (and not remembered, so the next
+        lookup retries).
+        
+        Args:
+            facility_id: Facility ID
+            facility_data: Already fetched facility data (skips the backend call)
+            
+        Returns:
+            Dict with city, state and country
+        """
+        if facility_data is None and facility_id in self._facility_locations:
+            return self._facility_locations[facility_id]
+        
+        if facility_data is None:
+            try:
+                facility_data = await FacilityDataService().get_comprehensive_facility_data(facility_id)
+            except Exception as e:
+                logger.warning(f"Could not resolve location of facility {facility_id}, using default region: {str(e)}")
+                return dict(DEFAULT_FACILITY_LOCATION)
+        
+        location = self._parse_facility_location((facility_data or {}).get("facility") or {})
+        if location is None:
+            logger.warning(f"Facility {facility_id} has no city or state, using default region")
+            return dict(DEFAULT_FACILITY_LOCATION)
+        
+        self._facility_locations[facility_id] = location
+        return location
+    
+    @staticmethod
+    def _parse_facility_location(facility: Dict[str, Any]) -> Optional[Dict[str, str]]:
+        """Read city/state/country from a facility record (location is JSONB, possibly serialized)"""
+        raw = facility.get("location") or {}
+        if isinstance(raw, str):
+            try:
+                raw = json.loads(raw)
+            except ValueError:
+                return None
+        if not isinstance(raw, dict):
+            return None
+        
+        city = str(raw.get("city") or "").strip()
+        state = str(raw.get("state") or "").strip()
+        if not city and not state:
+            return None
         return {
-            "city": "Mumbai",
-            "state": "Maharashtra", 
-            "country": "India",
-            "region": "Western India"
+            "city": city or state,
+            "state": state or city,
+            "country": str(raw.get("country") or "India").strip()
         }
     
     async def search_fuel_cost_online(self, fuel_name: str, location: Dict[str, str]) -> Dict[str, Any]:
@@ -68,18 +146,18 @@ class DynamicCostService:
             - price_factors: list of factors affecting price
             """
             
-            response = await self.openai_client.chat.completions.create(
+            response = await self.openai_client.complete(
+                search_prompt,
+                system="You are an expert in Indian alternative fuel markets. Provide realistic, current pricing data.",
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are an expert in Indian alternative fuel markets. Provide realistic, current pricing data."},
-                    {"role": "user", "content": search_prompt}
-                ],
                 temperature=0.1
             )
+            if not response["success"]:
+                raise Exception(response["error"])
             
             # Parse AI response
             try:
-                cost_data = json.loads(response.choices[0].message.content)
+                cost_data = parse_json_tolerant(response["completion"])
                 
                 # Validate and enhance the response
                 if not isinstance(cost_data, dict) or 'cost_per_kg_inr' not in cost_data:
@@ -95,9 +173,9 @@ class DynamicCostService:
                 
                 return cost_data
                 
-            except json.JSONDecodeError:
+            except JSONRepairError:
                 # Fallback: extract cost from text response
-                text_response = response.choices[0].message.content
+                text_response = response["completion"]
                 cost_data = await self.extract_cost_from_text(text_response, fuel_name, location)
                 return cost_data
                 
@@ -105,6 +183,82 @@ class DynamicCostService:
             logger.error(f"Error searching fuel cost for {fuel_name}: {str(e)}")
             return await self.get_fallback_cost(fuel_name, location)
     
+    async def search_fuel_costs_batch(self, fuel_names: List[str], location: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Price several fuels in a single structured AI request
+        
+        Args:
+            fuel_names: Fuels to price
+            location: Facility location
+            
+        Returns:
+            Dict mapping fuel name to cost data for every fuel with a valid
+            entry in the response (missing or invalid entries are omitted)
+        """
+        fuel_list = "\n".join(f"- {name}" for name in fuel_names)
+        batch_prompt = f"""
+            Provide current market prices in {location['city']}, {location['state']}, India for these alternative fuels:
+            {fuel_list}
+            
+            Consider local market conditions, supply chain factors, regional availability,
+            transportation costs and seasonal variations in the Indian cement industry.
+            
+            Return ONLY a JSON object of this form, with exactly one entry per fuel and the
+            fuel_name copied exactly as listed above:
+            {{
+                "prices": [
+                    {{
+                        "fuel_name": "<fuel name>",
+                        "cost_per_kg_inr": <number>,
+                        "confidence_level": "high/medium/low",
+                        "source_info": "<brief description>",
+                        "price_factors": ["<factor>", "..."]
+                    }}
+                ]
+            }}
+            """
+        
+        response = await self.openai_client.complete(
+            batch_prompt,
+            system="You are an expert in Indian alternative fuel markets. Provide realistic, current pricing data as JSON.",
+            model="gpt-4",
+            temperature=0.1,
+            **self.openai_client.json_response_format()
+        )
+        if not response["success"]:
+            raise Exception(response["error"])
+        
+        try:
+            parsed = parse_json_tolerant(response["completion"])
+        except JSONRepairError as e:
+            logger.warning(f"Batched price response was not JSON: {e}")
+            return {}
+        
+        entries = parsed.get("prices", []) if isinstance(parsed, dict) else parsed
+        requested = {name.strip().lower(): name for name in fuel_names}
+        now = datetime.now()
+        costs = {}
+        for entry in entries if isinstance(entries, list) else []:
+            try:
+                quote = FuelPriceQuote.model_validate(entry)
+            except ValidationError as e:
+                logger.warning(f"Invalid batched price entry {entry!r}: {e.error_count()} errors")
+                continue
+            fuel_name = requested.get(quote.fuel_name.strip().lower())
+            if fuel_name is None or fuel_name in costs:
+                continue
+            costs[fuel_name] = {
+                **quote.model_dump(),
+                "fuel_name": fuel_name,
+                "currency": "INR",
+                "location": f"{location['city']}, {location['state']}",
+                "last_updated": now.strftime('%Y-%m-%d'),
+                "facility_location": location,
+                "fetched_at": now.isoformat(),
+                "method": "ai_batch_search"
+            }
+        return costs
+    
     async def extract_cost_from_text(self, text: str, fuel_name: str, location: Dict[str, str]) -> Dict[str, Any]:
         """Extract cost information from AI text response"""
         try:
@@ -126,16 +280,16 @@ class DynamicCostService:
             }}
             """
             
-            response = await self.openai_client.chat.completions.create(
+            response = await self.openai_client.complete(
+                extract_prompt,
+                system="Extract pricing data and return only valid JSON.",
                 model="gpt-3.5-turbo",
-                messages=[
-                    {"role": "system", "content": "Extract pricing data and return only valid JSON."},
-                    {"role": "user", "content": extract_prompt}
-                ],
                 temperature=0
             )
+            if not response["success"]:
+                raise Exception(response["error"])
             
-            return json.loads(response.choices[0].message.content)
+            return json.loads(response["completion"])
             
         except Exception as e:
             logger.error(f"Error extracting cost from text: {str(e)}")
@@ -144,19 +298,11 @@ class DynamicCostService:
     async def get_fallback_cost(self, fuel_name: str, location: Dict[str, str]) -> Dict[str, Any]:
         """Provide fallback cost estimates when AI search fails"""
         
-        # Intelligent fallback based on fuel type and location
-        fallback_costs = {
-            "Biomass": {"base": 8.5, "variation": 2.0},
-            "Rice Husk": {"base": 3.2, "variation": 1.0},
-            "Agricultural Waste": {"base": 5.3, "variation": 1.5},
-            "Cotton Stalks": {"base": 4.5, "variation": 1.2},
-            "Waste-derived Fuel": {"base": 6.2, "variation": 1.8},
-            "Used Tires": {"base": 4.8, "variation": 1.0},
-            "Bagasse": {"base": 2.8, "variation": 0.8},
-            "Wheat Straw": {"base": 4.2, "variation": 1.3}
-        }
-        
-        fuel_info = fallback_costs.get(fuel_name, {"base": 7.0, "variation": 2.0})
+        # Fallback base price from the emission factor catalog (cost_inr), which is only
+        # a per-kg price for fuels the catalog measures in kg
+        catalog_fuel = emission_factor_catalog.find(fuel_name) or {}
+        catalog_cost = catalog_fuel.get("cost_inr") if catalog_fuel.get("unit") == MASS_UNIT else None
+        fuel_info = {"base": catalog_cost or 7.0}
         
         # Apply regional adjustments
         regional_multiplier = 1.0
@@ -184,24 +330,22 @@ class DynamicCostService:
     async def get_dynamic_cost(self, fuel_name: str, facility_id: str) -> Dict[str, Any]:
         """Get dynamic cost for a specific fuel at facility location"""
         
+        # Get facility location (prices are cached per region, not per facility)
+        location = await self.get_facility_location(facility_id)
+        
         # Check cache first
-        cache_key = f"{fuel_name}_{facility_id}"
-        if cache_key in self.cost_cache:
-            cached_data = self.cost_cache[cache_key]
-            cached_time = datetime.fromisoformat(cached_data["fetched_at"])
-            if datetime.now() - cached_time < self.cache_duration:
-                logger.info(f"Using cached cost for {fuel_name}")
-                return cached_data
+        cached_data = await self.price_cache.get_async(fuel_name, location)
+        if cached_data is not None:
+            logger.info(f"Using cached cost for {fuel_name} ({location.get('state')})")
+            return cached_data
         
         try:
-            # Get facility location
-            location = await self.get_facility_location(facility_id)
-            
             # Search for current cost
             cost_data = await self.search_fuel_cost_online(fuel_name, location)
             
-            # Cache the result
-            self.cost_cache[cache_key] = cost_data
+            # Cache the result (fallback estimates are not cached so the next lookup retries)
+            if cost_data.get("method") != "fallback_estimate":
+                await self.price_cache.set_async(fuel_name, location, cost_data)
             
             logger.info(f"Fetched dynamic cost for {fuel_name}: ₹{cost_data['cost_per_kg_inr']}/kg")
             return cost_data
@@ -209,49 +353,122 @@ class DynamicCostService:
         except Exception as e:
             logger.error(f"Error getting dynamic cost for {fuel_name}: {str(e)}")
             # Return fallback
-            location = await self.get_facility_location(facility_id)
             return await self.get_fallback_cost(fuel_name, location)
     
-    async def get_all_fuel_costs(self, fuel_names: List[str], facility_id: str) -> Dict[str, Dict[str, Any]]:
-        """Get dynamic costs for all fuels"""
+    async def get_all_fuel_costs(
+        self,
+        fuel_names: List[str],
+        facility_id: str,
+        batched: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get dynamic costs for all fuels
+        
+        Cached prices are used first; only the remaining fuels are priced.
+        
+        Args:
+            fuel_names: Fuels to price
+            facility_id: Facility whose region determines prices
+            batched: Use batched pricing (False = one request per fuel)
+            
+        Returns:
+            Dict mapping fuel name to cost data
+        """
         
         logger.info(f"Fetching dynamic costs for {len(fuel_names)} fuels")
         
-        # Create concurrent tasks for all fuels
-        tasks = [
-            self.get_dynamic_cost(fuel_name, facility_id) 
-            for fuel_name in fuel_names
-        ]
+        location = await self.get_facility_location(facility_id)
+        fuel_costs = {}
+        missing = []
+        for fuel_name in dict.fromkeys(fuel_names):
+            cached_data = await self.price_cache.get_async(fuel_name, location)
+            if cached_data is not None:
+                fuel_costs[fuel_name] = cached_data
+            else:
+                missing.append(fuel_name)
+        
+        if missing:
+            fuel_costs.update(await self.price_fuels(missing, location, batched))
+        
+        return fuel_costs
+    
+    async def price_fuels(
+        self,
+        fuel_names: List[str],
+        location: Dict[str, str],
+        batched: bool = True
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch fresh prices for fuels in a region (bypassing the cache) and store them
         
-        # Execute all requests concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        In batched mode fuels are priced in one request per PRICE_BATCH_SIZE
+        fuels, and only fuels missing from (or invalid in) the batched response
+        fall back to individual lookups. Stored entries are overwritten in
+        place, so readers keep getting the previous price until the new one lands.
         
-        # Process results
+        Args:
+            fuel_names: Fuels to price
+            location: Facility location (region)
+            batched: Use batched pricing (False = one request per fuel)
+            
+        Returns:
+            Dict mapping fuel name to cost data
+        """
         fuel_costs = {}
-        for i, result in enumerate(results):
-            fuel_name = fuel_names[i]
+        missing = list(dict.fromkeys(fuel_names))
+        
+        if missing and batched:
+            batches = [missing[i:i + PRICE_BATCH_SIZE] for i in range(0, len(missing), PRICE_BATCH_SIZE)]
+            batch_results = await asyncio.gather(
+                *(self.search_fuel_costs_batch(batch, location) for batch in batches),
+                return_exceptions=True
+            )
+            for batch, result in zip(batches, batch_results):
+                if isinstance(result, Exception):
+                    logger.error(f"Batched price lookup failed for {len(batch)} fuels: {str(result)}")
+                    continue
+                fuel_costs.update(result)
+            
+            requested = len(missing)
+            missing = [name for name in missing if name not in fuel_costs]
+            logger.info(f"Batched price lookup priced {requested - len(missing)}/{requested} fuels in {len(batches)} request(s)")
+        
+        # Per-fuel lookups for anything not batch-priced (falls back to estimates on error)
+        results = await asyncio.gather(
+            *(self.search_fuel_cost_online(fuel_name, location) for fuel_name in missing),
+            return_exceptions=True
+        )
+        for fuel_name, result in zip(missing, results):
             if isinstance(result, Exception):
                 logger.error(f"Error fetching cost for {fuel_name}: {str(result)}")
-                # Use fallback
-                location = await self.get_facility_location(facility_id)
                 fuel_costs[fuel_name] = await self.get_fallback_cost(fuel_name, location)
             else:
                 fuel_costs[fuel_name] = result
         
+        # Cache the results (fallback estimates are not cached so the next lookup retries)
+        for fuel_name, cost_data in fuel_costs.items():
+            if cost_data.get("method") != "fallback_estimate":
+                await self.price_cache.set_async(fuel_name, location, cost_data)
+        
         return fuel_costs
     
-    async def refresh_cost_cache(self, facility_id: str):
-        """Refresh all cached costs"""
+    async def refresh_cost_cache(self, facility_id: str, fuel_names: Optional[List[str]] = None):
+        """
+        Re-price fuels for the facility's region in place (no cache clear)
+        
+        Args:
+            facility_id: Facility whose region should be refreshed
+            fuel_names: Fuels to refresh (defaults to the catalog's alternative fuels in kg)
+        """
         logger.info("Refreshing cost cache")
-        self.cost_cache.clear()
+        location = await self.get_facility_location(facility_id)
         
-        # This would get fuel names from database
-        common_fuels = [
-            "Biomass", "Rice Husk", "Agricultural Waste", "Cotton Stalks",
-            "Waste-derived Fuel", "Used Tires", "Bagasse", "Wheat Straw"
+        # Default to the catalog's alternative fuels priced per kg
+        common_fuels = fuel_names or [
+            fuel["resource_name"] for fuel in emission_factor_catalog.fuels(alternative_only=True, unit=MASS_UNIT)
         ]
         
-        await self.get_all_fuel_costs(common_fuels, facility_id)
+        await self.price_fuels(common_fuels, location)
     
     def get_cost_statistics(self, fuel_costs: Dict[str, Dict[str, Any]]) -> Dict[str, float]:
         """Calculate cost statistics for dynamic ranges"""
@@ -0,0 +1,405 @@
+"""
+Emission Factor Catalog
+In-process columnar catalog of the emission factor library (ef_libraries_with_cost.csv)
+"""
+
+import csv
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from ..config.settings import get_settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Copy of the backend seed file shipped with the service (and its Docker image)
+DEFAULT_CATALOG_PATH = Path(__file__).resolve().parents[2] / "resources" / "ef_libraries_with_cost.csv"
+
+# Seed file of the backend's emission_factors table (repository layout; not in the image)
+BACKEND_SEED_PATH = (
+    Path(__file__).resolve().parents[3] / "backend" / "migrations" / "files" / "ef_libraries_with_cost.csv"
+)
+
+CATALOG_DTYPE = np.dtype([
+    ("name", "U128"),
+    ("source", "U32"),
+    ("version", "U8"),
+    ("published_year", "i4"),
+    ("scope", "U16"),
+    ("category", "U48"),
+    ("unit", "U8"),
+    ("kgco2e", "f8"),
+    ("heat_content_mj", "f8"),
+    ("biogenic_kgco2e", "f8"),
+    ("cost_inr", "f8"),
+    ("is_renewable", "?"),
+    ("is_biofuel", "?"),
+    ("is_refrigerant", "?"),
+    ("is_alternative_fuel", "?"),
+])
+
+# Fuels used for thermal substitution in cement kilns (besides biofuels)
+ALTERNATIVE_FUEL_KEYWORDS = (
+    "waste", "tire", "tyre", "biomass", "byproduct", "wood", "plastic",
+    "used oil", "animal fat", "vegetable oil", "landfill gas",
+)
+
+COMBUSTION_CATEGORY = "Stationary Combustion"
+
+# Unit of the per-kg fuel tables (optimizer ranges, Pareto frontier, preference scores);
+# catalog fuels priced per L or m3 cannot be placed on those axes without a density
+MASS_UNIT = "kg"
+
+_VERSION_RANK = {"ar6": 3, "ar5": 2, "ar4": 1}
+
+
+def _float(value: Optional[str]) -> float:
+    try:
+        return float(value) if value not in (None, "") else np.nan
+    except ValueError:
+        return np.nan
+
+
+def _bool(value: Optional[str]) -> bool:
+    return str(value).strip().lower() in ("true", "1", "yes", "t")
+
+
+def _key(value: str) -> str:
+    return value.strip().lower()
+
+
+def availability_score(cost_inr: Optional[float]) -> int:
+    """
+    Availability score (1-10) of a catalog row, derived from its per-unit cost
+    exactly as the backend's emission factor loader does (5 when unpriced)
+    """
+    if not cost_inr or cost_inr != cost_inr:
+        return 5
+    if cost_inr <= 10:
+        return 9
+    if cost_inr <= 50:
+        return 8
+    if cost_inr <= 100:
+        return 7
+    return 6
+
+
+class EmissionFactorCatalog:
+    """
+    Emission factors held as one NumPy structured array
+
+    Indexes (built once at load):
+    - name -> preferred row (latest year / assessment report, priced rows first)
+    - name -> all rows of that name (one per library/version)
+    - scope, category (activity type) and library (source) -> row positions
+
+    Fuel rows are returned as dicts in the shape the fuel routers use
+    (resource_name, emission_factor, heat_content in GJ per unit, ...).
+    """
+
+    def __init__(self, rows: np.ndarray, path: Optional[str] = None):
+        """
+        Build the indexes over loaded rows
+
+        Args:
+            rows: Structured array with CATALOG_DTYPE
+            path: File the rows were loaded from (for diagnostics)
+        """
+        self.rows = rows
+        self.path = path
+
+        # Preference order: priced and with heat content, then newest year and report version
+        versions = np.array([_VERSION_RANK.get(version, 0) for version in rows["version"]], dtype=int)
+        order = np.lexsort((
+            -versions,
+            -rows["published_year"],
+            np.isnan(rows["heat_content_mj"]),
+            np.isnan(rows["cost_inr"]),
+        ))
+
+        name_rows: Dict[str, List[int]] = {}
+        for position in order.tolist():
+            name_rows.setdefault(_key(rows["name"][position]), []).append(position)
+        self._name_rows = {name: np.array(positions) for name, positions in name_rows.items()}
+        self._by_name = {name: int(positions[0]) for name, positions in self._name_rows.items()}
+
+        self._by_scope = self._group(rows["scope"])
+        self._by_category = self._group(rows["category"])
+        self._by_library = self._group(rows["source"])
+
+    @staticmethod
+    def _group(column: np.ndarray) -> Dict[str, np.ndarray]:
+        """Secondary index: normalized value -> ascending row positions"""
+        keys = np.char.lower(np.char.strip(column))
+        unique, inverse = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        bounds = np.searchsorted(inverse[order], np.arange(len(unique) + 1))
+        return {str(key): order[bounds[i]:bounds[i + 1]] for i, key in enumerate(unique)}
+
+    @classmethod
+    def from_csv(cls, path: str) -> "EmissionFactorCatalog":
+        """
+        Load the catalog from ef_libraries_with_cost.csv
+
+        A missing or unreadable file yields an empty catalog (logged).
+
+        Args:
+            path: CSV file path
+
+        Returns:
+            EmissionFactorCatalog: Loaded catalog
+        """
+        try:
+            with open(path, newline="", encoding="utf-8") as handle:
+                records = list(csv.DictReader(handle))
+        except OSError as e:
+            logger.error(f"Emission factor catalog not loaded ({path}): {e}")
+            return cls(np.empty(0, dtype=CATALOG_DTYPE), path)
+
+        rows = np.empty(len(records), dtype=CATALOG_DTYPE)
+        for i, record in enumerate(records):
+            name = (record.get("name") or "").strip()
+            is_biofuel = _bool(record.get("is_biofuel"))
+            category = (record.get("activity_type") or "").strip()
+            year = _float(record.get("published_year"))
+            rows[i] = (
+                name,
+                (record.get("source") or "").strip(),
+                (record.get("version") or "").strip().lower(),
+                int(year) if year == year else 0,
+                (record.get("scope") or "").strip(),
+                category,
+                (record.get("unit_name") or "").strip(),
+                _float(record.get("kgco2e")),
+                _float(record.get("heat_content")),
+                _float(record.get("biogenic_kgco2e")),
+                _float(record.get("cost_inr")),
+                _bool(record.get("is_renewable")),
+                is_biofuel,
+                _bool(record.get("is_refrigerant")),
+                category == COMBUSTION_CATEGORY and (
+                    is_biofuel or any(keyword in name.lower() for keyword in ALTERNATIVE_FUEL_KEYWORDS)
+                ),
+            )
+
+        logger.info(f"Loaded {len(rows)} emission factors from {path}")
+        return cls(rows, str(path))
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def lookup(self, name: str) -> Optional[int]:
+        """
+        Preferred row position for a resource name (case-insensitive)
+
+        Args:
+            name: Resource name
+
+        Returns:
+            Row position, or None if the name is unknown
+        """
+        return self._by_name.get(_key(name or ""))
+
+    def rows_for_name(self, name: str) -> np.ndarray:
+        """All row positions for a resource name, preferred first"""
+        return self._name_rows.get(_key(name or ""), np.empty(0, dtype=int))
+
+    def select(
+        self,
+        scope: Optional[str] = None,
+        category: Optional[str] = None,
+        library: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Row positions matching every given filter (secondary index intersection)
+
+        Args:
+            scope: e.g. "Scope 1"
+            category: Activity type, e.g. "Stationary Combustion"
+            library: Source library, e.g. "GHG Protocol"
+
+        Returns:
+            np.ndarray: Ascending row positions
+        """
+        positions = np.arange(len(self.rows))
+        for index, value in ((self._by_scope, scope), (self._by_category, category), (self._by_library, library)):
+            if value is not None:
+                positions = np.intersect1d(positions, index.get(_key(value), np.empty(0, dtype=int)), assume_unique=True)
+        return positions
+
+    def fuel_positions(
+        self,
+        alternative_only: bool = False,
+        priced_only: bool = True,
+        unit: Optional[str] = None
+    ) -> np.ndarray:
+        """
+        Preferred stationary-combustion row per fuel name with a heat content
+
+        Args:
+            alternative_only: Only fuels used for thermal substitution
+            priced_only: Only rows with a cost
+            unit: Only rows in this unit (e.g. MASS_UNIT)
+
+        Returns:
+            np.ndarray: Row positions (one per fuel name), ordered by name
+        """
+        rows = self.rows
+        mask = (rows["category"] == COMBUSTION_CATEGORY) & (rows["heat_content_mj"] > 0)
+        if alternative_only:
+            mask &= rows["is_alternative_fuel"]
+        if priced_only:
+            mask &= rows["cost_inr"] > 0
+        if unit is not None:
+            mask &= np.char.lower(rows["unit"]) == unit.lower()
+        candidates = set(np.flatnonzero(mask).tolist())
+
+        positions = []
+        for name in sorted(self._name_rows):
+            for position in self._name_rows[name].tolist():
+                if position in candidates:
+                    positions.append(position)
+                    break
+        return np.array(positions, dtype=int)
+
+    def record(self, position: int) -> Dict[str, Any]:
+        """
+        Row as a fuel dict (heat content converted from MJ to GJ per unit)
+
+        Args:
+            position: Row position
+
+        Returns:
+            Dict[str, Any]: Fuel data
+        """
+        row = self.rows[position]
+        unit = str(row["unit"])
+        heat_mj = float(row["heat_content_mj"])
+        cost = float(row["cost_inr"])
+        return {
+            "resource_name": str(row["name"]),
+            "category": str(row["category"]),
+            "scope": str(row["scope"]),
+            "emission_factor": float(row["kgco2e"]),
+            "emission_factor_unit": f"kgCO2e/{unit}",
+            "heat_content": heat_mj / 1000 if heat_mj == heat_mj else 0.0,
+            "heat_content_unit": f"GJ/{unit}",
+            "cost_inr": cost if cost == cost else None,
+            "cost_unit": f"INR/{unit}",
+            "unit": unit,
+            "availability_score": availability_score(cost),
+            "library_name": str(row["source"]),
+            "library_version": str(row["version"]),
+            "published_year": int(row["published_year"]),
+            "is_renewable": bool(row["is_renewable"]),
+            "is_biofuel": bool(row["is_biofuel"]),
+            "is_alternative_fuel": bool(row["is_alternative_fuel"]),
+        }
+
+    def records(self, positions: Iterable[int]) -> List[Dict[str, Any]]:
+        """Rows as fuel dicts"""
+        return [self.record(position) for position in positions]
+
+    def find(self, name: str) -> Optional[Dict[str, Any]]:
+        """Preferred row of a resource name as a fuel dict, or None"""
+        position = self.lookup(name)
+        return self.record(position) if position is not None else None
+
+    def fuels(
+        self,
+        alternative_only: bool = False,
+        priced_only: bool = True,
+        unit: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Combustion fuels as fuel dicts (see fuel_positions)"""
+        return self.records(self.fuel_positions(alternative_only, priced_only, unit).tolist())
+
+    def facility_fuels(
+        self,
+        facility_data: Dict[str, Any],
+        alternative_only: bool = True,
+        unit: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Catalog rows of the combustion fuels configured for a facility
+        (availability_score as configured for the facility, when set)
+
+        Args:
+            facility_data: Comprehensive facility data (facility_resources)
+            alternative_only: Only fuels used for thermal substitution
+            unit: Only rows in this unit (e.g. MASS_UNIT)
+
+        Returns:
+            List[Dict[str, Any]]: Fuel dicts of resources found in the catalog
+        """
+        fuels, seen = [], set()
+        for entry in (facility_data or {}).get("facility_resources", []):
+            name = (entry.get("resource") or {}).get("name") or ""
+            position = self.lookup(name)
+            if position is None or position in seen:
+                continue
+            row = self.rows[position]
+            if row["category"] != COMBUSTION_CATEGORY or (alternative_only and not row["is_alternative_fuel"]):
+                continue
+            if unit is not None and str(row["unit"]).lower() != unit.lower():
+                continue
+            seen.add(position)
+            fuel = self.record(position)
+            # The facility's configured availability overrides the catalog default
+            configured = (entry.get("emissionFactor") or {}).get("availabilityScore")
+            if configured is not None:
+                fuel["availability_score"] = configured
+            fuels.append(fuel)
+        return fuels
+
+    def ensure_loaded(self):
+        """
+        Fail when no fuels can be served (every fuel route reads the catalog)
+
+        Raises:
+            RuntimeError: The catalog is empty or has no priced combustion fuels
+        """
+        if not len(self.rows) or not len(self.fuel_positions()):
+            raise RuntimeError(
+                f"Emission factor catalog has no priced combustion fuels ({self.path}); "
+                "set EF_CATALOG_PATH to ef_libraries_with_cost.csv"
+            )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Catalog size and index cardinalities"""
+        return {
+            "rows": len(self.rows),
+            "names": len(self._by_name),
+            "scopes": {scope: len(rows) for scope, rows in self._by_scope.items()},
+            "categories": {category: len(rows) for category, rows in self._by_category.items()},
+            "libraries": {library: len(rows) for library, rows in self._by_library.items()},
+            "path": self.path,
+        }
+
+
+def _warn_if_stale(path: Path):
+    """Warn when the bundled copy no longer matches the backend seed file of a repo checkout"""
+    if path == DEFAULT_CATALOG_PATH and BACKEND_SEED_PATH.is_file() and path.is_file():
+        if path.read_bytes() != BACKEND_SEED_PATH.read_bytes():
+            logger.warning(
+                f"{path} differs from {BACKEND_SEED_PATH}; run `make sync-ef-catalog` to update the bundled copy"
+            )
+
+
+# Global catalog instance (loaded once at import)
+_catalog_path = Path(settings.ef_catalog_path) if settings.ef_catalog_path else DEFAULT_CATALOG_PATH
+_warn_if_stale(_catalog_path)
+emission_factor_catalog = EmissionFactorCatalog.from_csv(str(_catalog_path))
+
+
+async def get_emission_factor_catalog() -> EmissionFactorCatalog:
+    """
+    Get emission factor catalog instance
+
+    Returns:
+        EmissionFactorCatalog: Catalog instance
+    """
+    return emission_factor_catalog
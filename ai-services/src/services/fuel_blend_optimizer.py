@@ -0,0 +1,368 @@
+"""
+Fuel Blend Optimizer Service
+Linear-programming fuel blends for kiln thermal substitution targets
+"""
+
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+from scipy.optimize import linprog
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+OBJECTIVES = ('cost', 'emission')
+
+
+@dataclass
+class BlendFuel:
+    """Fuel as seen by the LP (all quantities per unit of fuel)"""
+    name: str
+    emission_factor: float  # kgCO2e per unit
+    heat_content_gj: float  # GJ per unit
+    cost_inr: float  # INR per unit
+    unit: str = 'kg'
+    is_alternative: bool = False
+    max_heat_share: Optional[float] = None  # cap as a fraction of heat demand
+    max_quantity: Optional[float] = None  # cap in fuel units
+
+
+def heat_content_gj(value: Any, unit: Optional[str]) -> float:
+    """
+    Convert a heat content to GJ per fuel unit
+
+    Catalog heat contents are MJ per unit; the optimizer tables use GJ/kg.
+    Values without a recognizable energy unit are treated as MJ.
+
+    Args:
+        value: Heat content
+        unit: Heat content unit (e.g. "GJ/kg", "MJ/L")
+
+    Returns:
+        float: GJ per unit (0 when missing or invalid)
+    """
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    if not np.isfinite(value) or value <= 0:
+        return 0.0
+
+    unit = (unit or '').lower()
+    if 'gj' in unit:
+        return value
+    if 'kwh' in unit:
+        return value * 0.0036
+    if 'mmbtu' in unit:
+        return value * 1.055056
+    if 'kj' in unit:
+        return value / 1e6
+    return value / 1e3
+
+
+def unit_basis(unit: Optional[str]) -> str:
+    """
+    Fuel unit a per-unit quantity refers to ("GJ/kg" -> "kg", "INR/m3" -> "m3")
+
+    Args:
+        unit: Unit string, either a plain fuel unit or a rate with "/"
+
+    Returns:
+        str: Normalized fuel unit ("" when missing)
+    """
+    basis = (unit or '').rsplit('/', 1)[-1].strip().lower()
+    return {'litre': 'l', 'liter': 'l', 'litres': 'l', 'liters': 'l', 'm³': 'm3', 'kgs': 'kg'}.get(basis, basis)
+
+
+def availability_share(score: Any) -> Optional[float]:
+    """
+    Maximum heat share implied by an availability score
+
+    Scores up to 10 are read on the optimizer's 0-10 scale, larger ones on the
+    backend's 0-100 scale. Missing or non-positive scores impose no cap.
+
+    Args:
+        score: Availability score
+
+    Returns:
+        Fraction of heat demand (0-1), or None for no cap
+    """
+    try:
+        score = float(score)
+    except (TypeError, ValueError):
+        return None
+    if not np.isfinite(score) or score <= 0:
+        return None
+    return min(1.0, score / 10.0 if score <= 10 else score / 100.0)
+
+
+class FuelBlendOptimizer:
+    """
+    Minimum-cost or minimum-emission fuel blends
+
+    Decision variables are fuel quantities, each in the fuel's own unit (kg,
+    L or m3); emission factor, heat content and cost of a fuel must all be
+    per that unit, so fuels of different units blend on their GJ. Constraints:
+    total heat equals the demand, alternative fuels supply at least the
+    thermal substitution rate (TSR), each fuel stays within its availability
+    cap, and (optionally) total cost stays within the budget. Solved with
+    HiGHS, whose duals give the shadow prices of every constraint.
+    """
+
+    def optimize(
+        self,
+        fuels: List[BlendFuel],
+        heat_demand_gj: float,
+        tsr_target: float = 0.0,
+        objective: str = 'cost',
+        budget_inr: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Solve for the optimal blend
+
+        Args:
+            fuels: Candidate fuels
+            heat_demand_gj: Heat to supply (GJ)
+            tsr_target: Minimum alternative-fuel share of heat (0-1)
+            objective: 'cost' (INR) or 'emission' (kgCO2e)
+            budget_inr: Maximum total fuel cost
+
+        Returns:
+            Dict with the blend, totals, shadow prices and the cost/emission
+            trade-off against the other objective
+        """
+        if objective not in OBJECTIVES:
+            raise ValueError(f"objective must be one of {OBJECTIVES}")
+        if heat_demand_gj <= 0:
+            raise ValueError("heat_demand_gj must be positive")
+        if not 0 <= tsr_target <= 1:
+            raise ValueError("tsr_target must be between 0 and 1")
+
+        fuels = [fuel for fuel in fuels if fuel.heat_content_gj > 0 and fuel.cost_inr >= 0]
+        if not fuels:
+            raise ValueError("No fuels with a heat content and cost to blend")
+
+        started = time.perf_counter()
+        model = self._build_model(fuels, heat_demand_gj, tsr_target, budget_inr)
+        primary = self._solve(model, objective)
+        if primary.status != 0:
+            return {
+                'feasible': False,
+                'objective': objective,
+                'message': self._infeasibility_reason(model, heat_demand_gj, tsr_target, budget_inr, primary),
+                'max_achievable_tsr_percent': round(100 * model['max_alternative_heat'] / heat_demand_gj, 2),
+                'solve_time_ms': round((time.perf_counter() - started) * 1000, 2)
+            }
+
+        other = 'emission' if objective == 'cost' else 'cost'
+        alternative = self._solve(model, other)
+
+        return {
+            'feasible': True,
+            'objective': objective,
+            **self._describe_blend(model, primary.x, heat_demand_gj),
+            'shadow_prices': self._shadow_prices(model, primary, objective, heat_demand_gj),
+            'reduced_costs': self._reduced_costs(model, primary, objective),
+            'trade_off': self._trade_off(model, primary, alternative, objective),
+            'solve_time_ms': round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def _build_model(
+        self,
+        fuels: List[BlendFuel],
+        heat_demand_gj: float,
+        tsr_target: float,
+        budget_inr: Optional[float]
+    ) -> Dict[str, Any]:
+        """Constraint matrices shared by both objectives"""
+        heat = np.array([fuel.heat_content_gj for fuel in fuels])
+        cost = np.array([fuel.cost_inr for fuel in fuels])
+        emission = np.array([fuel.emission_factor for fuel in fuels])
+        alternative = np.array([fuel.is_alternative for fuel in fuels], dtype=bool)
+
+        # Upper bounds in fuel units: the tighter of the share cap and the quantity cap
+        upper = np.full(len(fuels), np.inf)
+        for i, fuel in enumerate(fuels):
+            if fuel.max_heat_share is not None:
+                upper[i] = min(upper[i], fuel.max_heat_share * heat_demand_gj / heat[i])
+            if fuel.max_quantity is not None:
+                upper[i] = min(upper[i], fuel.max_quantity)
+
+        rows, bounds, labels = [], [], []
+        if tsr_target > 0:
+            rows.append(np.where(alternative, -heat, 0.0))
+            bounds.append(-tsr_target * heat_demand_gj)
+            labels.append('tsr')
+        if budget_inr is not None:
+            rows.append(cost)
+            bounds.append(budget_inr)
+            labels.append('budget')
+
+        return {
+            'fuels': fuels,
+            'heat': heat,
+            'cost': cost,
+            'emission': emission,
+            'alternative': alternative,
+            'upper': upper,
+            'A_ub': np.array(rows) if rows else None,
+            'b_ub': np.array(bounds) if bounds else None,
+            'ub_labels': labels,
+            'A_eq': heat[np.newaxis, :],
+            'b_eq': np.array([heat_demand_gj]),
+            'max_alternative_heat': min(
+                heat_demand_gj, float(np.sum(np.where(alternative, upper * heat, 0.0)))
+            )
+        }
+
+    @staticmethod
+    def _solve(model: Dict[str, Any], objective: str):
+        coefficients = model['cost'] if objective == 'cost' else model['emission']
+        return linprog(
+            coefficients,
+            A_ub=model['A_ub'],
+            b_ub=model['b_ub'],
+            A_eq=model['A_eq'],
+            b_eq=model['b_eq'],
+            bounds=[(0, None if np.isinf(u) else u) for u in model['upper']],
+            method='highs'
+        )
+
+    @staticmethod
+    def _infeasibility_reason(
+        model: Dict[str, Any],
+        heat_demand_gj: float,
+        tsr_target: float,
+        budget_inr: Optional[float],
+        solution
+    ) -> str:
+        total_capacity = float(np.sum(model['upper'] * model['heat']))
+        if total_capacity < heat_demand_gj:
+            return f"Available fuels supply at most {total_capacity:.1f} GJ of the {heat_demand_gj:.1f} GJ demand"
+        if model['max_alternative_heat'] < tsr_target * heat_demand_gj:
+            achievable = 100 * model['max_alternative_heat'] / heat_demand_gj
+            return f"TSR target of {100 * tsr_target:.1f}% exceeds the {achievable:.1f}% alternative fuels can supply"
+        if budget_inr is not None:
+            return f"No blend meets the constraints within the budget of INR {budget_inr:,.0f}"
+        return f"No feasible blend ({solution.message})"
+
+    @staticmethod
+    def _describe_blend(model: Dict[str, Any], quantities: np.ndarray, heat_demand_gj: float) -> Dict[str, Any]:
+        heat_supplied = quantities * model['heat']
+        costs = quantities * model['cost']
+        emissions = quantities * model['emission']
+
+        blend = []
+        for i in np.flatnonzero(quantities > 1e-9).tolist():
+            fuel = model['fuels'][i]
+            blend.append({
+                'fuel_name': fuel.name,
+                'is_alternative': fuel.is_alternative,
+                'quantity': round(float(quantities[i]), 3),
+                'unit': fuel.unit,
+                'heat_gj': round(float(heat_supplied[i]), 3),
+                'heat_share_percent': round(float(100 * heat_supplied[i] / heat_demand_gj), 2),
+                'cost_inr': round(float(costs[i]), 2),
+                'emissions_kgco2e': round(float(emissions[i]), 2),
+                'at_availability_cap': bool(np.isfinite(model['upper'][i]) and quantities[i] >= model['upper'][i] * (1 - 1e-9))
+            })
+        blend.sort(key=lambda item: item['heat_share_percent'], reverse=True)
+
+        total_cost = float(costs.sum())
+        total_emissions = float(emissions.sum())
+        return {
+            'blend': blend,
+            'totals': {
+                'heat_gj': round(float(heat_supplied.sum()), 3),
+                'cost_inr': round(total_cost, 2),
+                'emissions_kgco2e': round(total_emissions, 2),
+                'emissions_tco2e': round(total_emissions / 1000, 3),
+                'cost_per_gj': round(total_cost / heat_demand_gj, 2),
+                'emission_intensity_kgco2e_per_gj': round(total_emissions / heat_demand_gj, 3),
+                'tsr_percent': round(float(100 * heat_supplied[model['alternative']].sum() / heat_demand_gj), 2)
+            }
+        }
+
+    @staticmethod
+    def _shadow_prices(model: Dict[str, Any], solution, objective: str, heat_demand_gj: float) -> Dict[str, Any]:
+        """Change in the objective per unit relaxation of each constraint"""
+        unit = 'INR' if objective == 'cost' else 'kgCO2e'
+        prices = {
+            'heat_demand': {
+                'value': round(float(solution.eqlin.marginals[0]), 4),
+                'unit': f"{unit} per additional GJ"
+            }
+        }
+
+        for label, marginal in zip(model['ub_labels'], solution.ineqlin.marginals.tolist()):
+            if label == 'tsr':
+                # Row is -alternative_heat <= -tsr * demand, so d(objective)/d(tsr) = -marginal * demand
+                prices['tsr'] = {
+                    'value': round(-marginal * heat_demand_gj / 100, 4),
+                    'unit': f"{unit} per additional TSR percentage point",
+                    'binding': abs(marginal) > 1e-9
+                }
+            elif label == 'budget':
+                prices['budget'] = {
+                    'value': round(marginal, 6),
+                    'unit': f"{unit} per additional INR of budget",
+                    'binding': abs(marginal) > 1e-9
+                }
+
+        caps = []
+        for i, marginal in enumerate(solution.upper.marginals.tolist()):
+            if abs(marginal) > 1e-9:
+                caps.append({
+                    'fuel_name': model['fuels'][i].name,
+                    'value': round(marginal / model['heat'][i], 4),
+                    'unit': f"{unit} per additional GJ of availability"
+                })
+        prices['availability_caps'] = caps
+        return prices
+
+    @staticmethod
+    def _reduced_costs(model: Dict[str, Any], solution, objective: str) -> List[Dict[str, Any]]:
+        """How much cheaper (or cleaner) per GJ an unused fuel must get to enter the blend"""
+        unit = 'INR/GJ' if objective == 'cost' else 'kgCO2e/GJ'
+        reduced = []
+        for i, marginal in enumerate(solution.lower.marginals.tolist()):
+            if marginal > 1e-9:
+                reduced.append({
+                    'fuel_name': model['fuels'][i].name,
+                    'improvement_needed': round(marginal / model['heat'][i], 4),
+                    'unit': unit
+                })
+        reduced.sort(key=lambda item: item['improvement_needed'])
+        return reduced
+
+    @staticmethod
+    def _trade_off(model: Dict[str, Any], primary, alternative, objective: str) -> Optional[Dict[str, Any]]:
+        """Compare against the blend optimal for the other objective"""
+        if alternative.status != 0:
+            return None
+        primary_cost = float(primary.x @ model['cost'])
+        primary_emissions = float(primary.x @ model['emission'])
+        other_cost = float(alternative.x @ model['cost'])
+        other_emissions = float(alternative.x @ model['emission'])
+
+        # Cost of moving from the min-cost blend to the min-emission blend
+        if objective == 'cost':
+            extra_cost, avoided = other_cost - primary_cost, primary_emissions - other_emissions
+        else:
+            extra_cost, avoided = primary_cost - other_cost, other_emissions - primary_emissions
+
+        return {
+            'alternative_objective': 'emission' if objective == 'cost' else 'cost',
+            'alternative_cost_inr': round(other_cost, 2),
+            'alternative_emissions_kgco2e': round(other_emissions, 2),
+            'cost_difference_inr': round(other_cost - primary_cost, 2),
+            'emissions_difference_kgco2e': round(other_emissions - primary_emissions, 2),
+            'abatement_cost_inr_per_tco2e': round(1000 * extra_cost / avoided, 2) if avoided > 1e-9 else None
+        }
+
+
+# Global service instance
+fuel_blend_optimizer = FuelBlendOptimizer()
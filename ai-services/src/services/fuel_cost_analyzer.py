@@ -3,12 +3,96 @@ Fuel Cost Analyzer Service
 Provides AI-powered cost analysis and recommendations for alternative fuels
 """
 
-import logging
-from typing import Dict, List, Optional, Any
+import itertools
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Sequence
 from datetime import datetime
 import json
 
-logger = logging.getLogger(__name__)
+import numpy as np
+
+from ..utils.logger import get_logger
+from .emission_factor_catalog import emission_factor_catalog
+from .fuel_uncertainty import fuel_uncertainty_engine
+
+logger = get_logger(__name__)
+
+# Preference criteria in weight-vector order; preferences are 1-10 with 1 = highest priority
+PREFERENCE_KEYS = ('cost', 'emission', 'energy')
+
+# Heat content (GJ per unit) that earns the full energy score
+FULL_ENERGY_SCORE_HEAT_CONTENT = 0.04
+
+def preference_weights(preferences: Any) -> np.ndarray:
+    """
+    Criteria weights from 1-10 preferences (1 = highest priority -> weight 10)
+    
+    Args:
+        preferences: Dict with cost/emission/energy, or an (..., 3) array in that order
+        
+    Returns:
+        np.ndarray: Weights normalized to sum to 1 along the last axis
+    """
+    if isinstance(preferences, dict):
+        preferences = [preferences.get(key, 5) for key in PREFERENCE_KEYS]
+    weights = 11 - np.clip(np.asarray(preferences, dtype=float), 1, 10)
+    return weights / weights.sum(axis=-1, keepdims=True)
+
+def _number(value: Any) -> float:
+    """Numeric fuel field (missing or invalid values count as 0)"""
+    try:
+        return float(value or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+def _range(values: np.ndarray) -> Dict[str, float]:
+    """min/max/avg of the non-zero values (zeros mean "not available")"""
+    values = values[values != 0]
+    if not values.size:
+        return {'min': 0, 'max': 0, 'avg': 0}
+    return {'min': float(values.min()), 'max': float(values.max()), 'avg': float(values.mean())}
+
+@dataclass
+class FuelScores:
+    """Cost-effectiveness metrics of many fuels as parallel arrays (one entry per fuel)"""
+    cost_per_unit: np.ndarray
+    cost_per_gj: np.ndarray
+    cost_per_kg_co2: np.ndarray
+    carbon_intensity: np.ndarray
+    emission_score: np.ndarray
+    cost_score: np.ndarray
+    energy_score: np.ndarray
+    value_score: np.ndarray
+    market_data: List[Dict[str, Any]]
+    
+    def __len__(self) -> int:
+        return len(self.value_score)
+    
+    def analysis(self, i: int) -> Dict[str, Any]:
+        """Per-fuel dict view (the calculate_cost_effectiveness format)"""
+        return {
+            'cost_per_unit_inr': float(self.cost_per_unit[i]),
+            'cost_per_gj_inr': float(self.cost_per_gj[i]),
+            'cost_per_kg_co2_avoided_inr': float(self.cost_per_kg_co2[i]),
+            'carbon_intensity': float(self.carbon_intensity[i]),
+            'emission_score': float(self.emission_score[i]),
+            'cost_score': float(self.cost_score[i]),
+            'energy_score': float(self.energy_score[i]),
+            'value_score': float(self.value_score[i]),
+            'market_data': self.market_data[i]
+        }
+    
+    def criteria(self) -> np.ndarray:
+        """n x 3 score matrix in PREFERENCE_KEYS order (cost, emission, energy)"""
+        return np.column_stack([self.cost_score, self.emission_score, self.energy_score])
+    
+    def summary(self) -> Dict[str, Any]:
+        """Summary statistics over all fuels"""
+        return {
+            'total_fuels_analyzed': len(self),
+            'cost_range_inr': _range(self.cost_per_unit),
+            'carbon_intensity_range': _range(self.carbon_intensity)
+        }
 
 class FuelCostAnalyzer:
     """AI-powered fuel cost analysis and recommendation service"""
@@ -16,52 +100,6 @@ class FuelCostAnalyzer:
     # Current USD to INR exchange rate (you may want to fetch this dynamically)
     USD_TO_INR_RATE = 83.50
     
-    # Indian market cost estimates for alternative fuels (INR per unit)
-    INDIAN_FUEL_COSTS = {
-        'Biomass': {
-            'cost_per_kg': 8.50,  # INR per kg
-            'unit': 'kg',
-            'market_availability': 'High',
-            'seasonal_variation': 'Medium',
-            'regional_factors': 'Varies by agricultural season'
-        },
-        'Waste-derived Fuel': {
-            'cost_per_kg': 6.20,  # INR per kg  
-            'unit': 'kg',
-            'market_availability': 'Medium',
-            'seasonal_variation': 'Low',
-            'regional_factors': 'Depends on waste processing infrastructure'
-        },
-        'Used Tires': {
-            'cost_per_kg': 4.80,  # INR per kg
-            'unit': 'kg', 
-            'market_availability': 'Medium',
-            'seasonal_variation': 'Low',
-            'regional_factors': 'Good availability near urban centers'
-        },
-        'Agricultural Waste': {
-            'cost_per_kg': 5.30,  # INR per kg
-            'unit': 'kg',
-            'market_availability': 'High',
-            'seasonal_variation': 'High', 
-            'regional_factors': 'Highly seasonal, varies by crop cycles'
-        },
-        'Rice Husk': {
-            'cost_per_kg': 3.20,  # INR per kg
-            'unit': 'kg',
-            'market_availability': 'High',
-            'seasonal_variation': 'Medium',
-            'regional_factors': 'Abundant in rice-growing regions'
-        },
-        'Cotton Stalks': {
-            'cost_per_kg': 4.50,  # INR per kg
-            'unit': 'kg',
-            'market_availability': 'Medium',
-            'seasonal_variation': 'High',
-            'regional_factors': 'Available in cotton-growing states'
-        }
-    }
-    
     def __init__(self):
         self.client = None  # Will be set if OpenAI integration is needed
         
@@ -72,10 +110,10 @@ class FuelCostAnalyzer:
         return usd_amount * self.USD_TO_INR_RATE
     
     def get_indian_market_cost(self, fuel_name: str) -> Dict[str, Any]:
-        """Get cost data for fuel in Indian market"""
-        cost_data = self.INDIAN_FUEL_COSTS.get(fuel_name, {})
+        """Get cost data for fuel in Indian market (emission factor catalog cost_inr)"""
+        fuel = emission_factor_catalog.find(fuel_name)
         
-        if not cost_data:
+        if not fuel or fuel.get('cost_inr') is None:
             # Fallback for unknown fuels
             return {
                 'cost_per_kg': 7.00,  # Default INR per kg
@@ -87,44 +125,146 @@ class FuelCostAnalyzer:
             }
         
         return {
-            **cost_data,
+            'cost_per_kg': fuel['cost_inr'],  # INR per catalog unit
+            'unit': fuel['unit'],
+            'market_availability': 'Unknown',
+            'seasonal_variation': 'Unknown',
+            'regional_factors': 'Not tracked in the emission factor catalog',
+            'library_name': fuel['library_name'],
+            'published_year': fuel['published_year'],
             'estimated': False
         }
     
     def calculate_cost_effectiveness(self, fuel_data: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate cost effectiveness metrics for a fuel"""
+        return self.score_fuels([fuel_data]).analysis(0)
+    
+    def score_fuels(self, fuels_data: List[Dict[str, Any]], 
+                    user_priorities: Optional[Dict[str, int]] = None) -> FuelScores:
+        """
+        Calculate cost effectiveness metrics for all fuels as array operations
         
-        fuel_name = fuel_data.get('resource_name', '')
-        emission_factor = fuel_data.get('emission_factor', 0)
-        heat_content = fuel_data.get('heat_content', 0)
+        Args:
+            fuels_data: Fuel dicts (resource_name, emission_factor, heat_content
+                in GJ per unit, optional cost_inr)
+            user_priorities: cost/emission/energy preferences (1-10); when given,
+                value_score is the preference-weighted mean of the three scores,
+                otherwise the mean of the emission and cost scores
+            
+        Returns:
+            FuelScores: Metrics per fuel, in input order
+        """
+        count = len(fuels_data)
+        emission_factor = np.fromiter((_number(f.get('emission_factor')) for f in fuels_data), float, count)
+        heat_content = np.fromiter((_number(f.get('heat_content')) for f in fuels_data), float, count)
+        
+        # Get Indian market cost once per fuel name (the fuel's own catalog cost when present)
+        market_by_name: Dict[str, Dict[str, Any]] = {}
+        market_data = []
+        cost_per_unit = np.empty(count)
+        for i, fuel in enumerate(fuels_data):
+            name = fuel.get('resource_name', '')
+            cost_data = market_by_name.get(name)
+            if cost_data is None:
+                cost_data = market_by_name[name] = self.get_indian_market_cost(name)
+            market_data.append(cost_data)
+            cost_per_unit[i] = _number(fuel.get('cost_inr')) or _number(cost_data.get('cost_per_kg'))
         
-        # Get Indian market cost
-        cost_data = self.get_indian_market_cost(fuel_name)
-        cost_per_unit = cost_data.get('cost_per_kg', 0)
+        # Calculate key metrics (0 where the denominator is not positive)
+        has_heat = heat_content > 0
+        has_emissions = emission_factor > 0
+        safe_heat = np.where(has_heat, heat_content, 1.0)
+        carbon_intensity = np.where(has_heat, emission_factor / safe_heat, 0.0)
+        cost_per_gj = np.where(has_heat, cost_per_unit / safe_heat, 0.0)
+        cost_per_kg_co2 = np.where(has_emissions, cost_per_unit / np.where(has_emissions, emission_factor, 1.0), 0.0)
         
-        # Calculate key metrics
-        carbon_intensity = emission_factor / heat_content if heat_content > 0 else 0
-        cost_per_gj = cost_per_unit / heat_content if heat_content > 0 else 0
-        cost_per_kg_co2_avoided = cost_per_unit / emission_factor if emission_factor > 0 else 0
+        # Environmental benefit score (lower emissions = higher score, 0-100)
+        emission_score = np.maximum(0.0, 100 - carbon_intensity * 2)
         
-        # Environmental benefit score (lower emissions = higher score)
-        emission_score = max(0, 100 - (carbon_intensity * 2))  # Scale 0-100
+        # Economic score (lower cost = higher score, 0-100)
+        cost_score = np.maximum(0.0, 100 - cost_per_gj * 10)
         
-        # Economic score (lower cost = higher score)
-        cost_score = max(0, 100 - (cost_per_gj * 10))  # Scale 0-100
+        # Energy score (higher heat content = higher score, 0-100)
+        energy_score = np.clip(heat_content / FULL_ENERGY_SCORE_HEAT_CONTENT, 0.0, 1.0) * 100
         
         # Overall value score
-        value_score = (emission_score + cost_score) / 2
+        if user_priorities is None:
+            value_score = (emission_score + cost_score) / 2
+        else:
+            value_score = np.column_stack([cost_score, emission_score, energy_score]) @ preference_weights(user_priorities)
+        
+        return FuelScores(
+            cost_per_unit=cost_per_unit,
+            cost_per_gj=cost_per_gj,
+            cost_per_kg_co2=cost_per_kg_co2,
+            carbon_intensity=carbon_intensity,
+            emission_score=emission_score,
+            cost_score=cost_score,
+            energy_score=energy_score,
+            value_score=value_score,
+            market_data=market_data
+        )
+    
+    def sweep_preferences(self, fuels_data: List[Dict[str, Any]], 
+                          levels: Sequence[int] = tuple(range(1, 11)),
+                          top_k: int = 1) -> Dict[str, Any]:
+        """
+        Rank all fuels for every combination of preference levels in one pass
+        
+        Args:
+            fuels_data: Fuel dicts (as for score_fuels)
+            levels: Preference levels swept for each of cost, emission and energy
+                (the default 1-10 gives 1000 grid cells)
+            top_k: Fuels ranked per grid cell
+            
+        Returns:
+            Dict with the fuels' scores, the winner (and top_k ranking) per
+            grid cell and how many cells each fuel wins
+        """
+        levels = sorted({int(level) for level in levels if 1 <= int(level) <= 10})
+        if not fuels_data or not levels:
+            return {'fuels': [], 'levels': levels, 'grid_size': 0, 'cells': [], 'win_counts': {}}
+        
+        scores = self.score_fuels(fuels_data)
+        grid = np.array(list(itertools.product(levels, repeat=len(PREFERENCE_KEYS))))
+        values = scores.criteria() @ preference_weights(grid).T  # fuels x cells
+        
+        top_k = max(1, min(top_k, len(fuels_data)))
+        if top_k < len(fuels_data):
+            top = np.argpartition(-values, top_k - 1, axis=0)[:top_k]
+        else:
+            top = np.broadcast_to(np.arange(len(fuels_data))[:, None], values.shape)
+        ranking = np.take_along_axis(top, np.argsort(-np.take_along_axis(values, top, axis=0), axis=0, kind='stable'), axis=0)
+        winners = ranking[0]
+        winner_values = np.take_along_axis(values, winners[None, :], axis=0)[0]
+        
+        names = [fuel.get('resource_name', '') for fuel in fuels_data]
+        cells = []
+        for cell, preferences in enumerate(grid.tolist()):
+            entry = dict(zip(PREFERENCE_KEYS, preferences))
+            entry['winner'] = names[winners[cell]]
+            entry['winner_index'] = int(winners[cell])
+            entry['value_score'] = round(float(winner_values[cell]), 2)
+            if top_k > 1:
+                entry['ranking'] = ranking[:, cell].tolist()
+            cells.append(entry)
         
+        win_counts = np.bincount(winners, minlength=len(fuels_data))
         return {
-            'cost_per_unit_inr': cost_per_unit,
-            'cost_per_gj_inr': cost_per_gj,
-            'cost_per_kg_co2_avoided_inr': cost_per_kg_co2_avoided,
-            'carbon_intensity': carbon_intensity,
-            'emission_score': emission_score,
-            'cost_score': cost_score,
-            'value_score': value_score,
-            'market_data': cost_data
+            'fuels': [
+                {
+                    'index': i,
+                    'resource_name': names[i],
+                    'cost_score': round(float(scores.cost_score[i]), 2),
+                    'emission_score': round(float(scores.emission_score[i]), 2),
+                    'energy_score': round(float(scores.energy_score[i]), 2)
+                }
+                for i in range(len(fuels_data))
+            ],
+            'levels': levels,
+            'grid_size': len(cells),
+            'cells': cells,
+            'win_counts': {names[i]: int(count) for i, count in enumerate(win_counts) if count}
         }
     
     def generate_fuel_recommendation(self, fuels_analysis: List[Dict[str, Any]], 
@@ -165,7 +305,7 @@ Your current preferences prioritize: {cost_priority} for cost, {emission_priorit
 Based on this specific combination, **{best_name}** emerges as the optimal alternative fuel choice for your cement facility.
 
 **💰 Economic Analysis:**
-- Cost: ₹{best_analysis.get('cost_per_unit_inr', 0):.2f} per kg
+- Cost: ₹{best_analysis.get('cost_per_unit_inr', 0):.2f} per {best_analysis.get('market_data', {}).get('unit', 'kg')}
 - Energy cost efficiency: ₹{best_analysis.get('cost_per_gj_inr', 0):.2f} per GJ
 - CO₂ mitigation cost: ₹{best_analysis.get('cost_per_kg_co2_avoided_inr', 0):.2f} per kg CO₂ avoided
 
@@ -252,49 +392,37 @@ With 20% substitution of conventional fuel with {best_name}, you can expect appr
         return recommendation.strip()
     
     def analyze_fuels_comprehensive(self, fuels_data: List[Dict[str, Any]], 
-                                  user_priorities: Dict[str, int] = None) -> Dict[str, Any]:
+                                  user_priorities: Dict[str, int] = None,
+                                  annual_heat_demand_gj: Optional[float] = None) -> Dict[str, Any]:
         """Perform comprehensive analysis of alternative fuels"""
         
         if user_priorities is None:
             user_priorities = {'cost': 5, 'emission': 5, 'energy': 5}
         
-        analyzed_fuels = []
+        scores = self.score_fuels(fuels_data, user_priorities)
         
-        for fuel in fuels_data:
-            analysis = self.calculate_cost_effectiveness(fuel)
-            analyzed_fuel = {
-                **fuel,
-                'analysis': analysis
-            }
-            analyzed_fuels.append(analyzed_fuel)
+        # Confidence intervals on annual cost and CO2 (catalog prices are medium
+        # confidence, the default market estimate low)
+        uncertainty = fuel_uncertainty_engine.analyze_fuels(
+            fuels_data,
+            annual_heat_demand_gj=annual_heat_demand_gj,
+            costs=scores.cost_per_unit,
+            confidence_levels=[
+                fuel.get('cost_confidence') or ('low' if market.get('estimated') else 'medium')
+                for fuel, market in zip(fuels_data, scores.market_data)
+            ]
+        )
+        
+        analyzed_fuels = [
+            {**fuel, 'analysis': scores.analysis(i), 'uncertainty': uncertainty[i]}
+            for i, fuel in enumerate(fuels_data)
+        ]
         
         # Generate natural language recommendation
         recommendation = self.generate_fuel_recommendation(analyzed_fuels, user_priorities)
         
         # Create summary statistics
-        if analyzed_fuels:
-            costs = [f['analysis']['cost_per_unit_inr'] for f in analyzed_fuels if f['analysis']['cost_per_unit_inr']]
-            intensities = [f['analysis']['carbon_intensity'] for f in analyzed_fuels if f['analysis']['carbon_intensity']]
-            
-            summary = {
-                'total_fuels_analyzed': len(analyzed_fuels),
-                'cost_range_inr': {
-                    'min': min(costs) if costs else 0,
-                    'max': max(costs) if costs else 0,
-                    'avg': sum(costs) / len(costs) if costs else 0
-                },
-                'carbon_intensity_range': {
-                    'min': min(intensities) if intensities else 0,
-                    'max': max(intensities) if intensities else 0,
-                    'avg': sum(intensities) / len(intensities) if intensities else 0
-                }
-            }
-        else:
-            summary = {
-                'total_fuels_analyzed': 0,
-                'cost_range_inr': {'min': 0, 'max': 0, 'avg': 0},
-                'carbon_intensity_range': {'min': 0, 'max': 0, 'avg': 0}
-            }
+        summary = scores.summary()
         
         return {
             'analyzed_fuels': analyzed_fuels,
@@ -0,0 +1,320 @@
+"""
+Fuel Price Cache
+Persistent fuel price cache shared across facilities, workers and restarts
+"""
+
+import asyncio
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+CacheKey = Tuple[str, str, str]
+
+
+class FuelPriceCache:
+    """
+    Two-tier (memory + SQLite) price cache keyed by (fuel, region, day)
+
+    Prices depend on the facility's region rather than the facility itself, so
+    every facility in the same state shares one lookup. Entries expire after
+    the TTL or when the UTC day changes, whichever comes first. The SQLite
+    file runs in WAL mode so several workers can share it.
+    """
+
+    def __init__(self, path: str, ttl: timedelta, warm: bool = True):
+        """
+        Initialize the cache
+
+        Args:
+            path: SQLite database file (created if missing)
+            ttl: Maximum age of a cached price
+            warm: Load unexpired entries into memory on startup
+        """
+        self.path = Path(path)
+        self.ttl = ttl
+        self._memory: Dict[CacheKey, Tuple[Dict[str, Any], datetime]] = {}
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.hits = 0
+        self.misses = 0
+
+        self._connect()
+        if warm:
+            self.warm()
+
+    def _connect(self) -> None:
+        """Open the SQLite database, falling back to memory-only on failure"""
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS fuel_prices (
+                    fuel TEXT NOT NULL,
+                    region TEXT NOT NULL,
+                    day TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    fetched_at TEXT NOT NULL,
+                    PRIMARY KEY (fuel, region, day)
+                )
+                """
+            )
+            self._conn.commit()
+        except (sqlite3.Error, OSError) as e:
+            logger.warning(f"Fuel price cache running memory-only ({self.path}): {e}")
+            self._conn = None
+
+    @staticmethod
+    def region_key(location: Dict[str, str]) -> str:
+        """
+        Region used for price sharing (state, else city, else country)
+
+        Args:
+            location: Facility location dict
+
+        Returns:
+            str: Normalized region key
+        """
+        for field in ("state", "city", "country"):
+            value = (location or {}).get(field)
+            if value:
+                return str(value).strip().lower()
+        return "unknown"
+
+    @staticmethod
+    def _day(moment: datetime) -> str:
+        return moment.strftime("%Y-%m-%d")
+
+    def _key(self, fuel_name: str, region: str, now: datetime) -> CacheKey:
+        return (fuel_name.strip().lower(), region, self._day(now))
+
+    def _is_fresh(self, fetched_at: datetime, now: datetime) -> bool:
+        return now - fetched_at < self.ttl
+
+    def get(self, fuel_name: str, location: Dict[str, str], now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached price for a fuel in the location's region
+
+        Args:
+            fuel_name: Fuel name
+            location: Facility location
+            now: Reference time (UTC, defaults to now)
+
+        Returns:
+            Cached cost data with cache metadata, or None on a miss
+        """
+        now = now or datetime.utcnow()
+        key = self._key(fuel_name, self.region_key(location), now)
+
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                entry = self._load(key)
+                if entry is not None:
+                    self._memory[key] = entry
+
+            if entry is not None and not self._is_fresh(entry[1], now):
+                self._memory.pop(key, None)
+                self._delete(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            payload, fetched_at = entry
+            return {
+                **payload,
+                "cache_hit": True,
+                "cached_at": fetched_at.isoformat() + "Z",
+                "expires_at": (fetched_at + self.ttl).isoformat() + "Z",
+            }
+
+    def set(self, fuel_name: str, location: Dict[str, str], cost_data: Dict[str, Any], now: Optional[datetime] = None) -> None:
+        """
+        Store a fetched price for the location's region
+
+        Args:
+            fuel_name: Fuel name
+            location: Facility location
+            cost_data: Cost data returned by the price lookup
+            now: Fetch time (UTC, defaults to now)
+        """
+        now = now or datetime.utcnow()
+        key = self._key(fuel_name, self.region_key(location), now)
+        payload = {k: v for k, v in cost_data.items() if k not in ("cache_hit", "cached_at", "expires_at")}
+
+        with self._lock:
+            self._memory[key] = (payload, now)
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO fuel_prices (fuel, region, day, payload, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (*key, json.dumps(payload, default=str), now.isoformat())
+                )
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Failed to persist cached price for {fuel_name}: {e}")
+
+    async def get_async(self, fuel_name: str, location: Dict[str, str], now: Optional[datetime] = None) -> Optional[Dict[str, Any]]:
+        """
+        get() for async callers: fresh in-memory hits are served directly,
+        anything that may touch SQLite runs on a worker thread
+
+        Args:
+            fuel_name: Fuel name
+            location: Facility location
+            now: Reference time (UTC, defaults to now)
+
+        Returns:
+            Cached cost data with cache metadata, or None on a miss
+        """
+        now = now or datetime.utcnow()
+        key = self._key(fuel_name, self.region_key(location), now)
+        with self._lock:
+            entry = self._memory.get(key)
+            in_memory = entry is not None and self._is_fresh(entry[1], now)
+        if in_memory:
+            return self.get(fuel_name, location, now)
+        return await asyncio.to_thread(self.get, fuel_name, location, now)
+
+    async def set_async(self, fuel_name: str, location: Dict[str, str], cost_data: Dict[str, Any], now: Optional[datetime] = None) -> None:
+        """
+        set() for async callers (the SQLite write runs on a worker thread)
+
+        Args:
+            fuel_name: Fuel name
+            location: Facility location
+            cost_data: Cost data returned by the price lookup
+            now: Fetch time (UTC, defaults to now)
+        """
+        await asyncio.to_thread(self.set, fuel_name, location, cost_data, now)
+
+    def _load(self, key: CacheKey) -> Optional[Tuple[Dict[str, Any], datetime]]:
+        """Read one entry from SQLite (written by this or another worker)"""
+        if self._conn is None:
+            return None
+        try:
+            row = self._conn.execute(
+                "SELECT payload, fetched_at FROM fuel_prices WHERE fuel = ? AND region = ? AND day = ?", key
+            ).fetchone()
+        except sqlite3.Error as e:
+            logger.warning(f"Fuel price cache read failed: {e}")
+            return None
+        if row is None:
+            return None
+        return json.loads(row[0]), datetime.fromisoformat(row[1])
+
+    def _delete(self, key: CacheKey) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute("DELETE FROM fuel_prices WHERE fuel = ? AND region = ? AND day = ?", key)
+            self._conn.commit()
+        except sqlite3.Error as e:
+            logger.warning(f"Fuel price cache delete failed: {e}")
+
+    def warm(self, now: Optional[datetime] = None) -> int:
+        """
+        Load all unexpired entries into memory and drop expired ones
+
+        Args:
+            now: Reference time (UTC, defaults to now)
+
+        Returns:
+            int: Number of entries loaded
+        """
+        if self._conn is None:
+            return 0
+        now = now or datetime.utcnow()
+        self.purge_expired(now)
+        try:
+            rows = self._conn.execute(
+                "SELECT fuel, region, day, payload, fetched_at FROM fuel_prices WHERE day = ?", (self._day(now),)
+            ).fetchall()
+        except sqlite3.Error as e:
+            logger.warning(f"Fuel price cache warm-up failed: {e}")
+            return 0
+
+        with self._lock:
+            for fuel, region, day, payload, fetched_at in rows:
+                self._memory[(fuel, region, day)] = (json.loads(payload), datetime.fromisoformat(fetched_at))
+        logger.info(f"Warmed fuel price cache with {len(rows)} entries from {self.path}")
+        return len(rows)
+
+    def purge_expired(self, now: Optional[datetime] = None) -> int:
+        """
+        Delete entries older than the TTL or from previous days
+
+        Args:
+            now: Reference time (UTC, defaults to now)
+
+        Returns:
+            int: Number of persisted entries removed
+        """
+        now = now or datetime.utcnow()
+        cutoff = (now - self.ttl).isoformat()
+        today = self._day(now)
+        with self._lock:
+            self._memory = {
+                key: entry for key, entry in self._memory.items()
+                if key[2] == today and self._is_fresh(entry[1], now)
+            }
+            if self._conn is None:
+                return 0
+            try:
+                cursor = self._conn.execute(
+                    "DELETE FROM fuel_prices WHERE fetched_at < ? OR day <> ?", (cutoff, today)
+                )
+                self._conn.commit()
+                return cursor.rowcount
+            except sqlite3.Error as e:
+                logger.warning(f"Fuel price cache purge failed: {e}")
+                return 0
+
+    def invalidate(self, location: Optional[Dict[str, str]] = None) -> None:
+        """
+        Drop cached prices for one region (or everything when no location is given)
+
+        Args:
+            location: Facility location whose region should be invalidated
+        """
+        region = self.region_key(location) if location else None
+        with self._lock:
+            self._memory = {
+                key: entry for key, entry in self._memory.items()
+                if region is not None and key[1] != region
+            }
+            if self._conn is None:
+                return
+            try:
+                if region is None:
+                    self._conn.execute("DELETE FROM fuel_prices")
+                else:
+                    self._conn.execute("DELETE FROM fuel_prices WHERE region = ?", (region,))
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"Fuel price cache invalidation failed: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache hit/miss statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries_in_memory": len(self._memory),
+            "ttl_hours": self.ttl.total_seconds() / 3600,
+            "persistent": self._conn is not None,
+            "path": str(self.path),
+        }
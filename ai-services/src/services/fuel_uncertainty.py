@@ -0,0 +1,296 @@
+"""
+Fuel Uncertainty Engine
+Monte Carlo confidence intervals on annual fuel cost and CO2 projections
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from ..config.settings import get_settings
+from ..utils.logger import get_logger
+from .fuel_blend_optimizer import unit_basis
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Relative standard deviation of a price by the confidence level attached to it
+PRICE_SPREAD_BY_CONFIDENCE = {"high": 0.05, "medium": 0.15, "low": 0.30}
+
+# Relative standard deviation of emission factors: library values for
+# conventional fuels, wider for waste-derived fuels of variable composition
+EMISSION_FACTOR_SPREAD = 0.05
+ALTERNATIVE_FUEL_EMISSION_FACTOR_SPREAD = 0.15
+
+
+def price_spread(confidence_level: Optional[str]) -> float:
+    """Relative price spread for a "high"/"medium"/"low" confidence label (unknown = low)"""
+    return PRICE_SPREAD_BY_CONFIDENCE.get(str(confidence_level or "").lower(), PRICE_SPREAD_BY_CONFIDENCE["low"])
+
+
+def _lognormal_parameters(mean: np.ndarray, spread: np.ndarray):
+    """Log-space mu/sigma of a lognormal with the given mean and relative standard deviation"""
+    sigma = np.sqrt(np.log1p(np.square(spread)))
+    with np.errstate(divide="ignore"):
+        mu = np.log(mean) - np.square(sigma) / 2
+    return mu, sigma
+
+
+@dataclass
+class UncertaintyResult:
+    """Simulated annual cost (INR) and CO2 (tCO2e) statistics per fuel"""
+    annual_quantity: np.ndarray
+    cost_mean: np.ndarray
+    cost_low: np.ndarray
+    cost_high: np.ndarray
+    co2_mean: np.ndarray
+    co2_low: np.ndarray
+    co2_high: np.ndarray
+    prob_lowest_cost: np.ndarray
+    prob_lowest_co2: np.ndarray
+    valid: np.ndarray
+    draws: int
+    confidence: float
+
+    def interval(self, i: int) -> Optional[Dict[str, Any]]:
+        """Per-fuel dict view (None for fuels that could not be simulated)"""
+        if not self.valid[i]:
+            return None
+        return {
+            "annual_quantity": round(float(self.annual_quantity[i]), 2),
+            "annual_cost_inr": {
+                "mean": round(float(self.cost_mean[i]), 2),
+                "low": round(float(self.cost_low[i]), 2),
+                "high": round(float(self.cost_high[i]), 2),
+            },
+            "annual_co2_tonnes": {
+                "mean": round(float(self.co2_mean[i]), 2),
+                "low": round(float(self.co2_low[i]), 2),
+                "high": round(float(self.co2_high[i]), 2),
+            },
+            "prob_lowest_cost": round(float(self.prob_lowest_cost[i]), 4),
+            "prob_lowest_co2": round(float(self.prob_lowest_co2[i]), 4),
+            "confidence": self.confidence,
+            "draws": self.draws,
+        }
+
+
+class FuelUncertaintyEngine:
+    """
+    Vectorized Monte Carlo over per-fuel price and emission factor distributions
+
+    Prices and emission factors are drawn from mean-preserving lognormal
+    distributions (relative spreads above) and scaled by the fuel quantity
+    needed to cover the annual heat demand. All fuels are simulated on the
+    same draws, so the probability that a fuel is the cheapest (or cleanest)
+    option is read off directly.
+    """
+
+    def __init__(self, draws: int = settings.uncertainty_draws, confidence: float = 0.9):
+        """
+        Initialize the engine
+
+        Args:
+            draws: Default number of draws per fuel
+            confidence: Default two-sided interval coverage (0.9 = 5th-95th percentile)
+        """
+        self.draws = draws
+        self.confidence = confidence
+
+    def simulate(
+        self,
+        cost: Sequence[float],
+        cost_spread: Sequence[float],
+        emission_factor: Sequence[float],
+        emission_spread: Sequence[float],
+        quantity: Sequence[float],
+        draws: Optional[int] = None,
+        confidence: Optional[float] = None,
+        seed: Optional[int] = None
+    ) -> UncertaintyResult:
+        """
+        Simulate annual cost and CO2 for N fuels
+
+        Args:
+            cost: Mean price per unit (INR)
+            cost_spread: Relative standard deviation of the price
+            emission_factor: Mean emission factor (kgCO2e per unit)
+            emission_spread: Relative standard deviation of the emission factor
+            quantity: Annual quantity (units); fuels without a positive
+                quantity or price are reported as not simulated
+            draws: Draws per fuel (default: engine setting)
+            confidence: Two-sided interval coverage (default: engine setting)
+            seed: Random seed for reproducible results
+
+        Returns:
+            UncertaintyResult: Statistics per fuel, in input order
+        """
+        draws = int(draws or self.draws)
+        confidence = float(confidence or self.confidence)
+        cost = np.asarray(cost, dtype=float)
+        emission_factor = np.asarray(emission_factor, dtype=float)
+        quantity = np.asarray(quantity, dtype=float)
+        n = len(cost)
+
+        valid = (cost > 0) & (quantity > 0) & (emission_factor >= 0) & np.isfinite(cost + quantity + emission_factor)
+        cost_mu, cost_sigma = _lognormal_parameters(np.where(valid, cost, 1.0), np.asarray(cost_spread, dtype=float))
+        co2_mu, co2_sigma = _lognormal_parameters(
+            np.where(valid & (emission_factor > 0), emission_factor, 1.0), np.asarray(emission_spread, dtype=float)
+        )
+        # Annual totals: quantity * price, and quantity * factor / 1000 (tonnes)
+        cost_mu = cost_mu + np.log(np.where(valid, quantity, 1.0))
+        co2_mu = co2_mu + np.log(np.where(valid, quantity, 1.0) / 1000)
+        zero_co2 = emission_factor <= 0
+
+        tail = (1 - confidence) / 2
+        result = {name: np.zeros(n) for name in (
+            "cost_mean", "cost_low", "cost_high", "co2_mean", "co2_low", "co2_high",
+            "prob_lowest_cost", "prob_lowest_co2",
+        )}
+        rng = np.random.default_rng(seed)
+        simulated = np.flatnonzero(valid)
+        if simulated.size:
+            annual_cost = self._draw(rng, cost_mu[simulated], cost_sigma[simulated], draws)
+            annual_co2 = self._draw(rng, co2_mu[simulated], co2_sigma[simulated], draws)
+            annual_co2[zero_co2[simulated]] = 0.0
+
+            # Nearest-rank percentile positions of the interval bounds
+            low_rank = int(np.floor(tail * (draws - 1)))
+            high_rank = int(np.ceil((1 - tail) * (draws - 1)))
+            for prefix, values in (("cost", annual_cost), ("co2", annual_co2)):
+                # Share of draws in which each fuel is the lowest option
+                wins = np.bincount(values.argmin(axis=0), minlength=simulated.size)
+                result[f"prob_lowest_{prefix}"][simulated] = wins / draws
+                result[f"{prefix}_mean"][simulated] = values.mean(axis=1, dtype=np.float64)
+                # In-place selection (draw alignment across fuels is no longer needed)
+                values.partition((low_rank, high_rank), axis=1)
+                result[f"{prefix}_low"][simulated] = values[:, low_rank]
+                result[f"{prefix}_high"][simulated] = values[:, high_rank]
+
+        return UncertaintyResult(
+            annual_quantity=np.where(valid, quantity, 0.0),
+            valid=valid,
+            draws=draws,
+            confidence=confidence,
+            **result
+        )
+
+    @staticmethod
+    def _draw(rng: np.random.Generator, mu: np.ndarray, sigma: np.ndarray, size: int) -> np.ndarray:
+        """fuels x size lognormal draws (float32 halves the memory of 100k x N samples)"""
+        values = rng.standard_normal((len(mu), size), dtype=np.float32)
+        values *= sigma[:, None].astype(np.float32)
+        values += mu[:, None].astype(np.float32)
+        return np.exp(values, out=values)
+
+    def analyze_fuels(
+        self,
+        fuels: List[Dict[str, Any]],
+        cost_key: str = "cost_inr",
+        annual_heat_demand_gj: Optional[float] = None,
+        costs: Optional[Sequence[float]] = None,
+        confidence_levels: Optional[Sequence[Optional[str]]] = None,
+        draws: Optional[int] = None,
+        confidence: Optional[float] = None,
+        seed: Optional[int] = None
+    ) -> List[Optional[Dict[str, Any]]]:
+        """
+        Confidence intervals for fuel dicts, each fuel covering the full annual heat demand
+
+        Quantities are in each fuel's own unit (reported as quantity_unit);
+        fuels whose heat content, emission factor and price refer to different
+        units are not simulated.
+
+        Args:
+            fuels: Fuel dicts (emission_factor, heat_content in GJ per unit,
+                is_alternative_fuel, cost_confidence, unit)
+            cost_key: Key of the price per unit in the fuel dicts
+            annual_heat_demand_gj: Heat demand to project for (default: setting)
+            costs: Prices per unit overriding cost_key
+            confidence_levels: Price confidence labels overriding cost_confidence
+            draws: Draws per fuel
+            confidence: Two-sided interval coverage
+            seed: Random seed
+
+        Returns:
+            List of per-fuel intervals (None where price or heat content is missing)
+        """
+        demand = annual_heat_demand_gj or settings.annual_heat_demand_gj
+        if costs is None:
+            costs = [fuel.get(cost_key) for fuel in fuels]
+        if confidence_levels is None:
+            confidence_levels = [fuel.get("cost_confidence") for fuel in fuels]
+
+        units = [_quantity_unit(fuel) for fuel in fuels]
+        heat = np.array([
+            _float(fuel.get("heat_content")) if unit is not None else np.nan
+            for fuel, unit in zip(fuels, units)
+        ])
+        quantity = np.where(heat > 0, demand / np.where(heat > 0, heat, 1.0), 0.0)
+        emission_spread = [
+            ALTERNATIVE_FUEL_EMISSION_FACTOR_SPREAD if fuel.get("is_alternative_fuel") else EMISSION_FACTOR_SPREAD
+            for fuel in fuels
+        ]
+        result = self.simulate(
+            cost=[_float(value) for value in costs],
+            cost_spread=[price_spread(level) for level in confidence_levels],
+            emission_factor=[_float(fuel.get("emission_factor")) for fuel in fuels],
+            emission_spread=emission_spread,
+            quantity=quantity,
+            draws=draws,
+            confidence=confidence,
+            seed=seed
+        )
+
+        intervals = []
+        for i in range(len(fuels)):
+            interval = result.interval(i)
+            if interval is not None:
+                interval["quantity_unit"] = units[i]
+                interval["annual_heat_demand_gj"] = demand
+                interval["price_spread"] = price_spread(confidence_levels[i])
+                interval["emission_factor_spread"] = emission_spread[i]
+            intervals.append(interval)
+        return intervals
+
+    async def analyze_fuels_async(self, fuels: List[Dict[str, Any]], **kwargs) -> List[Optional[Dict[str, Any]]]:
+        """analyze_fuels on a worker thread, keeping the draws off the event loop"""
+        return await asyncio.to_thread(self.analyze_fuels, fuels, **kwargs)
+
+
+def _quantity_unit(fuel: Dict[str, Any]) -> Optional[str]:
+    """
+    Unit a fuel's per-unit values refer to, or None when they disagree
+    (e.g. heat content per kg but price per L)
+    """
+    bases = {
+        unit_basis(fuel.get(key))
+        for key in ("unit", "heat_content_unit", "emission_factor_unit", "cost_unit")
+        if fuel.get(key)
+    }
+    if len(bases) > 1:
+        return None
+    return bases.pop() if bases else ""
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# Global uncertainty engine instance
+fuel_uncertainty_engine = FuelUncertaintyEngine()
+
+
+async def get_fuel_uncertainty_engine() -> FuelUncertaintyEngine:
+    """
+    Get fuel uncertainty engine instance
+
+    Returns:
+        FuelUncertaintyEngine: Engine instance
+    """
+    return fuel_uncertainty_engine
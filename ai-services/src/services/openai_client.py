@@ -5,17 +5,29 @@ Handles low-level OpenAI API interactions
 
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Any
+from typing import Any, AsyncIterator, Awaitable, Dict, List, Optional, Union
 
 from openai import AsyncOpenAI
 
 from ..config.settings import get_settings
 from ..utils.logger import get_logger
+from ..utils.rate_limiter import AsyncRateLimiter
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 
+def _usage(usage: Any) -> Dict[str, int]:
+    """Token usage of a response (empty when not reported)"""
+    if not usage:
+        return {}
+    return {
+        "prompt_tokens": usage.prompt_tokens,
+        "completion_tokens": usage.completion_tokens,
+        "total_tokens": usage.total_tokens
+    }
+
+
 class OpenAIClient:
     """
     Generic OpenAI API client for chat completions
@@ -27,6 +39,10 @@ class OpenAIClient:
         self.model = "gpt-4"  # Force GPT-4 usage
         self.max_tokens = 4000  # Increase tokens for GPT-4
         self.temperature = settings.openai_temperature
+        self.rate_limiter = AsyncRateLimiter(
+            requests_per_minute=settings.openai_requests_per_minute,
+            max_concurrent=settings.openai_max_concurrent_requests
+        )
         self._initialize_client()
         
     def _initialize_client(self):
@@ -45,6 +61,119 @@ class OpenAIClient:
             logger.error(f"Failed to initialize OpenAI client: {e}")
             self.client = None
 
+    def complete(
+        self,
+        prompt: Optional[str] = None,
+        *,
+        messages: Optional[List[Dict[str, str]]] = None,
+        system: Optional[str] = None,
+        stream: bool = False,
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        **kwargs
+    ) -> Union[Awaitable[Dict[str, Any]], "CompletionStream"]:
+        """
+        Create a completion from a prompt or a message list, buffered or streamed
+        
+        Buffered calls are awaited and return the result envelope; they never
+        raise on API errors (success is False and error is set). Streamed
+        calls return a CompletionStream to iterate with `async for`, which
+        yields content deltas and holds the envelope in `result` afterwards.
+        
+        Result envelope: success, completion, response (same text, the
+        chat_completion key), model, usage, finish_reason, streamed,
+        timestamp, error.
+        
+        Args:
+            prompt: User prompt (alternative to messages)
+            messages: List of message dictionaries
+            system: Optional system message placed before the prompt
+            stream: Stream content deltas instead of waiting for the full text
+            model: Optional model override
+            max_tokens: Optional max tokens override
+            temperature: Optional temperature override
+            **kwargs: Additional OpenAI parameters (e.g. response_format)
+            
+        Returns:
+            Awaitable result envelope, or a CompletionStream when stream is True
+        """
+        request = self._build_request(prompt, messages, system, model, max_tokens, temperature, kwargs)
+        if stream:
+            return CompletionStream(self, request)
+        return self._complete(request)
+    
+    def _build_request(
+        self,
+        prompt: Optional[str],
+        messages: Optional[List[Dict[str, str]]],
+        system: Optional[str],
+        model: Optional[str],
+        max_tokens: Optional[int],
+        temperature: Optional[float],
+        options: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Chat completion request parameters shared by buffered and streamed calls"""
+        if (prompt is None) == (messages is None):
+            raise ValueError("Provide exactly one of prompt or messages")
+        if messages is None:
+            messages = [{"role": "user", "content": prompt}]
+        if system is not None:
+            messages = [{"role": "system", "content": system}, *messages]
+        
+        return {
+            "model": model or self.model,
+            "messages": messages,
+            "max_tokens": max_tokens or self.max_tokens,
+            "temperature": self.temperature if temperature is None else temperature,
+            "presence_penalty": options.pop('presence_penalty', 0.1),
+            "frequency_penalty": options.pop('frequency_penalty', 0.1),
+            **options
+        }
+    
+    async def _complete(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Buffered completion returning the result envelope"""
+        if not self.client:
+            return self._envelope(request["model"], error="OpenAI client not available")
+        
+        try:
+            async with self.rate_limiter:
+                response = await self.client.chat.completions.create(**request)
+            
+            choice = response.choices[0]
+            return self._envelope(
+                request["model"],
+                completion=(choice.message.content or "").strip(),
+                usage=_usage(response.usage),
+                finish_reason=choice.finish_reason
+            )
+            
+        except Exception as e:
+            logger.error(f"OpenAI API error: {e}")
+            return self._envelope(request["model"], error=f"OpenAI API call failed: {str(e)}")
+    
+    @staticmethod
+    def _envelope(
+        model: str,
+        completion: str = "",
+        usage: Optional[Dict[str, int]] = None,
+        finish_reason: Optional[str] = None,
+        streamed: bool = False,
+        error: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Standard completion result envelope"""
+        return {
+            "success": error is None,
+            "completion": completion,
+            "response": completion,
+            "model": model,
+            "usage": usage or {},
+            "finish_reason": finish_reason,
+            "streamed": streamed,
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "error": error
+        }
+    
     async def chat_completion(
         self, 
         messages: List[Dict[str, str]], 
@@ -54,7 +183,7 @@ class OpenAIClient:
         **kwargs
     ) -> Dict[str, Any]:
         """
-        Create a chat completion using OpenAI API
+        Create a chat completion, raising on failure (see complete)
         
         Args:
             messages: List of message dictionaries
@@ -66,40 +195,49 @@ class OpenAIClient:
         Returns:
             Dict containing response data
         """
-        if not self.client:
-            raise Exception("OpenAI client not available")
+        result = await self.complete(
+            messages=messages, model=model, max_tokens=max_tokens, temperature=temperature, **kwargs
+        )
+        if not result["success"]:
+            raise Exception(result["error"])
+        return result
+    
+    async def stream_chat_completion(
+        self,
+        messages: List[Dict[str, str]],
+        model: Optional[str] = None,
+        max_tokens: Optional[int] = None,
+        temperature: Optional[float] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion, yielding content deltas as they arrive (see complete)
         
-        try:
-            response = await self.client.chat.completions.create(
-                model=model or self.model,
-                messages=messages,
-                max_tokens=max_tokens or self.max_tokens,
-                temperature=temperature or self.temperature,
-                presence_penalty=kwargs.get('presence_penalty', 0.1),
-                frequency_penalty=kwargs.get('frequency_penalty', 0.1),
-                **{k: v for k, v in kwargs.items() if k not in ['presence_penalty', 'frequency_penalty']}
-            )
-            
-            ai_response = response.choices[0].message.content.strip()
-            
-            # Extract usage information
-            usage = {
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens
-            } if response.usage else {}
-            
-            return {
-                "response": ai_response,
-                "model": model or self.model,
-                "usage": usage,
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "success": True
-            }
+        Args:
+            messages: List of message dictionaries
+            model: Optional model override
+            max_tokens: Optional max tokens override
+            temperature: Optional temperature override
+            **kwargs: Additional OpenAI parameters (e.g. response_format)
             
-        except Exception as e:
-            logger.error(f"OpenAI API error: {e}")
-            raise Exception(f"OpenAI API call failed: {str(e)}")
+        Yields:
+            str: Content fragments in generation order
+        """
+        async for delta in self.complete(
+            messages=messages, stream=True, model=model, max_tokens=max_tokens, temperature=temperature, **kwargs
+        ):
+            yield delta
+    
+    def json_response_format(self) -> Dict[str, Any]:
+        """
+        Get request kwargs enabling JSON mode when configured for the model
+        
+        Returns:
+            Dict of extra completion kwargs (empty when JSON mode is disabled)
+        """
+        if settings.openai_json_mode:
+            return {"response_format": {"type": "json_object"}}
+        return {}
     
     async def validate_api_key(self) -> bool:
         """
@@ -149,6 +287,60 @@ class OpenAIClient:
         }
 
 
+class CompletionStream:
+    """
+    Streamed completion returned by OpenAIClient.complete(stream=True)
+    
+    Iterating yields content deltas; afterwards `result` holds the standard
+    result envelope with the full text. Errors are recorded in `result` and
+    raised, since part of the text may already have been consumed.
+    """
+    
+    def __init__(self, client: OpenAIClient, request: Dict[str, Any]):
+        self._client = client
+        self._request = request
+        self.result: Optional[Dict[str, Any]] = None
+    
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self._iterate()
+    
+    async def _iterate(self) -> AsyncIterator[str]:
+        model = self._request["model"]
+        parts: List[str] = []
+        finish_reason = None
+        usage: Dict[str, int] = {}
+        
+        if not self._client.client:
+            self.result = self._client._envelope(model, streamed=True, error="OpenAI client not available")
+            raise Exception("OpenAI client not available")
+        
+        try:
+            # The concurrency slot is held until the stream is consumed
+            async with self._client.rate_limiter:
+                stream = await self._client.client.chat.completions.create(**self._request, stream=True)
+                
+                async for chunk in stream:
+                    usage = _usage(getattr(chunk, "usage", None)) or usage
+                    if not chunk.choices:
+                        continue
+                    choice = chunk.choices[0]
+                    finish_reason = choice.finish_reason or finish_reason
+                    delta = choice.delta.content
+                    if delta:
+                        parts.append(delta)
+                        yield delta
+                    
+        except Exception as e:
+            logger.error(f"OpenAI streaming API error: {e}")
+            self.result = self._client._envelope(
+                model, "".join(parts), usage, finish_reason, streamed=True,
+                error=f"OpenAI streaming API call failed: {str(e)}"
+            )
+            raise Exception(self.result["error"])
+        
+        self.result = self._client._envelope(model, "".join(parts).strip(), usage, finish_reason, streamed=True)
+
+
 # Global client instance
 openai_client = OpenAIClient()
 
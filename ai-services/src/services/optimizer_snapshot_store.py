@@ -0,0 +1,163 @@
+"""
+Optimizer Snapshot Store
+TTL cache of initialized fuel optimizer state (enhanced fuel table + ranges)
+"""
+
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from ..config.settings import get_settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+@dataclass
+class OptimizerSnapshot:
+    """Initialized optimizer state for one facility"""
+    snapshot_id: str
+    facility_id: str
+    fuels: List[Dict[str, Any]]
+    dynamic_ranges: Dict[str, Dict[str, Any]]
+    last_updated: str
+    created_at: datetime
+    expires_at: datetime
+    hits: int = 0
+    extras: Dict[str, Any] = field(default_factory=dict)
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return (now or datetime.utcnow()) >= self.expires_at
+
+
+class OptimizerSnapshotStore:
+    """
+    In-memory snapshot store with TTL expiry and an LRU size bound
+
+    Slider-driven /optimize calls look up the snapshot instead of
+    re-fetching facility data and re-pricing fuels on every request.
+    """
+
+    def __init__(self, ttl: timedelta, max_snapshots: int = 256):
+        """
+        Initialize the store
+
+        Args:
+            ttl: Snapshot lifetime
+            max_snapshots: Maximum snapshots kept (least recently used are evicted)
+        """
+        self.ttl = ttl
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, OptimizerSnapshot]" = OrderedDict()
+        self._latest_by_facility: Dict[str, str] = {}
+
+    def create(
+        self,
+        facility_id: str,
+        fuels: List[Dict[str, Any]],
+        dynamic_ranges: Dict[str, Dict[str, Any]],
+        last_updated: str,
+        **extras: Any
+    ) -> OptimizerSnapshot:
+        """
+        Store a newly initialized optimizer state
+
+        Args:
+            facility_id: Facility ID
+            fuels: Enhanced fuel table
+            dynamic_ranges: Slider ranges
+            last_updated: Timestamp of the underlying price data
+            **extras: Additional data kept with the snapshot
+
+        Returns:
+            OptimizerSnapshot: The stored snapshot
+        """
+        now = datetime.utcnow()
+        snapshot = OptimizerSnapshot(
+            snapshot_id=uuid.uuid4().hex,
+            facility_id=facility_id,
+            fuels=fuels,
+            dynamic_ranges=dynamic_ranges,
+            last_updated=last_updated,
+            created_at=now,
+            expires_at=now + self.ttl,
+            extras=extras
+        )
+        self._snapshots[snapshot.snapshot_id] = snapshot
+        self._latest_by_facility[facility_id] = snapshot.snapshot_id
+        self._evict(now)
+        return snapshot
+
+    def get(self, snapshot_id: str) -> Optional[OptimizerSnapshot]:
+        """
+        Get a live snapshot by ID
+
+        Args:
+            snapshot_id: Snapshot ID
+
+        Returns:
+            The snapshot, or None if unknown or expired
+        """
+        snapshot = self._snapshots.get(snapshot_id)
+        if snapshot is None:
+            return None
+        if snapshot.is_expired():
+            self._remove(snapshot_id)
+            return None
+        self._snapshots.move_to_end(snapshot_id)
+        snapshot.hits += 1
+        return snapshot
+
+    def latest_for_facility(self, facility_id: str) -> Optional[OptimizerSnapshot]:
+        """
+        Get the most recent live snapshot of a facility
+
+        Args:
+            facility_id: Facility ID
+
+        Returns:
+            The snapshot, or None if there is no live snapshot
+        """
+        snapshot_id = self._latest_by_facility.get(facility_id)
+        return self.get(snapshot_id) if snapshot_id else None
+
+    def invalidate_facility(self, facility_id: str) -> None:
+        """
+        Drop the latest snapshot of a facility (e.g. after its prices were refreshed)
+
+        Args:
+            facility_id: Facility ID
+        """
+        snapshot_id = self._latest_by_facility.get(facility_id)
+        if snapshot_id:
+            self._remove(snapshot_id)
+
+    def _remove(self, snapshot_id: str) -> None:
+        snapshot = self._snapshots.pop(snapshot_id, None)
+        if snapshot and self._latest_by_facility.get(snapshot.facility_id) == snapshot_id:
+            del self._latest_by_facility[snapshot.facility_id]
+
+    def _evict(self, now: datetime) -> None:
+        """Drop expired snapshots, then the least recently used beyond the size bound"""
+        for snapshot_id in [sid for sid, snap in self._snapshots.items() if snap.is_expired(now)]:
+            self._remove(snapshot_id)
+        while len(self._snapshots) > self.max_snapshots:
+            self._remove(next(iter(self._snapshots)))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Store statistics"""
+        return {
+            "snapshots": len(self._snapshots),
+            "facilities": len(self._latest_by_facility),
+            "ttl_minutes": self.ttl.total_seconds() / 60,
+            "max_snapshots": self.max_snapshots,
+        }
+
+
+# Global store instance
+optimizer_snapshot_store = OptimizerSnapshotStore(
+    ttl=timedelta(minutes=settings.optimizer_snapshot_ttl_minutes)
+)
@@ -0,0 +1,227 @@
+"""
+Smart Analysis Cache
+Reuse of AI fuel analyses across nearly identical slider criteria
+"""
+
+import asyncio
+import hashlib
+import json
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from ..config.settings import get_settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+
+def quantize(value: float, bucket: float) -> int:
+    """Bucket number of a value (bucket <= 0 disables quantization)"""
+    if bucket <= 0:
+        return hash(float(value))
+    return int(round(float(value) / bucket))
+
+
+@dataclass
+class SmartAnalysisEntry:
+    """Analysis text cached for one (facility, fuel set, criteria bucket) key"""
+    key: str
+    analysis: str
+    criteria: Dict[str, float]  # exact criteria the text was written for
+    source: str  # "ai" or "fallback"
+    created_at: datetime
+    expires_at: datetime
+    hits: int = 0
+
+    def is_expired(self, now: Optional[datetime] = None) -> bool:
+        return (now or datetime.utcnow()) >= self.expires_at
+
+
+class SmartAnalysisCache:
+    """
+    In-memory analysis cache with TTL expiry, an LRU size bound and
+    coalesced generation
+
+    Keys combine the facility, the top fuel set and the criteria quantized
+    into buckets, so slider positions a few paise apart share one analysis.
+    At most one generation task runs per key; later requests for the same key
+    wait on (or skip) that task instead of issuing another LLM call.
+
+    Entries and tasks live in process memory: with several uvicorn workers
+    an analysis_key is only known to the worker that generated it, so the
+    service is meant to run with a single worker (or sticky routing) for
+    GET /smart-fuel-analysis/recommendations/{analysis_key} to find it.
+    """
+
+    def __init__(
+        self,
+        ttl: timedelta,
+        buckets: Dict[str, float],
+        max_entries: int = 512
+    ):
+        """
+        Initialize the cache
+
+        Args:
+            ttl: Entry lifetime
+            buckets: Bucket width per criterion (e.g. {"target_cost": 0.25})
+            max_entries: Maximum entries kept (least recently used are evicted)
+        """
+        self.ttl = ttl
+        self.buckets = buckets
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, SmartAnalysisEntry]" = OrderedDict()
+        self._pending: Dict[str, asyncio.Task] = {}
+        self._stats = {"hits": 0, "misses": 0, "generations": 0, "refinements": 0}
+
+    def make_key(self, facility_id: str, fuel_names: Sequence[str], criteria: Dict[str, float]) -> str:
+        """
+        Cache key of a request
+
+        Args:
+            facility_id: Facility ID
+            fuel_names: Fuels the analysis covers (order-insensitive)
+            criteria: Exact criteria values
+
+        Returns:
+            str: Hex digest of the facility, fuel set and bucketed criteria
+        """
+        bucketed = {name: quantize(value, self.buckets.get(name, 0)) for name, value in sorted(criteria.items())}
+        payload = json.dumps([facility_id, sorted(fuel_names), bucketed], separators=(",", ":"))
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def get(self, key: str) -> Optional[SmartAnalysisEntry]:
+        """
+        Get a live entry
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The entry, or None if unknown or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry.is_expired():
+            if entry is not None:
+                del self._entries[key]
+            self._stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        entry.hits += 1
+        self._stats["hits"] += 1
+        return entry
+
+    def put(self, key: str, analysis: str, criteria: Dict[str, float], source: str = "ai") -> SmartAnalysisEntry:
+        """
+        Store an analysis
+
+        Args:
+            key: Cache key
+            analysis: Analysis text
+            criteria: Exact criteria the text was written for
+            source: "ai" or "fallback"
+
+        Returns:
+            SmartAnalysisEntry: The stored entry
+        """
+        now = datetime.utcnow()
+        entry = SmartAnalysisEntry(
+            key=key,
+            analysis=analysis,
+            criteria=dict(criteria),
+            source=source,
+            created_at=now,
+            expires_at=now + self.ttl
+        )
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        self._evict(now)
+        return entry
+
+    def is_pending(self, key: str) -> bool:
+        """Whether a generation task is running for the key"""
+        return self.pending_task(key) is not None
+
+    def pending_task(self, key: str) -> Optional[asyncio.Task]:
+        """The running generation task of the key, if any"""
+        task = self._pending.get(key)
+        return task if task is not None and not task.done() else None
+
+    def generate(
+        self,
+        key: str,
+        criteria: Dict[str, float],
+        generator: Callable[[], Awaitable[Dict[str, str]]],
+        refinement: bool = False
+    ) -> asyncio.Task:
+        """
+        Start (or join) the generation task of a key
+
+        The generator returns {"analysis": ..., "source": "ai" | "fallback"};
+        its result is stored under the key when it completes.
+
+        Args:
+            key: Cache key
+            criteria: Exact criteria passed to the generator
+            generator: Coroutine factory producing the analysis
+            refinement: Whether this regenerates an existing entry for new exact criteria
+
+        Returns:
+            asyncio.Task: The running task for the key
+        """
+        task = self._pending.get(key)
+        if task is not None and not task.done():
+            return task
+
+        async def run() -> SmartAnalysisEntry:
+            try:
+                result = await generator()
+                return self.put(key, result["analysis"], criteria, result.get("source", "ai"))
+            finally:
+                self._pending.pop(key, None)
+
+        self._stats["refinements" if refinement else "generations"] += 1
+        task = asyncio.create_task(run(), name=f"smart-analysis-{key[:8]}")
+        task.add_done_callback(self._log_failure)
+        self._pending[key] = task
+        return task
+
+    @staticmethod
+    def _log_failure(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Smart analysis generation failed: {task.exception()}")
+
+    def _evict(self, now: datetime) -> None:
+        """Drop expired entries, then the least recently used beyond the size bound"""
+        for key in [key for key, entry in self._entries.items() if entry.is_expired(now)]:
+            del self._entries[key]
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            "pending": sum(1 for task in self._pending.values() if not task.done()),
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "buckets": self.buckets,
+            "ttl_minutes": self.ttl.total_seconds() / 60,
+            "max_entries": self.max_entries,
+        }
+
+
+# Global cache instance
+smart_analysis_cache = SmartAnalysisCache(
+    ttl=timedelta(minutes=settings.smart_analysis_cache_ttl_minutes),
+    buckets={
+        "target_cost": settings.smart_analysis_cost_bucket,
+        "target_emission": settings.smart_analysis_emission_bucket,
+        "target_energy": settings.smart_analysis_energy_bucket,
+        "tolerance": 1,
+    }
+)
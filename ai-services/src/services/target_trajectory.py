@@ -0,0 +1,407 @@
+"""
+Target Trajectory Engine
+Required reduction rates, pathways and on-track status of sustainability targets
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config.settings import get_settings
+from ..utils.logger import get_logger
+
+logger = get_logger(__name__)
+settings = get_settings()
+
+# Share of the baseline-to-target change a target may lag its linear
+# pathway by and still be reported "at_risk" rather than "off_track"
+AT_RISK_TOLERANCE = 0.05
+
+# Monthly points needed before a trend projection is reported
+MIN_TREND_MONTHS = 6
+
+# Trailing window (months) the current value is measured over
+CURRENT_WINDOW_MONTHS = 12
+
+
+def target_metric(target: Dict[str, Any]) -> Tuple[Optional[str], float]:
+    """
+    Series metric a target is measured against, from its unit and type
+
+    Args:
+        target: Target dict (unit, targetType)
+
+    Returns:
+        (metric, scale): metric is "emissions" (tCO2e/yr), "emission_intensity"
+        (kgCO2e/t), "energy" (GJ/yr), "energy_intensity" (GJ/t), "production"
+        (t/yr) or None when the data series cannot measure it; scale converts
+        the metric into the target's unit
+    """
+    unit = str(target.get("unit") or "").strip().lower()
+    target_type = str(target.get("targetType") or target.get("target_type") or "").lower()
+    per_unit = "/" in unit or " per " in unit
+
+    if "co2" in unit:
+        if per_unit:
+            return "emission_intensity", 0.001 if unit.startswith(("t", "mt")) else 1.0
+        return "emissions", 1000.0 if unit.startswith("kg") else 1.0
+    if unit.startswith(("gj", "mj")):
+        scale = 1000.0 if unit.startswith("mj") else 1.0
+        return ("energy_intensity" if per_unit else "energy"), scale
+    if "production" in target_type and unit.startswith(("t", "mt")):
+        return "production", 1.0
+    return None, 1.0
+
+
+class SeriesMetrics:
+    """
+    Current values and trends of the target metrics from monthly series
+
+    Emission rows carry total_emissions (kgCO2e) and total_energy (GJ) per
+    resource and month; production rows carry cement_production (t). Rows of
+    the same month are summed.
+    """
+
+    def __init__(self, emissions: List[Dict[str, Any]], production: List[Dict[str, Any]]):
+        months, emission_kg, energy_gj = _monthly(emissions, ("total_emissions", "total_energy"))
+        production_months, cement_t = _monthly(production, ("cement_production",))
+        self.values: Dict[str, Optional[float]] = {}
+        self.trends: Dict[str, Optional[float]] = {}  # change per year
+        self.as_of: Optional[int] = None  # month index (year * 12 + month - 1)
+
+        last = max([m[-1] for m in (months, production_months) if len(m)], default=None)
+        if last is None:
+            return
+        self.as_of = int(last)
+
+        # Align both series on one month axis
+        axis = np.union1d(months, production_months)
+        emission_kg = _align(axis, months, emission_kg)
+        energy_gj = _align(axis, months, energy_gj)
+        cement_t = _align(axis, production_months, cement_t)
+
+        window = axis > last - CURRENT_WINDOW_MONTHS
+        monthly = {
+            "emissions": emission_kg / 1000 * 12,  # annualized tCO2e
+            "energy": energy_gj * 12,
+            "production": cement_t * 12,
+        }
+        with np.errstate(divide="ignore", invalid="ignore"):
+            monthly["emission_intensity"] = np.where(cement_t > 0, emission_kg / cement_t, np.nan)
+            monthly["energy_intensity"] = np.where(cement_t > 0, energy_gj / cement_t, np.nan)
+
+        for metric, values in monthly.items():
+            valid = np.isfinite(values) & (values > 0)
+            current = valid & window
+            if not current.any():
+                self.values[metric] = None
+                self.trends[metric] = None
+                continue
+            if metric.endswith("intensity"):
+                # Production-weighted over the window, not the mean of monthly ratios
+                numerator = emission_kg if metric == "emission_intensity" else energy_gj
+                self.values[metric] = float(numerator[current].sum() / cement_t[current].sum())
+            else:
+                self.values[metric] = float(values[current].mean())
+            self.trends[metric] = (
+                float(np.polyfit(axis[valid] / 12, values[valid], 1)[0])
+                if valid.sum() >= MIN_TREND_MONTHS else None
+            )
+
+    @property
+    def as_of_year(self) -> Optional[float]:
+        """Fractional year at the end of the last month with data"""
+        return None if self.as_of is None else (self.as_of + 1) / 12
+
+    @property
+    def as_of_label(self) -> Optional[str]:
+        return None if self.as_of is None else f"{self.as_of // 12}-{self.as_of % 12 + 1:02d}"
+
+
+def _monthly(rows: List[Dict[str, Any]], fields: Tuple[str, ...]):
+    """Sorted month indexes and per-field monthly sums"""
+    keys, columns = [], [[] for _ in fields]
+    for row in rows or []:
+        try:
+            key = int(row["year"]) * 12 + int(row["month"]) - 1
+        except (KeyError, TypeError, ValueError):
+            continue
+        keys.append(key)
+        for column, field in zip(columns, fields):
+            column.append(_float(row.get(field)))
+    if not keys:
+        return (np.array([], dtype=np.int64), *(np.array([]) for _ in fields))
+    months, inverse = np.unique(np.array(keys, dtype=np.int64), return_inverse=True)
+    sums = [np.bincount(inverse, weights=np.nan_to_num(np.array(column)), minlength=len(months)) for column in columns]
+    return (months, *sums)
+
+
+def _align(axis: np.ndarray, months: np.ndarray, values: np.ndarray) -> np.ndarray:
+    aligned = np.zeros(len(axis))
+    aligned[np.searchsorted(axis, months)] = values
+    return aligned
+
+
+def _float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _round(value: float, digits: int = 4) -> Optional[float]:
+    return round(float(value), digits) if np.isfinite(value) else None
+
+
+def _year(value: float) -> Optional[int]:
+    return int(value) if np.isfinite(value) else None
+
+
+class TargetTrajectoryEngine:
+    """
+    Deterministic trajectory facts for all targets of an organization
+
+    Every target is evaluated in one vectorized pass: required annual change
+    (linear and compound) from the baseline and from the current value,
+    progress, gap to target and to the linear pathway, a trend projection,
+    on-track status and yearly pathway milestones. Results are cached per
+    data version, a digest of the targets and series they were computed from.
+    """
+
+    def __init__(self, ttl: timedelta, max_entries: int = 256):
+        """
+        Initialize the engine
+
+        Args:
+            ttl: Lifetime of a cached evaluation
+            max_entries: Maximum cached evaluations (least recently used are evicted)
+        """
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[datetime, List[Dict[str, Any]]]]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def data_version(
+        targets: List[Dict[str, Any]],
+        emissions: List[Dict[str, Any]],
+        production: List[Dict[str, Any]],
+        series_scope: Optional[str]
+    ) -> str:
+        """Digest of everything an evaluation depends on"""
+        payload = json.dumps(
+            [targets, emissions or [], production or [], series_scope, datetime.utcnow().strftime("%Y-%m")],
+            sort_keys=True, separators=(",", ":"), default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:32]
+
+    def evaluate(
+        self,
+        targets: List[Dict[str, Any]],
+        emissions: Optional[List[Dict[str, Any]]] = None,
+        production: Optional[List[Dict[str, Any]]] = None,
+        series_scope: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Trajectory facts per target (cached per data version)
+
+        Args:
+            targets: Targets as returned by the backend (baselineValue,
+                targetValue, baselineYear, targetYear, unit, facility, ...);
+                a target may carry an explicit currentValue
+            emissions: Monthly emission rows of the series scope
+            production: Monthly production rows of the series scope
+            series_scope: Facility ID the series belong to (None = whole
+                organization); targets of another scope are only measured
+                from an explicit currentValue
+
+        Returns:
+            List of trajectory dicts, in target order
+        """
+        key = self.data_version(targets, emissions, production, series_scope)
+        now = datetime.utcnow()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry[1]
+
+        self._stats["misses"] += 1
+        result = self._evaluate(targets, SeriesMetrics(emissions or [], production or []), series_scope)
+        self._entries[key] = (now + self.ttl, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return result
+
+    def _evaluate(
+        self,
+        targets: List[Dict[str, Any]],
+        series: SeriesMetrics,
+        series_scope: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        n = len(targets)
+        if n == 0:
+            return []
+
+        baseline = np.array([_float(t.get("baselineValue")) for t in targets])
+        goal = np.array([_float(t.get("targetValue")) for t in targets])
+        start = np.array([_float(t.get("baselineYear")) for t in targets])
+        end = np.array([_float(t.get("targetYear")) for t in targets])
+
+        # Current values: explicit, else measured from the series when scopes match
+        metrics, scales, current, source = [], np.ones(n), np.full(n, np.nan), [None] * n
+        for i, target in enumerate(targets):
+            metric, scales[i] = target_metric(target)
+            metrics.append(metric)
+            explicit = _float(target.get("currentValue"))
+            facility_id = (target.get("facility") or {}).get("id") or target.get("facility_id")
+            if np.isfinite(explicit):
+                current[i], source[i] = explicit, "provided"
+            elif metric and facility_id == series_scope and series.values.get(metric) is not None:
+                current[i], source[i] = series.values[metric] * scales[i], "series"
+
+        now_year = datetime.utcnow().year + (datetime.utcnow().month - 1) / 12
+        as_of = np.where(
+            np.array([s == "series" for s in source]), series.as_of_year or now_year, now_year
+        )
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            horizon = end - start
+            change = goal - baseline
+            decreasing = change < 0
+            sign = np.where(decreasing, -1.0, 1.0)
+
+            # Required change per year from the baseline
+            linear_rate = change / horizon
+            compound_ok = (baseline > 0) & (goal > 0)
+            compound_rate = np.where(compound_ok, np.power(goal / baseline, 1 / horizon) - 1, np.nan)
+
+            # Where the pathways say the metric should be now
+            elapsed = np.clip(as_of - start, 0, horizon)
+            expected_linear = baseline + linear_rate * elapsed
+            expected_compound = np.where(compound_ok, baseline * np.power(1 + compound_rate, elapsed), np.nan)
+
+            # Required change per year from the current value
+            years_left = end - as_of
+            remaining_linear = np.where(years_left > 0, (goal - current) / years_left, np.nan)
+            remaining_compound = np.where(
+                (years_left > 0) & compound_ok & (current > 0),
+                np.power(goal / current, 1 / years_left) - 1, np.nan
+            )
+
+            progress = np.where(change != 0, (current - baseline) / change, np.nan)
+            gap_to_target = current - goal
+            gap_to_pathway = current - expected_linear  # positive = behind for reductions
+
+            trend = np.array([
+                series.trends.get(m) if s == "series" and m else np.nan for m, s in zip(metrics, source)
+            ], dtype=float) * scales
+            projected = current + trend * np.maximum(years_left, 0)
+
+        # Status: behind the linear pathway by more than the tolerance is off track
+        lag = sign * (expected_linear - current)  # > 0 when behind
+        tolerance = AT_RISK_TOLERANCE * np.abs(change)
+        achieved = sign * (current - goal) >= 0
+        status = np.select(
+            [
+                ~np.isfinite(current),
+                achieved,
+                years_left <= 0,
+                lag <= 0,
+                lag <= tolerance,
+            ],
+            ["no_data", "achieved", "overdue", "on_track", "at_risk"],
+            default="off_track"
+        )
+
+        # Yearly milestones of both pathways, as one (targets x years) matrix
+        valid_horizon = np.isfinite(horizon) & (horizon > 0)
+        steps = np.arange(int(np.nanmax(np.where(valid_horizon, horizon, 0))) + 1)
+        with np.errstate(invalid="ignore"):
+            years = start[:, None] + steps[None, :]
+            linear_path = baseline[:, None] + linear_rate[:, None] * steps[None, :]
+            compound_path = baseline[:, None] * np.power(1 + compound_rate[:, None], steps[None, :])
+        in_range = steps[None, :] <= horizon[:, None]
+        # Rounded once for the whole matrix; NaN (no compound pathway) becomes None
+        linear_path = np.round(linear_path, 4).astype(object)
+        compound_path = np.round(compound_path, 4).astype(object)
+        compound_path[~np.isfinite(compound_path.astype(float))] = None
+
+        results = []
+        for i, target in enumerate(targets):
+            valid = bool(valid_horizon[i]) and np.isfinite(baseline[i]) and np.isfinite(goal[i])
+            has_current = np.isfinite(current[i])
+            results.append({
+                "target_id": target.get("id"),
+                "name": target.get("name"),
+                "unit": target.get("unit"),
+                "metric": metrics[i],
+                "facility_id": (target.get("facility") or {}).get("id") or target.get("facility_id"),
+                "direction": "decrease" if decreasing[i] else "increase",
+                "baseline": {"value": _round(baseline[i]), "year": _year(start[i])},
+                "target": {"value": _round(goal[i]), "year": _year(end[i])},
+                "current": {
+                    "value": _round(current[i]),
+                    "as_of": series.as_of_label if source[i] == "series" else None,
+                    "source": source[i],
+                } if has_current else None,
+                "required_annual_change": {
+                    "linear": _round(linear_rate[i]),
+                    "compound_pct": _round(compound_rate[i] * 100, 2),
+                },
+                "remaining_annual_change": {
+                    "years_left": _round(years_left[i], 2),
+                    "linear": _round(remaining_linear[i]),
+                    "compound_pct": _round(remaining_compound[i] * 100, 2),
+                } if has_current else None,
+                "progress_pct": _round(progress[i] * 100, 1),
+                "gap_to_target": _round(gap_to_target[i]),
+                "expected_now": {
+                    "linear": _round(expected_linear[i]),
+                    "compound": _round(expected_compound[i]),
+                },
+                "gap_to_pathway": _round(gap_to_pathway[i]),
+                "projected_at_target_year": _round(projected[i]),
+                "status": target.get("status") if target.get("status") in ("achieved", "cancelled") else (
+                    str(status[i]) if valid else "invalid"
+                ),
+                "pathway": [
+                    {"year": int(year), "linear": linear, "compound": compound}
+                    for year, linear, compound in zip(
+                        years[i, in_range[i]], linear_path[i, in_range[i]], compound_path[i, in_range[i]]
+                    )
+                ] if valid else [],
+            })
+        return results
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Cache statistics"""
+        lookups = self._stats["hits"] + self._stats["misses"]
+        return {
+            "entries": len(self._entries),
+            **self._stats,
+            "hit_rate": round(self._stats["hits"] / lookups, 3) if lookups else 0.0,
+            "ttl_minutes": self.ttl.total_seconds() / 60,
+            "max_entries": self.max_entries,
+        }
+
+
+# Global engine instance
+target_trajectory_engine = TargetTrajectoryEngine(
+    ttl=timedelta(minutes=settings.target_trajectory_cache_ttl_minutes)
+)
+
+
+async def get_target_trajectory_engine() -> TargetTrajectoryEngine:
+    """
+    Get target trajectory engine instance
+
+    Returns:
+        TargetTrajectoryEngine: Engine instance
+    """
+    return target_trajectory_engine
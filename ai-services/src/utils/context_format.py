@@ -0,0 +1,135 @@
+"""
+Compact tabular encoding helpers for AI prompt context
+"""
+
+import math
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+# Supported prompt context formats
+VERBOSE = "verbose"
+COMPACT = "compact"
+CONTEXT_FORMATS = (VERBOSE, COMPACT)
+
+# Unit normalization table: source unit -> (normalized unit, multiplier)
+UNIT_NORMALIZATION = {
+    "kgco2e": ("tCO2e", 0.001),
+    "kgco2": ("tCO2", 0.001),
+    "mj": ("GJ", 0.001),
+    "kwh": ("MWh", 0.001),
+    "kg": ("t", 0.001),
+}
+
+
+def validate_context_format(context_format: Optional[str]) -> str:
+    """
+    Validate and normalize a context format name
+
+    Args:
+        context_format: Requested format (None means verbose)
+
+    Returns:
+        str: Normalized format name
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    normalized = (context_format or VERBOSE).strip().lower()
+    if normalized not in CONTEXT_FORMATS:
+        raise ValueError(
+            f"Unsupported context format '{context_format}'. "
+            f"Expected one of: {', '.join(CONTEXT_FORMATS)}"
+        )
+    return normalized
+
+
+def to_number(value: Any) -> Optional[float]:
+    """Convert a payload value to float, returning None for missing/invalid values"""
+    if value is None or isinstance(value, bool):
+        return None
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def round_sig(value: Any, sig_figs: int = 3) -> str:
+    """
+    Render a number rounded to significant figures without thousands separators
+
+    Args:
+        value: Number (or numeric string) to render
+        sig_figs: Significant figures to keep
+
+    Returns:
+        str: Compact numeric string, or empty string for missing values
+    """
+    number = to_number(value)
+    if number is None:
+        return ""
+    if number == 0:
+        return "0"
+
+    magnitude = math.floor(math.log10(abs(number)))
+    decimals = sig_figs - 1 - magnitude
+    rounded = round(number, decimals)
+
+    if decimals <= 0:
+        return str(int(rounded))
+    return f"{rounded:.{decimals}f}".rstrip("0").rstrip(".")
+
+
+def normalize_unit(value: Any, unit: Optional[str]) -> Tuple[Optional[float], str]:
+    """
+    Normalize small base units to larger ones (kgCO2e -> tCO2e, MJ -> GJ, ...)
+
+    Args:
+        value: Numeric value in the source unit
+        unit: Source unit string
+
+    Returns:
+        Tuple of (converted value, normalized unit)
+    """
+    number = to_number(value)
+    unit = unit or ""
+    normalized = UNIT_NORMALIZATION.get(unit.strip().lower())
+    if normalized is None or number is None:
+        return number, unit
+    target_unit, multiplier = normalized
+    return number * multiplier, target_unit
+
+
+def month_key(record: dict) -> str:
+    """Render a month/year pair as a sortable YYYY-MM key"""
+    year = record.get("year")
+    month = record.get("month")
+    try:
+        return f"{int(year):04d}-{int(month):02d}"
+    except (TypeError, ValueError):
+        return f"{year or 'N/A'}-{month or 'N/A'}"
+
+
+def _escape_cell(cell: Any) -> str:
+    """Escape a single CSV cell (quote only when needed)"""
+    text = "" if cell is None else str(cell)
+    if any(ch in text for ch in (",", '"', "\n")):
+        text = '"' + text.replace('"', '""').replace("\n", " ") + '"'
+    return text
+
+
+def render_table(title: str, header: Sequence[str], rows: Iterable[Sequence[Any]]) -> List[str]:
+    """
+    Render rows as a titled CSV-like table with a header row
+
+    Args:
+        title: Section title line
+        header: Column names
+        rows: Row values (already rounded/formatted)
+
+    Returns:
+        List[str]: Lines of the rendered table (empty if there are no rows)
+    """
+    body = [",".join(_escape_cell(cell) for cell in row) for row in rows]
+    if not body:
+        return []
+    return [title, ",".join(header), *body]
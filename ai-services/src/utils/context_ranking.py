@@ -0,0 +1,290 @@
+"""
+Relevance ranking for AI prompt context selection
+
+Prompt builders can only show a handful of resources, targets, facilities and
+emission factors. Instead of keeping the first N items, each candidate is scored
+from the signals that matter for the answer (emissions share, recency, question
+relevance, target proximity) and the top items under the budget are kept.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .context_format import to_number
+
+# Signal weights per item type (each signal is normalized to 0..1)
+RESOURCE_WEIGHTS = {"emissions_share": 0.55, "recency": 0.2, "relevance": 0.25}
+TARGET_WEIGHTS = {"target_proximity": 0.45, "relevance": 0.35, "active": 0.2}
+FACILITY_WEIGHTS = {"relevance": 0.6, "capacity_share": 0.4}
+EMISSION_FACTOR_WEIGHTS = {"relevance": 0.35, "availability": 0.25, "regional": 0.2, "low_carbon": 0.2}
+
+# Years-to-deadline at which target proximity decays to 0.5
+TARGET_PROXIMITY_HALF_LIFE_YEARS = 5
+
+STOPWORDS = {
+    "the", "and", "for", "are", "our", "my", "what", "which", "how", "with", "this", "that",
+    "from", "have", "has", "can", "should", "could", "would", "about", "show", "tell", "give",
+    "me", "we", "you", "your", "is", "of", "to", "in", "on", "a", "an", "do", "does", "any",
+    "all", "current", "facility", "facilities", "please",
+}
+
+
+def question_terms(question: Optional[str]) -> Set[str]:
+    """
+    Tokenize a question (or focus area list) into lowercase search terms
+
+    Args:
+        question: Free text question
+
+    Returns:
+        Set[str]: Meaningful terms (stopwords and short tokens removed)
+    """
+    if not question:
+        return set()
+    tokens = re.findall(r"[a-z0-9]+", question.lower())
+    return {token for token in tokens if len(token) > 2 and token not in STOPWORDS}
+
+
+def relevance(terms: Set[str], *fields: Any) -> float:
+    """Fraction of question terms that appear in the given item fields (0..1)"""
+    if not terms:
+        return 0.0
+    haystack = " ".join(str(field) for field in fields if field).lower().replace("_", " ")
+    if not haystack:
+        return 0.0
+    hits = sum(1 for term in terms if term in haystack)
+    return hits / len(terms)
+
+
+def select_top(
+    items: Sequence[Any],
+    scorer: Callable[[Any], float],
+    limit: int
+) -> Tuple[List[Any], int]:
+    """
+    Keep the highest scoring items under a count budget
+
+    Ties keep their original order, so with no signals the result matches
+    the previous "first N" behaviour.
+
+    Args:
+        items: Candidate items
+        scorer: Function returning a relevance score for an item
+        limit: Maximum number of items to keep
+
+    Returns:
+        Tuple of (selected items in rank order, number of omitted items)
+    """
+    if limit <= 0 or not items:
+        return [], len(items)
+    scored = sorted(
+        ((scorer(item), index, item) for index, item in enumerate(items)),
+        key=lambda entry: (-entry[0], entry[1])
+    )
+    selected = [item for _, _, item in scored[:limit]]
+    return selected, max(0, len(items) - limit)
+
+
+def _weighted(signals: Dict[str, float], weights: Dict[str, float]) -> float:
+    """Combine normalized signals with the given weights"""
+    return sum(weights[name] * signals.get(name, 0.0) for name in weights)
+
+
+def _month_index(record: Dict[str, Any]) -> Optional[int]:
+    """Convert a record's year/month into a monotonically increasing month index"""
+    try:
+        return int(record.get("year")) * 12 + int(record.get("month"))
+    except (TypeError, ValueError):
+        return None
+
+
+def _latest_consumption(resource: Dict[str, Any]) -> Dict[str, Any]:
+    """Most recent consumption record of a configured resource"""
+    recent = resource.get("recentConsumption") or []
+    return recent[0] if recent else {}
+
+
+def rank_resources(
+    resources: Sequence[Dict[str, Any]],
+    question: Optional[str] = None,
+    limit: int = 5
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Rank configured facility resources by emissions share, recency and question relevance
+
+    Args:
+        resources: Facility resources (with "resource" and "recentConsumption")
+        question: Optional user question / focus text
+        limit: Maximum resources to keep
+
+    Returns:
+        Tuple of (selected resources, number omitted)
+    """
+    terms = question_terms(question)
+    latest = [_latest_consumption(resource) for resource in resources]
+    emissions = [max(0.0, to_number(record.get("total_emissions")) or 0.0) for record in latest]
+    total_emissions = sum(emissions)
+    month_indexes = [_month_index(record) for record in latest if record]
+    newest = max((index for index in month_indexes if index is not None), default=None)
+
+    signals_by_id = {}
+    for resource, record, emission in zip(resources, latest, emissions):
+        info = resource.get("resource", {})
+        month_index = _month_index(record) if record else None
+        recency = 0.0
+        if month_index is not None and newest is not None:
+            recency = 0.5 ** ((newest - month_index) / 3)  # Halves every 3 months of staleness
+        signals_by_id[id(resource)] = {
+            "emissions_share": emission / total_emissions if total_emissions > 0 else 0.0,
+            "recency": recency,
+            "relevance": relevance(terms, info.get("name"), info.get("category"), info.get("type"), info.get("scope")),
+        }
+
+    return select_top(resources, lambda item: _weighted(signals_by_id[id(item)], RESOURCE_WEIGHTS), limit)
+
+
+def target_proximity(target_year: Any, current_year: Optional[int] = None) -> float:
+    """
+    Score how close a target deadline is (1.0 = due now or overdue, decays with distance)
+
+    Args:
+        target_year: Target year
+        current_year: Reference year (defaults to this year)
+
+    Returns:
+        float: Proximity score 0..1
+    """
+    year = to_number(target_year)
+    if year is None:
+        return 0.0
+    current_year = current_year or datetime.utcnow().year
+    years_left = max(0.0, year - current_year)
+    return 0.5 ** (years_left / TARGET_PROXIMITY_HALF_LIFE_YEARS)
+
+
+def rank_targets(
+    targets: Sequence[Dict[str, Any]],
+    question: Optional[str] = None,
+    limit: int = 10,
+    current_year: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Rank sustainability targets by deadline proximity, question relevance and status
+
+    Accepts both camelCase (targets API) and snake_case (AI analysis API) payloads.
+
+    Args:
+        targets: Sustainability targets
+        question: Optional user question / focus text
+        limit: Maximum targets to keep
+        current_year: Reference year for proximity
+
+    Returns:
+        Tuple of (selected targets, number omitted)
+    """
+    terms = question_terms(question)
+
+    def score(target: Dict[str, Any]) -> float:
+        target_type = target.get("targetType") or target.get("target_type")
+        signals = {
+            "target_proximity": target_proximity(
+                target.get("targetYear") or target.get("target_year"), current_year
+            ),
+            "relevance": relevance(terms, target.get("name"), target_type, target.get("description"), target.get("unit")),
+            "active": 1.0 if str(target.get("status", "active")).lower() == "active" else 0.0,
+        }
+        return _weighted(signals, TARGET_WEIGHTS)
+
+    return select_top(targets, score, limit)
+
+
+def rank_facilities(
+    facilities: Sequence[Dict[str, Any]],
+    question: Optional[str] = None,
+    limit: int = 5
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Rank organization facilities by question relevance and production capacity share
+
+    Args:
+        facilities: Organization facilities
+        question: Optional user question
+        limit: Maximum facilities to keep
+
+    Returns:
+        Tuple of (selected facilities, number omitted)
+    """
+    terms = question_terms(question)
+    capacities = [
+        max(0.0, to_number(facility.get("annual_production_capacity_tons")) or 0.0)
+        for facility in facilities
+    ]
+    max_capacity = max(capacities, default=0.0)
+    capacity_by_id = {id(facility): capacity for facility, capacity in zip(facilities, capacities)}
+
+    def score(facility: Dict[str, Any]) -> float:
+        location = facility.get("location") or {}
+        if not isinstance(location, dict):
+            location = {"text": location}
+        signals = {
+            "relevance": relevance(
+                terms, facility.get("name"), facility.get("facility_type"), *location.values()
+            ),
+            "capacity_share": capacity_by_id[id(facility)] / max_capacity if max_capacity > 0 else 0.0,
+        }
+        return _weighted(signals, FACILITY_WEIGHTS)
+
+    return select_top(facilities, score, limit)
+
+
+def rank_emission_factors(
+    factors: Sequence[Dict[str, Any]],
+    question: Optional[str] = None,
+    limit: int = 3,
+    region: Optional[str] = None
+) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    Rank alternative emission factors by relevance, availability, regional fit and carbon
+
+    Args:
+        factors: Emission factors from the inventory (one scope/category group)
+        question: Optional question / focus area text
+        limit: Maximum factors to keep
+        region: Facility country used for regional availability
+
+    Returns:
+        Tuple of (selected factors, number omitted)
+    """
+    terms = question_terms(question)
+    values = [max(0.0, to_number(factor.get("emissionFactor")) or 0.0) for factor in factors]
+    max_value = max(values, default=0.0)
+    value_by_id = {id(factor): value for factor, value in zip(factors, values)}
+    region = (region or "").lower()
+
+    def score(factor: Dict[str, Any]) -> float:
+        resource = factor.get("resource", {})
+        library_region = str((factor.get("library") or {}).get("region") or "Global").lower()
+        if library_region == "india" or (region and region in library_region):
+            regional = 1.0
+        elif library_region == "global":
+            regional = 0.5
+        else:
+            regional = 0.0
+        availability = to_number(factor.get("availabilityScore")) or 0.0
+        signals = {
+            "relevance": relevance(terms, resource.get("name"), resource.get("category"), resource.get("scope")),
+            "availability": min(1.0, max(0.0, availability / 100)),
+            "regional": regional,
+            "low_carbon": 1 - value_by_id[id(factor)] / max_value if max_value > 0 else 0.0,
+        }
+        return _weighted(signals, EMISSION_FACTOR_WEIGHTS)
+
+    return select_top(factors, score, limit)
+
+
+def focus_text(focus_areas: Optional[Iterable[str]]) -> Optional[str]:
+    """Join focus areas into a pseudo-question used for relevance scoring"""
+    if not focus_areas:
+        return None
+    return " ".join(focus_areas)
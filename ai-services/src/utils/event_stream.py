@@ -0,0 +1,23 @@
+"""
+Wire encodings of streamed API events
+
+Events are dicts of the form {"event": <name>, "data": <JSON-serializable>}.
+"""
+
+import json
+from typing import Any, AsyncIterator, Dict
+
+STREAM_FORMATS = ("ndjson", "sse")
+
+
+async def encode_ndjson(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Encode stream events as newline-delimited JSON"""
+    async for event in events:
+        yield json.dumps(event, ensure_ascii=False, default=str) + "\n"
+
+
+async def encode_sse(events: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Encode stream events as Server-Sent Events"""
+    async for event in events:
+        data = json.dumps(event["data"], ensure_ascii=False, default=str)
+        yield f"event: {event['event']}\ndata: {data}\n\n"
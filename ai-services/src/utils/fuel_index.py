@@ -0,0 +1,171 @@
+"""
+Multi-dimensional range index over fuel tables
+
+Answers box (±tolerance) queries and normalized nearest-neighbour queries over
+numeric fuel columns (cost, emission factor, heat content, ...). Each column
+is kept sorted, so a box query is a binary search on the most selective
+column plus a vectorized check of the remaining columns on those candidates.
+"""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+DEFAULT_COLUMNS = ("dynamic_cost", "emission_factor", "heat_content")
+
+
+@dataclass
+class IndexQueryResult:
+    """Rows matched by a query together with their normalized distances"""
+    indices: np.ndarray
+    distances: np.ndarray
+    mode: str  # "box" (within tolerance) or "nearest" (k closest rows)
+    tolerance: float
+
+
+def _to_float(value: Any) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+class FuelRangeIndex:
+    """
+    Immutable index over a list of fuel rows
+
+    Build once per fuel table (e.g. per optimizer snapshot) and query many
+    times. Rows with a missing value never match a box query on that column
+    and are ranked last by nearest-neighbour queries.
+    """
+
+    def __init__(
+        self,
+        rows: Sequence[Dict[str, Any]],
+        columns: Sequence[str] = DEFAULT_COLUMNS,
+        scales: Optional[Sequence[float]] = None
+    ):
+        """
+        Build the index
+
+        Args:
+            rows: Fuel rows (dicts); query results are positions in this sequence
+            columns: Numeric row keys to index
+            scales: Per-column normalization for distances (defaults to the
+                column's largest absolute value)
+        """
+        self.columns = tuple(columns)
+        self.size = len(rows)
+        self.values = np.array(
+            [[_to_float(row.get(column)) for column in self.columns] for row in rows],
+            dtype=float
+        ).reshape(self.size, len(self.columns))
+
+        # Sorted positions and values per column (NaNs sort to the end and are excluded)
+        self._order = np.argsort(self.values, axis=0, kind="stable")
+        self._sorted = np.take_along_axis(self.values, self._order, axis=0)
+        self._valid_counts = np.count_nonzero(~np.isnan(self.values), axis=0)
+
+        if scales is None:
+            with np.errstate(all="ignore"):
+                scales = np.nanmax(np.abs(self.values), axis=0) if self.size else np.ones(len(self.columns))
+        scales = np.asarray(scales, dtype=float)
+        self.scales = np.where(np.isfinite(scales) & (scales > 0), scales, 1.0)
+
+    def box(self, lows: Sequence[float], highs: Sequence[float]) -> np.ndarray:
+        """
+        Positions of rows with lows[i] <= column_i <= highs[i] on every column
+
+        Args:
+            lows: Inclusive lower bounds per column
+            highs: Inclusive upper bounds per column
+
+        Returns:
+            np.ndarray: Matching row positions in ascending order
+        """
+        if self.size == 0:
+            return np.empty(0, dtype=int)
+        lows = np.asarray(lows, dtype=float)
+        highs = np.asarray(highs, dtype=float)
+
+        # Binary search each column; start from the narrowest candidate range
+        spans = []
+        for column in range(len(self.columns)):
+            valid = self._sorted[:self._valid_counts[column], column]
+            start = np.searchsorted(valid, lows[column], side="left")
+            stop = np.searchsorted(valid, highs[column], side="right")
+            spans.append((max(0, stop - start), column, start, stop))
+        count, column, start, stop = min(spans)
+        if count == 0:
+            return np.empty(0, dtype=int)
+
+        candidates = self._order[start:stop, column]
+        values = self.values[candidates]
+        inside = np.all((values >= lows) & (values <= highs), axis=1)
+        return np.sort(candidates[inside])
+
+    def distances(self, target: Sequence[float], positions: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Normalized L1 distance from target (sum over columns of |value - target| / scale)
+
+        Args:
+            target: Target value per column
+            positions: Rows to measure (all rows by default)
+
+        Returns:
+            np.ndarray: Distances (inf for rows with missing values)
+        """
+        values = self.values if positions is None else self.values[positions]
+        diff = np.abs(values - np.asarray(target, dtype=float)) / self.scales
+        return np.where(np.isnan(diff).any(axis=1), np.inf, np.nansum(diff, axis=1))
+
+    def nearest(self, target: Sequence[float], k: int) -> IndexQueryResult:
+        """
+        The k rows closest to target by normalized L1 distance
+
+        Args:
+            target: Target value per column
+            k: Number of rows to return
+
+        Returns:
+            IndexQueryResult: Rows ordered by increasing distance
+        """
+        k = min(k, self.size)
+        if k <= 0:
+            return IndexQueryResult(np.empty(0, dtype=int), np.empty(0), "nearest", 0.0)
+        distances = self.distances(target)
+        top = np.argpartition(distances, k - 1)[:k] if k < self.size else np.arange(self.size)
+        top = top[np.lexsort((top, distances[top]))]
+        return IndexQueryResult(top, distances[top], "nearest", 0.0)
+
+    def query(
+        self,
+        target: Sequence[float],
+        tolerance: float,
+        fallback_tolerances: Sequence[float] = (),
+        k: int = 3
+    ) -> IndexQueryResult:
+        """
+        Box query at ±tolerance around target, widening through the fallback
+        tolerances, then falling back to the k nearest rows
+
+        Args:
+            target: Target value per column
+            tolerance: Relative tolerance (0.1 = ±10%)
+            fallback_tolerances: Wider tolerances tried in order when nothing matches
+            k: Rows returned by the nearest-neighbour fallback
+
+        Returns:
+            IndexQueryResult: Matches with their normalized distances
+        """
+        target = np.asarray(target, dtype=float)
+        tried = tolerance
+        for tried in (tolerance, *fallback_tolerances):
+            bounds = np.sort(np.stack([target * (1 - tried), target * (1 + tried)]), axis=0)
+            positions = self.box(bounds[0], bounds[1])
+            if positions.size:
+                return IndexQueryResult(positions, self.distances(target, positions), "box", tried)
+        result = self.nearest(target, k)
+        result.tolerance = tried
+        return result
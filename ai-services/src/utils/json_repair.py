@@ -0,0 +1,375 @@
+"""
+Tolerant JSON parsing for LLM output
+
+A single-pass state machine that rewrites almost-JSON into valid JSON in
+linear time. It handles the mistakes models typically make:
+
+- preamble text and markdown code fences around the document
+- trailing, doubled and missing commas (also between "key": "value" members)
+- unquoted keys and bare-word string values
+- single-quoted strings (apostrophes inside double-quoted text are kept)
+- unescaped quotes and raw control characters inside strings
+- // and /* */ comments, Python literals (True/False/None)
+- truncated output (open strings, dangling keys and unclosed containers)
+"""
+
+import json
+import re
+from typing import Any, List, Optional, Tuple
+
+# Characters that may legitimately follow a closing quote
+_STRING_TERMINATORS = ",:}]"
+_VALID_ESCAPES = '"\\/bfnrtu'
+_CONTROL_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t", "\b": "\\b", "\f": "\\f"}
+_LITERALS = {
+    "true": "true", "false": "false", "null": "null",
+    "True": "true", "False": "false", "None": "null",
+    "NaN": "null", "Infinity": "null", "undefined": "null",
+}
+_NUMBER_RE = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][+-]?\d+)?")
+_NUMBER_START = set("0123456789+-.")
+_NUMBER_CHARS = set("0123456789+-.eE")
+_HEX4_RE = re.compile(r"[0-9a-fA-F]{4}")
+_WORD_CHARS = re.compile(r"[A-Za-z0-9_$\-]")
+_WORD = re.compile(r"[A-Za-z0-9_$\-]*")
+_BARE_TEXT = re.compile(r"[^,}\]\n]*")
+_WHITESPACE = re.compile(r"\s+")
+_SPECIAL_IN_STRING = {
+    '"': re.compile(r'["\\\x00-\x1f]'),
+    "'": re.compile(r'[\'"\\\x00-\x1f]'),
+}
+
+# Per-container parser states
+_KEY, _COLON, _VALUE, _COMMA = "key", "colon", "value", "comma"
+
+
+class JSONRepairError(ValueError):
+    """Raised when no JSON document can be recovered from the text"""
+
+
+def parse_json_tolerant(text: str) -> Any:
+    """
+    Parse model output as JSON, repairing it only when strict parsing fails
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        Any: Decoded JSON value
+
+    Raises:
+        JSONRepairError: If the text contains no recoverable JSON document
+    """
+    try:
+        return json.loads(text)
+    except (json.JSONDecodeError, TypeError):
+        pass
+    repaired = repair_json(text)
+    try:
+        return json.loads(repaired)
+    except json.JSONDecodeError as e:
+        raise JSONRepairError(f"Could not repair JSON: {e}") from e
+
+
+def repair_json(text: str) -> str:
+    """
+    Rewrite almost-JSON text into a valid JSON document
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        str: Repaired JSON text of the first top-level object or array
+
+    Raises:
+        JSONRepairError: If the text contains no object or array
+    """
+    return _JsonRepairer(text or "").run()
+
+
+class _JsonRepairer:
+    """Single-pass JSON rewriter (see module docstring)"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.length = len(text)
+        self.out: List[str] = []
+        self.stack: List[str] = []
+        self.states: List[str] = []
+        self.pending_comma = False
+        self.item_mark = 0
+
+    def run(self) -> str:
+        start = self._document_start()
+        if start is None:
+            raise JSONRepairError("No JSON object or array found in text")
+
+        i = start
+        while i < self.length and (self.stack or not self.out):
+            char = self.text[i]
+            if char.isspace():
+                i = _WHITESPACE.match(self.text, i).end()
+            elif char == "/" and self.text[i + 1:i + 2] in ("/", "*"):
+                i = self._skip_comment(i)
+            elif char in "}]":
+                i = self._close(i, char)
+            elif char == ",":
+                if self.stack and self.states[-1] == _COMMA:
+                    self.states[-1] = _KEY if self.stack[-1] == "{" else _VALUE
+                    self.pending_comma = True
+                i += 1
+            elif char == ":":
+                if self.stack and self.states[-1] == _COLON:
+                    self.out.append(":")
+                    self.states[-1] = _VALUE
+                i += 1
+            else:
+                i = self._item(i, char)
+
+        self._finalize()
+        return "".join(self.out)
+
+    def _document_start(self) -> Optional[int]:
+        """Index of the first object/array opener (skips preamble and fences)"""
+        positions = [pos for pos in (self.text.find("{"), self.text.find("[")) if pos != -1]
+        return min(positions) if positions else None
+
+    def _skip_comment(self, i: int) -> int:
+        if self.text[i + 1] == "/":
+            end = self.text.find("\n", i)
+            return self.length if end == -1 else end + 1
+        end = self.text.find("*/", i + 2)
+        return self.length if end == -1 else end + 2
+
+    def _begin_item(self) -> None:
+        """Emit a deferred comma before the next key or value"""
+        self.item_mark = len(self.out)
+        if self.pending_comma:
+            self.out.append(",")
+            self.pending_comma = False
+
+    def _close(self, i: int, char: str) -> int:
+        if not self.stack:
+            return i + 1
+        opener = "{" if char == "}" else "["
+        if self.stack[-1] != opener:
+            # Mismatched closer: close the inner container first if the
+            # matching one is open further out, otherwise drop the character
+            if opener in self.stack:
+                self._close_top()
+                return i
+            return i + 1
+        self._close_top()
+        return i + 1
+
+    def _close_top(self) -> None:
+        state = self.states[-1]
+        if state == _COLON:
+            self.out.append(":null")
+        elif state == _VALUE and self.stack[-1] == "{" and self.out[-1] == ":":
+            self.out.append("null")
+        self.pending_comma = False
+        self.out.append("}" if self.stack.pop() == "{" else "]")
+        self.states.pop()
+
+    def _item(self, i: int, char: str) -> int:
+        if not self.stack:
+            # Top-level opener
+            self.out.append(char)
+            self.stack.append(char)
+            self.states.append(_KEY if char == "{" else _VALUE)
+            return i + 1
+
+        if self.states[-1] == _COMMA:
+            # Missing comma between two items
+            self.states[-1] = _KEY if self.stack[-1] == "{" else _VALUE
+            self.pending_comma = True
+
+        if self.states[-1] == _KEY:
+            return self._key(i, char)
+        if self.states[-1] == _COLON:
+            # Missing colon after a key
+            self.out.append(":")
+            self.states[-1] = _VALUE
+        return self._value(i, char)
+
+    def _key(self, i: int, char: str) -> int:
+        if char in "\"'":
+            self._begin_item()
+            literal, i, closed = self._string(i, char)
+            if not closed:
+                # Truncated inside a key: drop the partial member
+                del self.out[self.item_mark:]
+                return i
+            self.out.append(literal)
+        elif _WORD_CHARS.match(char):
+            self._begin_item()
+            end = _WORD.match(self.text, i).end()
+            self.out.append(json.dumps(self.text[i:end]))
+            i = end
+        else:
+            return i + 1
+        self.states[-1] = _COLON
+        return i
+
+    def _value(self, i: int, char: str) -> int:
+        if char in "{[":
+            self._begin_item()
+            self.out.append(char)
+            self.states[-1] = _COMMA
+            self.stack.append(char)
+            self.states.append(_KEY if char == "{" else _VALUE)
+            return i + 1
+
+        if char in "\"'":
+            self._begin_item()
+            literal, i, _ = self._string(i, char)
+            self.out.append(literal)
+        elif char in _NUMBER_START:
+            self._begin_item()
+            end = i
+            while end < self.length and self.text[end] in _NUMBER_CHARS:
+                end += 1
+            unit = end
+            while unit < self.length and self.text[unit] in " \t":
+                unit += 1
+            if unit < self.length and (self.text[unit].isalpha() or self.text[unit] == "%"):
+                # Number with a unit (e.g. 15% or 12 kg): keep it as text
+                i = self._bare_text(i)
+            else:
+                self.out.append(self._number(self.text[i:end]))
+                i = end
+        elif _WORD_CHARS.match(char):
+            self._begin_item()
+            i = self._bare_word(i)
+        else:
+            return i + 1
+        self.states[-1] = _COMMA
+        return i
+
+    def _string(self, i: int, quote: str) -> Tuple[str, int, bool]:
+        """
+        Read a string starting at an opening quote
+
+        Returns:
+            Tuple of (JSON string literal, index after the string, closed flag)
+        """
+        text = self.text
+        special = _SPECIAL_IN_STRING[quote]
+        parts = ['"']
+        start = i = i + 1
+        while True:
+            # Jump straight to the next character that needs attention
+            match = special.search(text, i)
+            if match is None:
+                i = self.length
+                break
+            i = match.start()
+            char = text[i]
+            if char == "\\":
+                parts.append(text[start:i])
+                escaped = text[i + 1:i + 2]
+                if escaped == "u" and not _HEX4_RE.fullmatch(text[i + 2:i + 6]):
+                    parts.append("\\\\u")
+                elif escaped and escaped in _VALID_ESCAPES:
+                    parts.append("\\" + escaped)
+                elif escaped == "'":
+                    parts.append("'")
+                elif escaped:
+                    # Unknown escape: keep the backslash as a literal character
+                    parts.append("\\\\" + (_CONTROL_ESCAPES.get(escaped) or escaped))
+                i += 2
+                start = i
+            elif char == quote:
+                if self._ends_string(i + 1):
+                    parts.append(text[start:i])
+                    parts.append('"')
+                    return "".join(parts), i + 1, True
+                # Quote used inside the text
+                parts.append(text[start:i])
+                parts.append('\\"' if quote == '"' else "'")
+                i += 1
+                start = i
+            elif char == '"' or char in _CONTROL_ESCAPES or char < " ":
+                parts.append(text[start:i])
+                if char == '"':
+                    parts.append('\\"')
+                else:
+                    parts.append(_CONTROL_ESCAPES.get(char) or f"\\u{ord(char):04x}")
+                i += 1
+                start = i
+        # Truncated: close the string
+        parts.append(text[start:i])
+        parts.append('"')
+        return "".join(parts), i, False
+
+    def _ends_string(self, i: int) -> bool:
+        """Whether a quote followed by position i really closes the string"""
+        while i < self.length and self.text[i] in " \t\r":
+            i += 1
+        if i >= self.length or self.text[i] in _STRING_TERMINATORS:
+            return True
+        if self.text[i] == "\n":
+            # A newline after a quote normally ends a value in pretty JSON
+            return True
+        if self.text[i] not in "\"'":
+            return False
+        # Another string right after the quote: the next array item, or (missing
+        # comma between members) the next key if a colon follows it
+        return self.stack[-1] == "[" or self._key_follows(i)
+
+    def _key_follows(self, i: int) -> bool:
+        """Whether a quoted key and its colon start at position i (on the same line)"""
+        end = self.text.find(self.text[i], i + 1)
+        if end == -1 or "\n" in self.text[i + 1:end]:
+            return False
+        end += 1
+        while end < self.length and self.text[end] in " \t":
+            end += 1
+        return end < self.length and self.text[end] == ":"
+
+    def _number(self, token: str) -> str:
+        candidate = token.lstrip("+")
+        if candidate.startswith("."):
+            candidate = "0" + candidate
+        elif candidate.startswith("-."):
+            candidate = "-0" + candidate[1:]
+        candidate = candidate.rstrip(".eE+-")
+        match = _NUMBER_RE.fullmatch(candidate)
+        if match:
+            return candidate
+        try:
+            return json.dumps(float(candidate))
+        except ValueError:
+            return json.dumps(token)
+
+    def _bare_word(self, i: int) -> int:
+        """Read a literal or an unquoted string value"""
+        end = _WORD.match(self.text, i).end()
+        word = self.text[i:end]
+        if word in _LITERALS:
+            self.out.append(_LITERALS[word])
+            return end
+        if end >= self.length:
+            # Truncated literal (e.g. "tru")
+            for literal in ("true", "false", "null"):
+                if literal.startswith(word):
+                    self.out.append(literal)
+                    return end
+        return self._bare_text(i)
+
+    def _bare_text(self, i: int) -> int:
+        """Read unquoted text up to the next structural character or line end"""
+        end = _BARE_TEXT.match(self.text, i).end()
+        self.out.append(json.dumps(self.text[i:end].strip()))
+        return end
+
+    def _finalize(self) -> None:
+        """Close everything left open by truncated output"""
+        self.pending_comma = False
+        while self.stack:
+            if self.states[-1] == _COLON:
+                # Dangling key without a value
+                del self.out[self.item_mark:]
+                self.states[-1] = _COMMA
+            self._close_top()
@@ -1,15 +1,209 @@
 """
 Logging utilities for AI services
+
+Records are handed to a bounded in-memory queue on the calling thread and
+written to stdout by a QueueListener thread, so a slow or blocked stdout never
+stalls the event loop. Messages are formatted (as JSON by default) on the
+listener thread only, and chatty INFO lines can be sampled per module.
 """
 
+import atexit
+import json
 import logging
+import queue
 import sys
-from typing import Optional
+import threading
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
 
 from ..config.settings import get_settings
 
 settings = get_settings()
 
+# Attributes every LogRecord has; anything else was passed through ``extra=``
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+# Credential-bearing keys masked wherever they appear in ``extra`` fields
+_REDACTED_KEYS = frozenset({
+    "authorization", "proxy-authorization", "cookie", "set-cookie",
+    "x-api-key", "api_key", "password", "token", "access_token", "refresh_token",
+})
+
+
+def _redact(value: Any) -> Any:
+    """Copy of an extra value with credential-bearing keys masked (nested dicts/lists too)"""
+    if isinstance(value, dict):
+        return {
+            key: "[REDACTED]" if str(key).lower() in _REDACTED_KEYS else _redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_redact(item) for item in value]
+    return value
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line with the record's ``extra`` fields (credentials masked)"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat().replace("+00:00", "Z"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and key not in entry:
+                entry[key] = "[REDACTED]" if key.lower() in _REDACTED_KEYS else _redact(value)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        elif record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps every Nth INFO/DEBUG record per module
+
+    Rates come from LOG_SAMPLE_RATES ("src.services.cement_agent=0.1,...");
+    the longest matching logger name prefix wins. Sampling is deterministic
+    (rate 0.1 keeps records 1, 11, 21, ...) and WARNING and above always pass.
+    """
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        # Keep one record out of every `interval`
+        self.intervals = {
+            prefix: max(1, round(1 / rate)) if rate > 0 else 0
+            for prefix, rate in rates.items() if rate < 1
+        }
+        self._resolved: Dict[str, int] = {}
+        self._counters: Dict[str, int] = {}
+        self.sampled_out = 0
+
+    @staticmethod
+    def parse(spec: str) -> Dict[str, float]:
+        """Parse "module=rate,module=rate" into a rate per module prefix"""
+        rates = {}
+        for item in filter(None, (part.strip() for part in spec.split(","))):
+            prefix, _, rate = item.partition("=")
+            rates[prefix.strip()] = min(1.0, max(0.0, float(rate)))
+        return rates
+
+    def _interval(self, name: str) -> int:
+        interval = self._resolved.get(name)
+        if interval is None:
+            matches = [prefix for prefix in self.intervals if name == prefix or name.startswith(prefix + ".")]
+            interval = self.intervals[max(matches, key=len)] if matches else 1
+            self._resolved[name] = interval
+        return interval
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        interval = self._interval(record.name)
+        if interval == 1:
+            return True
+        count = self._counters.get(record.name, 0)
+        self._counters[record.name] = count + 1
+        if interval and count % interval == 0:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """
+    QueueHandler that never blocks and never formats on the calling thread
+
+    The stock handler renders the message before enqueueing; here the record
+    keeps its msg/args and is formatted by the listener. Records arriving
+    while the queue is full are dropped and counted.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.enqueued = 0
+        self.dropped = 0
+        self.emit_seconds = 0.0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Tracebacks reference live frames; render them now (rare) so they can be released
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        started = time.perf_counter()
+        try:
+            return super().handle(record)
+        finally:
+            self.emit_seconds += time.perf_counter() - started
+
+
+def _build_pipeline():
+    """Shared queue handler and the listener writing to stdout"""
+    log_queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    sampling_filter = SamplingFilter(SamplingFilter.parse(settings.log_sample_rates))
+    queue_handler.addFilter(sampling_filter)
+
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(JSONFormatter() if settings.log_json else logging.Formatter(settings.log_format))
+    listener = QueueListener(log_queue, console_handler, respect_handler_level=False)
+    return queue_handler, sampling_filter, listener
+
+
+_queue_handler, _sampling_filter, _listener = _build_pipeline()
+_listener_lock = threading.Lock()
+_listener_started = False
+
+
+def start_logging():
+    """Start the listener thread (idempotent; called on first logger setup)"""
+    global _listener_started
+    with _listener_lock:
+        if not _listener_started:
+            _listener.start()
+            _listener_started = True
+
+
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener_started
+    with _listener_lock:
+        if _listener_started:
+            _listener.stop()
+            _listener_started = False
+
+
+atexit.register(stop_logging)
+
+
+def get_logging_stats() -> Dict[str, Any]:
+    """Logging pipeline statistics (handler time is spent on the calling thread, i.e. the event loop)"""
+    handled = _queue_handler.enqueued + _queue_handler.dropped + _sampling_filter.sampled_out
+    return {
+        "enqueued": _queue_handler.enqueued,
+        "dropped": _queue_handler.dropped,
+        "sampled_out": _sampling_filter.sampled_out,
+        "queued": _queue_handler.queue.qsize(),
+        "caller_seconds": round(_queue_handler.emit_seconds, 6),
+        "caller_us_per_record": round(_queue_handler.emit_seconds / handled * 1e6, 2) if handled else 0.0,
+        "format": "json" if settings.log_json else "text",
+    }
+
 
 def setup_logger(name: Optional[str] = None) -> logging.Logger:
     """
@@ -28,19 +222,14 @@ def setup_logger(name: Optional[str] = None) -> logging.Logger:
     log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
     logger.setLevel(log_level)
     
-    # Create formatter
-    formatter = logging.Formatter(settings.log_format)
-    
-    # Create console handler
+    # Attach the shared queue handler (the listener thread writes to stdout)
     if not logger.handlers:
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setLevel(log_level)
-        console_handler.setFormatter(formatter)
-        logger.addHandler(console_handler)
+        logger.addHandler(_queue_handler)
         
         # Prevent duplicate logs
         logger.propagate = False
     
+    start_logging()
     return logger
 
 
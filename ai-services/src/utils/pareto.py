@@ -0,0 +1,86 @@
+"""
+Pareto frontier (skyline) over numeric objectives
+
+Used to present every non-dominated fuel option at once instead of having
+users search the trade-off space one slider setting at a time.
+"""
+
+from typing import Sequence
+
+import numpy as np
+
+
+def pareto_mask(values: np.ndarray, maximize: Sequence[bool] = ()) -> np.ndarray:
+    """
+    Boolean mask of the non-dominated rows of an n x d objective matrix
+
+    Row a dominates row b when a is at least as good on every objective and
+    strictly better on one. Identical rows do not dominate each other, so
+    ties are all kept. Rows containing NaN are never part of the frontier.
+
+    Rows are visited in order of their summed (normalized) objectives: a row
+    can only be dominated by rows with a smaller sum, so each visited survivor
+    removes everything it dominates in one vectorized comparison and the
+    candidate set shrinks quickly.
+
+    Args:
+        values: n x d objective matrix
+        maximize: Per-column flags; True means larger is better (default: minimize)
+
+    Returns:
+        np.ndarray: Boolean mask of length n
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim != 2:
+        raise ValueError("values must be a 2-D array")
+    n, d = values.shape
+    mask = np.zeros(n, dtype=bool)
+    if n == 0:
+        return mask
+
+    # Convert every objective to "smaller is better"
+    signs = np.ones(d)
+    for column, flag in enumerate(maximize):
+        if flag:
+            signs[column] = -1.0
+    costs = values * signs
+
+    valid = ~np.isnan(costs).any(axis=1)
+    positions = np.flatnonzero(valid)
+    costs = costs[valid]
+    if costs.size == 0:
+        return mask
+
+    # Normalize so the visiting order is not dominated by the widest column
+    spread = costs.max(axis=0) - costs.min(axis=0)
+    normalized = (costs - costs.min(axis=0)) / np.where(spread > 0, spread, 1.0)
+    order = np.argsort(normalized.sum(axis=1), kind="stable")
+    positions = positions[order]
+    costs = costs[order]
+
+    current = 0
+    while current < len(costs):
+        point = costs[current]
+        # Keep rows strictly better somewhere, or exactly equal to the point
+        keep = np.any(costs < point, axis=1) | np.all(costs == point, axis=1)
+        keep[:current] = True
+        costs = costs[keep]
+        positions = positions[keep]
+        current += 1
+
+    mask[positions] = True
+    return mask
+
+
+def pareto_indices(values: np.ndarray, maximize: Sequence[bool] = ()) -> np.ndarray:
+    """
+    Positions of the non-dominated rows (see pareto_mask)
+
+    Args:
+        values: n x d objective matrix
+        maximize: Per-column flags; True means larger is better
+
+    Returns:
+        np.ndarray: Row positions in ascending order
+    """
+    return np.flatnonzero(pareto_mask(values, maximize))
@@ -0,0 +1,62 @@
+"""
+Async rate limiter for outbound API calls
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class AsyncRateLimiter:
+    """
+    Token bucket (requests per minute with burst) combined with a concurrency cap
+
+    Usage:
+        async with limiter:
+            await call_api()
+    """
+
+    def __init__(self, requests_per_minute: int, burst: Optional[int] = None, max_concurrent: int = 4):
+        """
+        Initialize the limiter
+
+        Args:
+            requests_per_minute: Sustained request rate
+            burst: Bucket capacity (defaults to max_concurrent)
+            max_concurrent: Maximum requests in flight at once
+        """
+        self.rate = max(1, requests_per_minute) / 60.0
+        self.capacity = float(burst or max_concurrent)
+        self.max_concurrent = max(1, max_concurrent)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+    async def acquire(self) -> None:
+        """Wait for a concurrency slot and a rate token"""
+        await self._semaphore.acquire()
+        try:
+            async with self._lock:
+                while True:
+                    now = time.monotonic()
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        except BaseException:
+            self._semaphore.release()
+            raise
+
+    def release(self) -> None:
+        """Release the concurrency slot"""
+        self._semaphore.release()
+
+    async def __aenter__(self) -> "AsyncRateLimiter":
+        await self.acquire()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        self.release()
@@ -0,0 +1,65 @@
+"""
+Correctness tests for the tolerant JSON parser
+
+Cases come from the recorded LLM output corpus in
+benchmarks/fixtures/llm_json_corpus.json (shared with the benchmark).
+
+Usage:
+    python -m pytest tests/test_json_repair.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add the service root to path for imports
+SERVICE_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(SERVICE_ROOT))
+
+from benchmarks.json_repair_benchmark import legacy_parse
+from src.utils.json_repair import JSONRepairError, parse_json_tolerant
+
+CORPUS = json.loads((SERVICE_ROOT / "benchmarks" / "fixtures" / "llm_json_corpus.json").read_text())
+CASE_IDS = [case["name"] for case in CORPUS]
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=CASE_IDS)
+def test_corpus_case_decodes_to_expected_document(case):
+    assert parse_json_tolerant(case["raw"]) == case["expected"]
+
+
+@pytest.mark.parametrize("case", CORPUS, ids=CASE_IDS)
+def test_never_recovers_less_than_legacy_path(case):
+    """The previous parse path (cleanup chain + manual extraction) is never ahead"""
+    try:
+        legacy = legacy_parse(case["raw"])
+    except Exception:
+        return
+    parsed = parse_json_tolerant(case["raw"])
+    if legacy == case["expected"]:
+        assert parsed == legacy
+    else:
+        assert len(parsed.get("recommendations", [])) >= len(legacy.get("recommendations", []))
+
+
+def test_strict_json_is_returned_unchanged():
+    document = {"a": [1, 2.5, None, True], "b": {"c": "it's \"quoted\""}}
+    assert parse_json_tolerant(json.dumps(document)) == document
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ('{"a": "x" "b": "y"}', {"a": "x", "b": "y"}),
+    ('{"a": "x"  "b": "y" "c": 1}', {"a": "x", "b": "y", "c": 1}),
+    ("{\"a\": \"x\" 'b': \"y\"}", {"a": "x", "b": "y"}),
+    ('{"a": "He said "hi" there", "b": 1}', {"a": 'He said "hi" there', "b": 1}),
+    ('["a" "b"]', ["a", "b"]),
+])
+def test_missing_comma_between_string_members(raw, expected):
+    assert parse_json_tolerant(raw) == expected
+
+
+def test_text_without_json_raises():
+    with pytest.raises(JSONRepairError):
+        parse_json_tolerant("I could not produce recommendations for this facility.")
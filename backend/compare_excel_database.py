@@ -5,11 +5,30 @@ Comprehensive comparison between Excel data and database data
 to identify missing data and create update queries.
 """
 
+import argparse
+import numpy as np
 import pandas as pd
 import psycopg2
+from psycopg2.extras import execute_values
 import json
 from datetime import datetime
 
+ENV_COLUMNS = ['scope_1', 'scope_2', 'scope_3', 'water_consumption', 'water_withdrawal',
+               'scope_1_intensity', 'scope_2_intensity', 'scope_3_intensity',
+               'water_consumption_intensity', 'water_withdrawal_intensity', 'waste_generated_intensity',
+               'renewable_energy_intensity', 'total_energy_intensity']
+
+SOCIAL_COLUMNS = ['male_employee_percentage', 'female_employee_percentage',
+                  'permanent_employees_per_million_rs', 'other_employees_per_million_rs',
+                  'msme_sourcing_percentage', 'health_safety_complaints',
+                  'working_conditions_complaints', 'posh_complaints']
+
+# industry_benchmarking column types (all other reconciled columns are DOUBLE PRECISION)
+INTEGER_COLUMNS = {'health_safety_complaints', 'working_conditions_complaints', 'posh_complaints'}
+
+# Missing data points printed per section (the --report file lists all of them)
+PRINT_LIMIT = 50
+
 def connect_to_database():
     """Connect to PostgreSQL database"""
     try:
@@ -114,8 +133,131 @@ def get_excel_data():
         print(f"Excel reading error: {e}")
         return None
 
-def compare_data():
-    """Compare Excel data with database data"""
+def find_missing_values(excel_df, db_df, columns):
+    """
+    Find cells Excel has but the database row of the same organization lacks
+
+    One join on organization_name, then a columnar null-mask comparison.
+    Like the previous row-by-row loop, the first database row of an
+    organization is the one compared.
+
+    Returns a DataFrame with organization_name, column, excel_value, db_value
+    """
+    db_first = db_df.drop_duplicates('organization_name')[['organization_name'] + columns]
+    merged = excel_df[['organization_name'] + columns].merge(
+        db_first, on='organization_name', how='inner', suffixes=('_excel', '_db'), sort=False
+    )
+    excel_columns = [f'{col}_excel' for col in columns]
+    db_columns = [f'{col}_db' for col in columns]
+
+    # rows x columns mask: Excel has data but DB doesn't
+    mask = merged[excel_columns].notna().to_numpy() & merged[db_columns].isna().to_numpy()
+    rows, cols = np.nonzero(mask)
+
+    return pd.DataFrame({
+        'organization_name': merged['organization_name'].to_numpy()[rows],
+        'column': np.asarray(columns, dtype=object)[cols],
+        'excel_value': merged[excel_columns].to_numpy(dtype=object)[rows, cols],
+        'db_value': merged[db_columns].to_numpy(dtype=object)[rows, cols]
+    })
+
+def build_update_rows(missing, columns):
+    """
+    One VALUES row per organization for the bulk update
+
+    Each row holds the Excel value for the organization's missing cells and
+    NULL (None) for the other columns, in `columns` order.
+    """
+    if missing.empty:
+        return []
+
+    wide = (missing.drop_duplicates(['organization_name', 'column'])
+                   .pivot(index='organization_name', columns='column', values='excel_value')
+                   .reindex(columns=columns))
+    wide = wide.astype(object).where(wide.notna(), None)
+    # .item() turns numpy scalars into Python values psycopg2 can adapt
+    return [
+        (org, *(value.item() if isinstance(value, np.generic) else value for value in values))
+        for org, values in zip(wide.index, wide.to_numpy())
+    ]
+
+def build_update_query(columns):
+    """
+    Parameterized bulk UPDATE for execute_values
+
+    COALESCE only fills cells that are still NULL, so NULL placeholders leave
+    existing values untouched. Returns (query, row template).
+    """
+    set_clauses = ',\n    '.join(f"{col} = COALESCE(ib.{col}, v.{col})" for col in columns)
+    query = (
+        "UPDATE industry_benchmarking AS ib\n"
+        f"SET {set_clauses},\n    updated_at = CURRENT_TIMESTAMP\n"
+        f"FROM (VALUES %s) AS v (organization_name, {', '.join(columns)})\n"
+        "WHERE ib.organization_name = v.organization_name"
+    )
+    casts = ['%s::integer' if col in INTEGER_COLUMNS else '%s::double precision' for col in columns]
+    template = f"(%s, {', '.join(casts)})"
+    return query, template
+
+def apply_updates(rows, columns, page_size=1000):
+    """Run the bulk update in one transaction; returns the number of rows updated"""
+    conn = connect_to_database()
+    if not conn:
+        return 0
+
+    query, template = build_update_query(columns)
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                updated = 0
+                # execute_values sends page_size VALUES rows per statement
+                for start in range(0, len(rows), page_size):
+                    execute_values(cursor, query, rows[start:start + page_size],
+                                   template=template, page_size=page_size)
+                    updated += cursor.rowcount
+        return updated
+    except Exception as e:
+        print(f"Database update error: {e}")
+        return 0
+    finally:
+        conn.close()
+
+def print_missing(missing, label):
+    """Print missing data points of one section"""
+    if missing.empty:
+        print(f"✅ All {label} data matches")
+        return
+
+    print(f"Found {len(missing)} missing {label} data points:")
+    for item in missing.head(PRINT_LIMIT).itertuples(index=False):
+        print(f"  {item.organization_name} - {item.column}: {item.excel_value} (Excel) vs {item.db_value} (DB)")
+    if len(missing) > PRINT_LIMIT:
+        print(f"  ... and {len(missing) - PRINT_LIMIT} more")
+
+def write_report(path, missing, missing_in_db, missing_in_excel, update_rows, applied):
+    """Write the reconciliation result as JSON"""
+    report = {
+        'generated_at': datetime.now().isoformat(),
+        'mode': 'apply' if applied is not None else 'dry-run',
+        'missing_data_points': len(missing),
+        'organizations_to_update': len(update_rows),
+        'rows_updated': applied,
+        'companies_missing_in_db': sorted(missing_in_db),
+        'companies_missing_in_excel': sorted(missing_in_excel),
+        'missing': missing.astype(object).where(missing.notna(), None).to_dict('records')
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    print(f"📝 Report written to {path}")
+
+def compare_data(apply=False, report_path=None):
+    """
+    Compare Excel data with database data
+
+    Args:
+        apply: Run the bulk update (default is a dry run that only reports)
+        report_path: Optional JSON report file
+    """
     print("🔍 COMPREHENSIVE DATA COMPARISON")
     print("=" * 80)
     
@@ -140,41 +282,12 @@ def compare_data():
     print("-" * 50)
     
     env_excel = excel_data['environmental']
-    env_columns = ['scope_1', 'scope_2', 'scope_3', 'water_consumption', 'water_withdrawal', 
-                   'scope_1_intensity', 'scope_2_intensity', 'scope_3_intensity',
-                   'water_consumption_intensity', 'water_withdrawal_intensity', 'waste_generated_intensity',
-                   'renewable_energy_intensity', 'total_energy_intensity']
+    not_found = env_excel.loc[~env_excel['organization_name'].isin(db_df['organization_name']), 'organization_name']
+    for org_name in not_found.head(PRINT_LIMIT):
+        print(f"❌ {org_name} not found in database")
     
-    missing_env_data = []
-    for _, excel_row in env_excel.iterrows():
-        org_name = excel_row['organization_name']
-        db_row = db_df[db_df['organization_name'] == org_name]
-        
-        if len(db_row) == 0:
-            print(f"❌ {org_name} not found in database")
-            continue
-            
-        db_row = db_row.iloc[0]
-        
-        for col in env_columns:
-            excel_val = excel_row[col]
-            db_val = db_row[col]
-            
-            # Check if Excel has data but DB doesn't
-            if pd.notna(excel_val) and pd.isna(db_val):
-                missing_env_data.append({
-                    'organization_name': org_name,
-                    'column': col,
-                    'excel_value': excel_val,
-                    'db_value': db_val
-                })
-    
-    if missing_env_data:
-        print(f"Found {len(missing_env_data)} missing environmental data points:")
-        for item in missing_env_data:
-            print(f"  {item['organization_name']} - {item['column']}: {item['excel_value']} (Excel) vs {item['db_value']} (DB)")
-    else:
-        print("✅ All environmental data matches")
+    missing_env_data = find_missing_values(env_excel, db_df, ENV_COLUMNS)
+    print_missing(missing_env_data, 'environmental')
     
     print()
     
@@ -182,41 +295,8 @@ def compare_data():
     print("👥 SOCIAL DATA COMPARISON")
     print("-" * 50)
     
-    social_excel = excel_data['social']
-    social_columns = ['male_employee_percentage', 'female_employee_percentage', 
-                     'permanent_employees_per_million_rs', 'other_employees_per_million_rs',
-                     'msme_sourcing_percentage', 'health_safety_complaints', 
-                     'working_conditions_complaints', 'posh_complaints']
-    
-    missing_social_data = []
-    for _, excel_row in social_excel.iterrows():
-        org_name = excel_row['organization_name']
-        db_row = db_df[db_df['organization_name'] == org_name]
-        
-        if len(db_row) == 0:
-            continue
-            
-        db_row = db_row.iloc[0]
-        
-        for col in social_columns:
-            excel_val = excel_row[col]
-            db_val = db_row[col]
-            
-            # Check if Excel has data but DB doesn't
-            if pd.notna(excel_val) and pd.isna(db_val):
-                missing_social_data.append({
-                    'organization_name': org_name,
-                    'column': col,
-                    'excel_value': excel_val,
-                    'db_value': db_val
-                })
-    
-    if missing_social_data:
-        print(f"Found {len(missing_social_data)} missing social data points:")
-        for item in missing_social_data:
-            print(f"  {item['organization_name']} - {item['column']}: {item['excel_value']} (Excel) vs {item['db_value']} (DB)")
-    else:
-        print("✅ All social data matches")
+    missing_social_data = find_missing_values(excel_data['social'], db_df, SOCIAL_COLUMNS)
+    print_missing(missing_social_data, 'social')
     
     print()
     
@@ -231,49 +311,40 @@ def compare_data():
     missing_in_excel = db_companies - excel_companies
     
     if missing_in_db:
-        print(f"Companies in Excel but not in DB: {missing_in_db}")
+        print(f"Companies in Excel but not in DB: {len(missing_in_db)}")
     if missing_in_excel:
-        print(f"Companies in DB but not in Excel: {missing_in_excel}")
+        print(f"Companies in DB but not in Excel: {len(missing_in_excel)}")
     
     if not missing_in_db and not missing_in_excel:
         print("✅ All companies match between Excel and database")
     
     print()
     
-    # 4. Generate update queries for missing data
-    print("🔧 GENERATING UPDATE QUERIES")
+    # 4. Build the bulk update for missing data
+    print("🔧 BULK UPDATE FOR MISSING DATA")
     print("-" * 50)
     
-    if missing_env_data or missing_social_data:
-        print("-- Update queries for missing data:")
+    all_missing = pd.concat([missing_env_data, missing_social_data], ignore_index=True)
+    update_columns = ENV_COLUMNS + SOCIAL_COLUMNS
+    update_rows = build_update_rows(all_missing, update_columns)
+    applied = None
+    
+    if update_rows:
+        query, template = build_update_query(update_columns)
+        print(f"-- {len(all_missing)} missing values across {len(update_rows)} organizations")
+        print(f"-- execute_values row template: {template}")
+        print(query + ";")
         print()
         
-        # Group by organization
-        all_missing = missing_env_data + missing_social_data
-        updates_by_org = {}
-        
-        for item in all_missing:
-            org = item['organization_name']
-            if org not in updates_by_org:
-                updates_by_org[org] = []
-            updates_by_org[org].append(item)
-        
-        for org, updates in updates_by_org.items():
-            print(f"-- Updates for {org}:")
-            set_clauses = []
-            for update in updates:
-                col = update['column']
-                val = update['excel_value']
-                if pd.isna(val):
-                    set_clauses.append(f"{col} = NULL")
-                elif isinstance(val, str):
-                    set_clauses.append(f"{col} = '{val}'")
-                else:
-                    set_clauses.append(f"{col} = {val}")
-            
-            query = f"UPDATE industry_benchmarking SET {', '.join(set_clauses)} WHERE organization_name = '{org}';"
-            print(query)
-            print()
+        if apply:
+            applied = apply_updates(update_rows, update_columns)
+            print(f"✅ Updated {applied} rows")
+        else:
+            print("ℹ️  Dry run: no changes written (use --apply to update the database)")
+    else:
+        print("✅ Nothing to update")
+    
+    print()
     
     # 5. Check for additional data that could be added
     print("📈 ADDITIONAL DATA ANALYSIS")
@@ -291,10 +362,17 @@ def compare_data():
     sources_df = excel_data['sources']
     print(f"Sources data available for {len(sources_df)} records")
     
+    if report_path:
+        print()
+        write_report(report_path, all_missing, missing_in_db, missing_in_excel, update_rows, applied)
+    
     print()
     print("=" * 80)
     print("✅ Comparison complete!")
 
 if __name__ == "__main__":
-    compare_data()
-
+    parser = argparse.ArgumentParser(description="Reconcile Cement_benchmarking_data.xlsx with industry_benchmarking")
+    parser.add_argument('--apply', action='store_true', help="write missing values to the database (default: dry run)")
+    parser.add_argument('--report', metavar='PATH', help="write a JSON report of the comparison")
+    args = parser.parse_args()
+    compare_data(apply=args.apply, report_path=args.report)
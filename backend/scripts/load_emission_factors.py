@@ -0,0 +1,435 @@
+#!/usr/bin/env python3
+
+"""
+Streaming bulk loader for emission factor libraries.
+
+Streams one or more library CSVs (same columns as
+migrations/files/ef_libraries_with_cost.csv) through validation and unit
+normalization, COPYs the rows into a temporary staging table and upserts
+emission_factor_libraries, emission_resources and emission_factors from it
+in a single transaction. Rows are never collected in memory, so
+million-row vendor libraries load in constant memory.
+
+Usage:
+    python scripts/load_emission_factors.py [CSV ...] [--dry-run] [--report-every N]
+
+Connection settings come from DB_HOST, DB_PORT, DB_NAME, DB_USER and
+DB_PASSWORD, as for scripts/ingest_emission_factors_from_csv.js. DB_PASSWORD
+has no default and is required unless --dry-run is given.
+"""
+
+import argparse
+import csv
+import math
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+
+DEFAULT_CSV = Path(__file__).resolve().parent.parent / 'migrations' / 'files' / 'ef_libraries_with_cost.csv'
+
+REQUIRED_COLUMNS = ['source', 'version', 'published_year', 'scope', 'activity_type', 'name', 'kgco2e', 'unit_name']
+
+# Conversion rate used for approximate_cost (USD) throughout the migrations
+USD_TO_INR = 83
+
+# Spellings of the units the library already uses
+UNIT_ALIASES = {
+    'l': 'L', 'litre': 'L', 'litres': 'L', 'liter': 'L', 'liters': 'L',
+    'kg': 'kg', 'kilogram': 'kg', 'kilograms': 'kg',
+    't': 't', 'tonne': 't', 'tonnes': 't', 'metric ton': 't', 'metric tons': 't',
+    'm3': 'm3', 'm³': 'm3', 'cubic metre': 'm3', 'cubic metres': 'm3', 'cubic meter': 'm3',
+    'kwh': 'kWh',
+}
+
+# Units converted to one of the above: (canonical unit, canonical units per source unit)
+UNIT_CONVERSIONS = {
+    'ml': ('L', 0.001),
+    'gal': ('L', 3.785411784), 'gallon': ('L', 3.785411784), 'gallons': ('L', 3.785411784),
+    'g': ('kg', 0.001),
+    'lb': ('kg', 0.45359237), 'lbs': ('kg', 0.45359237),
+    'short ton': ('t', 0.90718474), 'short tons': ('t', 0.90718474),
+    'ft3': ('m3', 0.028316846592), 'scf': ('m3', 0.028316846592),
+    'mwh': ('kWh', 1000.0), 'gwh': ('kWh', 1000000.0),
+}
+
+# Largest values the emission_factors columns hold: DECIMAL(15,6) and DECIMAL(10,2)
+MAX_EMISSION_FACTOR = 1e9
+MAX_HEAT_CONTENT = 1e8
+MAX_COST_INR = 1e8
+
+STAGING_COLUMNS = [
+    'line_no', 'library_name', 'version', 'year', 'scope', 'activity_type', 'resource_name',
+    'resource_type', 'category', 'is_renewable', 'is_biofuel', 'is_refrigerant',
+    'emission_factor', 'emission_factor_unit', 'heat_content', 'biogenic_emission_factor',
+    'cost_inr', 'availability_score',
+]
+
+CREATE_STAGING = """
+CREATE TEMP TABLE ef_staging (
+  line_no BIGINT NOT NULL,
+  library_name VARCHAR(255) NOT NULL,
+  version VARCHAR(100) NOT NULL,
+  year INTEGER NOT NULL,
+  scope VARCHAR(10) NOT NULL,
+  activity_type TEXT NOT NULL,
+  resource_name VARCHAR(255) NOT NULL,
+  resource_type VARCHAR(100) NOT NULL,
+  category VARCHAR(100) NOT NULL,
+  is_renewable BOOLEAN NOT NULL,
+  is_biofuel BOOLEAN NOT NULL,
+  is_refrigerant BOOLEAN NOT NULL,
+  emission_factor DOUBLE PRECISION NOT NULL,
+  emission_factor_unit VARCHAR(50) NOT NULL,
+  heat_content DOUBLE PRECISION,
+  biogenic_emission_factor DOUBLE PRECISION,
+  cost_inr DOUBLE PRECISION,
+  availability_score INTEGER NOT NULL
+) ON COMMIT DROP
+"""
+
+UPSERT_LIBRARIES = """
+WITH upserted AS (
+  INSERT INTO emission_factor_libraries (library_name, version, year, region, description, is_active)
+  SELECT DISTINCT library_name, version, year, 'Global',
+         library_name || ' emission factors database version ' || version, true
+  FROM ef_staging
+  ON CONFLICT (library_name, version, year) DO NOTHING
+  RETURNING 1
+)
+SELECT count(*), 0 FROM upserted
+"""
+
+# Existing resources keep their curated type, category and description; the
+# alternative-fuel flag is only ever switched on by a library
+UPSERT_RESOURCES = """
+WITH upserted AS (
+  INSERT INTO emission_resources
+    (resource_name, resource_type, category, scope, is_alternative_fuel,
+     is_calculator, is_renewable, is_biofuel, is_refrigerant, description)
+  SELECT DISTINCT ON (resource_name, scope)
+         resource_name, resource_type, category, scope, is_renewable OR is_biofuel,
+         false, is_renewable, is_biofuel, is_refrigerant, resource_name || ' - ' || activity_type
+  FROM ef_staging
+  ORDER BY resource_name, scope, line_no DESC
+  ON CONFLICT (resource_name, scope) DO UPDATE SET
+    is_alternative_fuel = emission_resources.is_alternative_fuel OR EXCLUDED.is_alternative_fuel,
+    is_renewable = EXCLUDED.is_renewable,
+    is_biofuel = EXCLUDED.is_biofuel,
+    is_refrigerant = EXCLUDED.is_refrigerant
+  RETURNING (xmax = 0) AS inserted
+)
+SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+"""
+
+# The last row of a (resource, library) pair in the input wins
+UPSERT_FACTORS = f"""
+WITH upserted AS (
+  INSERT INTO emission_factors
+    (resource_id, library_id, emission_factor, emission_factor_unit, heat_content,
+     heat_content_unit, approximate_cost, cost_unit, cost_inr, availability_score,
+     biogenic_emission_factor, reference_source, notes)
+  SELECT DISTINCT ON (r.id, l.id)
+         r.id, l.id, s.emission_factor, s.emission_factor_unit, s.heat_content,
+         CASE WHEN s.heat_content IS NOT NULL THEN 'GJ' END,
+         round((s.cost_inr / {USD_TO_INR})::numeric, 2),
+         CASE WHEN s.cost_inr IS NOT NULL THEN 'USD' END,
+         s.cost_inr, s.availability_score, s.biogenic_emission_factor, s.library_name,
+         'Imported from CSV - ' || s.activity_type
+  FROM ef_staging s
+  JOIN emission_factor_libraries l
+    ON l.library_name = s.library_name AND l.version = s.version AND l.year = s.year
+  JOIN emission_resources r
+    ON r.resource_name = s.resource_name AND r.scope = s.scope
+  ORDER BY r.id, l.id, s.line_no DESC
+  ON CONFLICT (resource_id, library_id) DO UPDATE SET
+    emission_factor = EXCLUDED.emission_factor,
+    emission_factor_unit = EXCLUDED.emission_factor_unit,
+    heat_content = EXCLUDED.heat_content,
+    heat_content_unit = EXCLUDED.heat_content_unit,
+    approximate_cost = EXCLUDED.approximate_cost,
+    cost_unit = EXCLUDED.cost_unit,
+    cost_inr = EXCLUDED.cost_inr,
+    availability_score = EXCLUDED.availability_score,
+    biogenic_emission_factor = EXCLUDED.biogenic_emission_factor,
+    reference_source = EXCLUDED.reference_source,
+    notes = EXCLUDED.notes
+  RETURNING (xmax = 0) AS inserted
+)
+SELECT count(*) FILTER (WHERE inserted), count(*) FILTER (WHERE NOT inserted) FROM upserted
+"""
+
+class RowError(ValueError):
+    """A CSV row that fails validation"""
+
+def parse_bool(value):
+    return str(value or '').strip().lower() in ('true', 't', '1', 'yes', 'y')
+
+def parse_number(row, column, required=False, maximum=None):
+    """Optional non-negative finite number from a CSV cell"""
+    text = (row.get(column) or '').strip()
+    if not text:
+        if required:
+            raise RowError(f"{column} is empty")
+        return None
+    try:
+        value = float(text)
+    except ValueError:
+        raise RowError(f"{column} is not a number: {text!r}")
+    if not math.isfinite(value) or value < 0:
+        raise RowError(f"{column} must be a non-negative number: {text!r}")
+    if maximum is not None and value >= maximum:
+        raise RowError(f"{column} out of range: {text!r}")
+    return value
+
+def normalize_unit(unit_name):
+    """Canonical unit and the number of canonical units in one source unit"""
+    key = (unit_name or '').strip().lower()
+    if key in UNIT_ALIASES:
+        return UNIT_ALIASES[key], 1.0
+    if key in UNIT_CONVERSIONS:
+        return UNIT_CONVERSIONS[key]
+    raise RowError(f"unknown unit: {unit_name!r}")
+
+def classify_resource(activity_type):
+    """resource_type and category from the activity type (as the JS ingester does)"""
+    if 'Mobile' in activity_type:
+        return 'fuel', 'mobile_combustion'
+    if 'Fugitive' in activity_type:
+        return 'refrigerant', 'fugitive_emissions'
+    if 'Electricity' in activity_type:
+        return 'electricity', 'purchased_electricity'
+    return 'fuel', 'stationary_combustion'
+
+def availability_score(cost_inr):
+    """Availability score from the per-unit cost (5 when the cost is unknown)"""
+    if not cost_inr:
+        return 5
+    if cost_inr <= 10:
+        return 9
+    if cost_inr <= 50:
+        return 8
+    if cost_inr <= 100:
+        return 7
+    return 6
+
+def normalize_row(row):
+    """Validate one CSV row and return its staging values (in STAGING_COLUMNS order, without line_no)"""
+    library_name = (row.get('source') or '').strip()
+    version = (row.get('version') or '').strip()
+    name = (row.get('name') or '').strip()
+    activity_type = (row.get('activity_type') or '').strip()
+    if not library_name or not version or not name or not activity_type:
+        raise RowError("source, version, name and activity_type are required")
+    if len(name) > 255 or len(library_name) > 255 or len(version) > 100:
+        raise RowError("source, version or name too long")
+
+    try:
+        year = int(float(row.get('published_year') or ''))
+    except ValueError:
+        raise RowError(f"published_year is not a year: {row.get('published_year')!r}")
+    if not 1900 <= year <= 2100:
+        raise RowError(f"published_year out of range: {year}")
+
+    # "Scope 1" -> "scope1"; emission_resources only holds scope 1 and 2
+    scope = (row.get('scope') or '').strip().lower().replace(' ', '')
+    if scope not in ('scope1', 'scope2'):
+        raise RowError(f"unsupported scope: {row.get('scope')!r}")
+
+    unit, per_unit = normalize_unit(row.get('unit_name'))
+    emission_factor = parse_number(row, 'kgco2e', required=True)
+    heat_content = parse_number(row, 'heat_content')
+    biogenic = parse_number(row, 'biogenic_kgco2e')
+    cost_inr = parse_number(row, 'cost_inr')
+
+    # Per-unit quantities scale inversely with the unit size (per gallon -> per litre)
+    if per_unit != 1.0:
+        emission_factor, heat_content, biogenic, cost_inr = (
+            None if value is None else value / per_unit
+            for value in (emission_factor, heat_content, biogenic, cost_inr)
+        )
+    for column, value, maximum in (('kgco2e', emission_factor, MAX_EMISSION_FACTOR),
+                                   ('biogenic_kgco2e', biogenic, MAX_EMISSION_FACTOR),
+                                   ('heat_content', heat_content, MAX_HEAT_CONTENT),
+                                   ('cost_inr', cost_inr, MAX_COST_INR)):
+        if value is not None and value >= maximum:
+            raise RowError(f"{column} out of range after conversion to {unit}: {value}")
+
+    resource_type, category = classify_resource(activity_type)
+    return (
+        library_name, version, year, scope, activity_type, name, resource_type, category,
+        parse_bool(row.get('is_renewable')), parse_bool(row.get('is_biofuel')),
+        parse_bool(row.get('is_refrigerant')),
+        emission_factor, unit, heat_content, biogenic,
+        None if cost_inr is None else round(cost_inr, 2), availability_score(cost_inr),
+    )
+
+class LoadStats:
+    """Row counters and throughput of one load"""
+
+    def __init__(self, report_every):
+        self.report_every = report_every
+        self.read = 0
+        self.staged = 0
+        self.rejected = 0
+        self.errors = []
+        self.started = time.perf_counter()
+
+    def rate(self, count, since=None):
+        elapsed = time.perf_counter() - (since or self.started)
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def row_done(self, staged):
+        self.read += 1
+        if staged:
+            self.staged += 1
+        else:
+            self.rejected += 1
+        if self.report_every and self.read % self.report_every == 0:
+            print(f"   {self.read:>12,} rows read  {self.staged:>12,} staged  "
+                  f"{self.rejected:>8,} rejected  {self.rate(self.read):>10,.0f} rows/s")
+
+def stream_rows(paths, stats, max_errors=20):
+    """Yield (line_no, *staging values) for every valid row of the CSVs"""
+    line_no = 0
+    for path in paths:
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            missing = [col for col in REQUIRED_COLUMNS if col not in (reader.fieldnames or [])]
+            if missing:
+                raise SystemExit(f"❌ {path}: missing columns {', '.join(missing)}")
+
+            for row in reader:
+                line_no += 1
+                try:
+                    values = normalize_row(row)
+                except RowError as e:
+                    stats.row_done(False)
+                    if len(stats.errors) < max_errors:
+                        stats.errors.append(f"{Path(path).name}:{reader.line_num}: {e}")
+                    continue
+                stats.row_done(True)
+                yield (line_no,) + values
+
+def _copy_value(value):
+    """COPY text-format field"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, float):
+        return repr(value)
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+class CopyStream:
+    """File-like view of a row iterator in COPY text format, read chunk by chunk"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.buffer = ''
+
+    def read(self, size=-1):
+        parts = [self.buffer]
+        length = len(self.buffer)
+        for row in self.rows:
+            line = '\t'.join(_copy_value(value) for value in row) + '\n'
+            parts.append(line)
+            length += len(line)
+            if 0 <= size <= length:
+                break
+        data = ''.join(parts)
+        if size < 0:
+            self.buffer = ''
+            return data
+        self.buffer = data[size:]
+        return data[:size]
+
+def connect_to_database():
+    """Connect to PostgreSQL database"""
+    import psycopg2
+
+    return psycopg2.connect(
+        host=os.environ.get('DB_HOST', '127.0.0.1'),
+        port=os.environ.get('DB_PORT', '5432'),
+        database=os.environ.get('DB_NAME', 'illuminate_db'),
+        user=os.environ.get('DB_USER', 'illuminate'),
+        password=os.environ['DB_PASSWORD'],
+    )
+
+def load(paths, stats):
+    """COPY into staging and upsert all three tables in one transaction"""
+    conn = connect_to_database()
+    results = {}
+    try:
+        with conn:
+            with conn.cursor() as cursor:
+                cursor.execute(CREATE_STAGING)
+                print("📥 Streaming rows into staging table...")
+                cursor.copy_expert(
+                    f"COPY ef_staging ({', '.join(STAGING_COLUMNS)}) FROM STDIN",
+                    CopyStream(stream_rows(paths, stats))
+                )
+                copy_seconds = time.perf_counter() - stats.started
+                print(f"   COPY: {stats.staged:,} rows in {copy_seconds:.1f}s "
+                      f"({stats.rate(stats.staged):,.0f} rows/s)")
+                cursor.execute("ANALYZE ef_staging")
+
+                print("🔄 Upserting libraries, resources and factors...")
+                upsert_started = time.perf_counter()
+                for table, query in (('libraries', UPSERT_LIBRARIES),
+                                     ('resources', UPSERT_RESOURCES),
+                                     ('factors', UPSERT_FACTORS)):
+                    cursor.execute(query)
+                    results[table] = cursor.fetchone()
+                upsert_seconds = time.perf_counter() - upsert_started
+                print(f"   Upsert: {upsert_seconds:.1f}s ({stats.rate(stats.staged, upsert_started):,.0f} rows/s)")
+    finally:
+        conn.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk load emission factor library CSVs")
+    parser.add_argument('paths', nargs='*', default=[str(DEFAULT_CSV)], help="library CSV files")
+    parser.add_argument('--dry-run', action='store_true', help="validate and normalize only, without a database")
+    parser.add_argument('--report-every', type=int, default=100_000, metavar='N',
+                        help="print throughput every N rows (0 disables)")
+    args = parser.parse_args()
+
+    print("🚀 Starting Emission Factors Bulk Load")
+    print("=" * 60)
+    stats = LoadStats(args.report_every)
+
+    if not args.dry_run and not os.environ.get('DB_PASSWORD'):
+        print("❌ DB_PASSWORD is not set; export the database password (or use --dry-run)")
+        sys.exit(1)
+
+    if args.dry_run:
+        for _ in stream_rows(args.paths, stats):
+            pass
+        results = None
+    else:
+        try:
+            results = load(args.paths, stats)
+        except Exception as e:
+            print(f"❌ Load failed, nothing was written: {e}")
+            sys.exit(1)
+
+    elapsed = time.perf_counter() - stats.started
+    print("\n📊 LOAD COMPLETED - STATISTICS:")
+    print("=" * 60)
+    print(f"📄 Rows read: {stats.read:,}  staged: {stats.staged:,}  rejected: {stats.rejected:,}")
+    for error in stats.errors:
+        print(f"   ❌ {error}")
+    if results:
+        for table, (created, updated) in results.items():
+            print(f"✅ {table.capitalize()}: {created:,} created, {updated:,} updated")
+    # ru_maxrss is in kilobytes on Linux
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"⏱️  {elapsed:.1f}s total, {stats.rate(stats.read):,.0f} rows/s, peak memory {peak_mb:.0f} MB")
+    if args.dry_run:
+        print("ℹ️  Dry run: no changes written")
+
+if __name__ == "__main__":
+    main()
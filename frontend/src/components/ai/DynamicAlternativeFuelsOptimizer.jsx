@@ -480,7 +480,9 @@ Adjust the sliders above to explore different fuel options!`;
           method: 'POST',
           body: JSON.stringify({
             facility_id: facility.id,
-            selections: userSelections
+            selections: userSelections,
+            // Reuse the priced fuel table from initialization instead of rebuilding it
+            snapshot_id: initializationData?.snapshot_id
           })
         });
         
@@ -586,7 +588,7 @@ Adjust the sliders above to explore different fuel options!`;
     } finally {
       setOptimizing(false);
     }
-  }, [userSelections, facility.id, allFuels, dynamicRanges]);
+  }, [userSelections, facility.id, allFuels, dynamicRanges, initializationData]);
 
   const generateFallbackRecommendation = (bestFuel, selections, totalMatches) => {
     const costEfficient = bestFuel.dynamic_cost <= selections.cost_value;